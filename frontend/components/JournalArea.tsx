@@ -2,7 +2,7 @@
 import { useState, useRef, useEffect } from 'react';
 import { Send, Loader2, AlertTriangle, Brain, Heart, Zap, ChevronDown, Activity, Tag, Shield, Star } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { ai, avatar } from '@/lib/api';
+import { ai, avatar, newSessionId, newTraceparent } from '@/lib/api';
 import Avatar from './Avatar';
 import CrisisModal from './CrisisModal';
 
@@ -23,6 +23,7 @@ interface UnifiedAnalysis {
     all_scores: Record<string, number>;
     semantic_summary: string;
     triggered_by: string;
+    chunk_signals?: { start: number; end: number; signal: number; crisis: boolean }[];
     // Meta
     processing_time_ms: number;
     model_version: string;
@@ -251,7 +252,8 @@ export default function JournalArea({
     const [currentRisk, setCurrentRisk] = useState('LOW');
     const [currentSeverity, setCurrentSeverity] = useState(0);
     const [showCrisis, setShowCrisis] = useState(false);
-    const [conversationHistory, setConversationHistory] = useState<any[]>([]);
+    // The avatar-service keeps the conversation window for this id; only new entries are sent
+    const sessionId = useRef<string>(newSessionId());
     const [error, setError] = useState<string | null>(null);
     const textareaRef = useRef<HTMLTextAreaElement>(null);
     const messagesEndRef = useRef<HTMLDivElement>(null);
@@ -276,84 +278,98 @@ export default function JournalArea({
         setMessages(prev => [...prev, { role: 'user', text: userText }]);
 
         try {
-            // ── Call unified AI endpoint ──────────────────────────────────
-            const analysisRes = await ai.analyze(userText, conversationHistory);
-            const data = analysisRes.data;
-
-            // -- Try unified model output first (v2), fall back to legacy (v1)
-            let unified: UnifiedAnalysis;
-            if (data.unified) {
-                // V2: new unified model
-                unified = {
-                    ...data.unified,
-                    processing_time_ms: data.processing_time_ms || 0,
-                    model_version: data.model_version || '2.0.0',
-                };
-            } else {
-                // V1 backward-compat: build unified from old fields
-                unified = {
-                    mental_state: data.mental_health?.mental_state || 'Stable',
-                    raw_label: (data.mental_health?.mental_state || 'normal').toLowerCase(),
-                    emotion: data.emotion?.emotion || 'neutral',
-                    crisis_risk: data.crisis?.risk_level || 'LOW',
-                    crisis_probability: data.crisis?.crisis_probability || 0,
-                    requires_immediate_action: data.crisis?.requires_immediate_action || false,
-                    severity_rating: Math.round((data.crisis?.crisis_probability || 0) * 10),
-                    tags: [],
-                    confidence: data.emotion?.confidence || 0,
-                    all_scores: data.emotion?.all_emotions || {},
-                    semantic_summary: '',
-                    triggered_by: 'legacy',
-                    processing_time_ms: data.processing_time_ms || 0,
-                    model_version: data.model_version || '1.0',
-                };
+            // ── Analysis + avatar reply in one streamed round trip ────────
+            const traceparent = newTraceparent();
+            let unified: UnifiedAnalysis | undefined;
+            let crisisLine = '';
+            let replyText = '';
+            let started = false;
+            const render = () => {
+                const text = [crisisLine, replyText].filter(Boolean).join(' ');
+                const replace = started;
+                started = true;
+                setMessages(prev => [
+                    ...(replace ? prev.slice(0, -1) : prev),
+                    { role: 'avatar', text, analysis: unified },
+                ]);
+            };
+
+            const onAnalysis = (data: any) => {
+                // -- Try unified model output first (v2), fall back to legacy (v1)
+                if (data.unified) {
+                    // V2: new unified model
+                    unified = {
+                        ...data.unified,
+                        processing_time_ms: data.processing_time_ms || 0,
+                        model_version: data.model_version || '2.0.0',
+                    };
+                } else {
+                    // V1 backward-compat: build unified from old fields
+                    unified = {
+                        mental_state: data.mental_health?.mental_state || 'Stable',
+                        raw_label: (data.mental_health?.mental_state || 'normal').toLowerCase(),
+                        emotion: data.emotion?.emotion || 'neutral',
+                        crisis_risk: data.crisis?.risk_level || 'LOW',
+                        crisis_probability: data.crisis?.crisis_probability || 0,
+                        requires_immediate_action: data.crisis?.requires_immediate_action || false,
+                        severity_rating: Math.round((data.crisis?.crisis_probability || 0) * 10),
+                        tags: [],
+                        confidence: data.emotion?.confidence || 0,
+                        all_scores: data.emotion?.all_emotions || {},
+                        semantic_summary: '',
+                        triggered_by: 'legacy',
+                        processing_time_ms: data.processing_time_ms || 0,
+                        model_version: data.model_version || '1.0',
+                    };
+                }
+                const u = unified!;
+
+                setCurrentEmotion(u.emotion);
+                setCurrentRisk(u.crisis_risk);
+                setCurrentSeverity(u.severity_rating);
+
+                if (u.crisis_risk === 'HIGH' || u.crisis_risk === 'CRISIS') {
+                    setShowCrisis(true);
+                }
+
+                // Notify parent for analytics panel
+                onNewEntry?.({
+                    emotion: u.emotion,
+                    confidence: u.confidence,
+                    crisis_prob: u.crisis_probability,
+                    mental_state: u.mental_state,
+                    severity: u.severity_rating,
+                    tags: u.tags,
+                });
+            };
+
+            // The avatar-service runs the analysis over its keep-alive connection to the
+            // ai-service and feeds the result straight into the reply generator
+            try {
+                await avatar.pipelineStream({
+                    text: userText,
+                    session_id: sessionId.current,
+                }, ({ event, data }) => {
+                    if (event === 'analysis') return onAnalysis(data);
+                    if (event === 'crisis') crisisLine = data.text;
+                    else if (event === 'delta') replyText += data.text;
+                    else return;
+                    render();
+                }, traceparent);
+            } catch (pipelineErr) {
+                // Analysis already arrived: only the reply failed
+                if (unified) throw pipelineErr;
+                // Crisis detection must not depend on the avatar-service — analyze directly
+                console.error('Pipeline error, analyzing directly:', pipelineErr);
+                const res = await ai.analyze(userText, [], traceparent);
+                onAnalysis(res.data);
+                setMessages(prev => [...prev, {
+                    role: 'avatar',
+                    text: "I've read what you wrote, but I'm having trouble putting my reply together right now — please try again in a moment. 💙",
+                    analysis: unified,
+                }]);
             }
 
-            setCurrentEmotion(unified.emotion);
-            setCurrentRisk(unified.crisis_risk);
-            setCurrentSeverity(unified.severity_rating);
-
-            if (unified.crisis_risk === 'HIGH' || unified.crisis_risk === 'CRISIS') {
-                setShowCrisis(true);
-            }
-
-            // Notify parent for analytics panel
-            onNewEntry?.({
-                emotion: unified.emotion,
-                confidence: unified.confidence,
-                crisis_prob: unified.crisis_probability,
-                mental_state: unified.mental_state,
-                severity: unified.severity_rating,
-                tags: unified.tags,
-            });
-
-            // ── Avatar response ───────────────────────────────────────────
-            const avatarRes = await avatar.respond({
-                journal_text: userText,
-                emotion: unified.emotion,
-                confidence: unified.confidence,
-                risk_level: unified.crisis_risk,
-                crisis_probability: unified.crisis_probability,
-                mental_state: unified.mental_state,
-                severity_rating: unified.severity_rating,
-                tags: unified.tags,
-                semantic_summary: unified.semantic_summary,
-                // Clean history for API compatibility (ensure role names match and content is extracted)
-                conversation_history: conversationHistory.map(h => ({
-                    role: h.role === 'avatar' ? 'assistant' : h.role,
-                    content: h.text || h.content || ''
-                })),
-            });
-
-            const avatarText = avatarRes.data.text;
-
-            setMessages(prev => [...prev, { role: 'avatar', text: avatarText, analysis: unified }]);
-            setConversationHistory(prev => [
-                ...prev,
-                { role: 'user', content: userText, analysis: unified },
-                { role: 'assistant', content: avatarText },
-            ]);
-
         } catch (err: any) {
             console.error('Analysis error:', err);
             const detail = err?.response?.data?.detail;
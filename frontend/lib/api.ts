@@ -40,12 +40,71 @@ export const journal = {
     list: (userId: string) => Promise.resolve({ data: [] }),
 };
 
+// W3C trace context — one trace per journal message, shared by the ai and avatar calls.
+// Flags are 00: the services make the sampling decision from the trace id.
+export const newTraceparent = () => {
+    const hex = (bytes: number) => Array.from(crypto.getRandomValues(new Uint8Array(bytes)))
+        .map(b => b.toString(16).padStart(2, '0')).join('');
+    return `00-${hex(16)}-${hex(8)}-00`;
+};
+
+// Conversation id for the avatar-service session store — clients send it plus the new entry only.
+export const newSessionId = () => Array.from(crypto.getRandomValues(new Uint8Array(16)))
+    .map(b => b.toString(16).padStart(2, '0')).join('');
+
+const traceHeaders = (traceparent?: string) => (traceparent ? { headers: { traceparent } } : undefined);
+
 export const ai = {
-    analyze: (text: string, history: any[] = []) => api.post('/api/ai/analyze/journal', { text, history }),
+    analyze: (text: string, history: any[] = [], traceparent?: string) =>
+        api.post('/api/ai/analyze/journal', { text, history }, traceHeaders(traceparent)),
+};
+
+export type StreamEvent = { event: string; data: any };
+
+// Server-Sent Events over fetch — EventSource cannot POST a body.
+const postStream = async (url: string, body: any, onEvent: (e: StreamEvent) => void, traceparent?: string) => {
+    const headers: Record<string, string> = { 'Content-Type': 'application/json', Accept: 'text/event-stream' };
+    if (traceparent) headers.traceparent = traceparent;
+    const token = typeof window !== 'undefined' ? localStorage.getItem('token') : null;
+    if (token) headers.Authorization = `Bearer ${token}`;
+
+    const res = await fetch(url, { method: 'POST', headers, body: JSON.stringify(body) });
+    if (!res.ok || !res.body) {
+        const detail = await res.json().then(b => b?.detail, () => null);
+        throw new Error(typeof detail === 'string' ? detail : `Streaming request failed (${res.status})`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let sep: number;
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+            const raw = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            let event = 'message';
+            let data = '';
+            for (const line of raw.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+            if (data) onEvent({ event, data: JSON.parse(data) });
+        }
+    }
 };
 
 export const avatar = {
-    respond: (data: any) => api.post('/api/avatar/respond', data),
+    respond: (data: any, traceparent?: string) => api.post('/api/avatar/respond', data, traceHeaders(traceparent)),
+    // Events: `crisis` (HIGH/CRISIS only, always first), `delta` text chunks, then `done`
+    respondStream: (data: any, onEvent: (e: StreamEvent) => void, traceparent?: string) =>
+        postStream('/api/avatar/respond/stream', data, onEvent, traceparent),
+    // One round trip: `analysis` (full ai-service response) first, then the respondStream events
+    pipelineStream: (data: { text: string; session_id?: string; user_id?: string; language?: string },
+                     onEvent: (e: StreamEvent) => void, traceparent?: string) =>
+        postStream('/api/avatar/pipeline/stream', data, onEvent, traceparent),
 };
 
 export const analytics = {
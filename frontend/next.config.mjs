@@ -7,7 +7,9 @@ const nextConfig = {
     },
     async rewrites() {
         return [
-            { source: '/api/ai/:path*', destination: 'http://127.0.0.1:8000/:path*' },
+            // Public ai-service routes only — /admin and /metrics stay internal
+            { source: '/api/ai/analyze/:path*', destination: 'http://127.0.0.1:8000/analyze/:path*' },
+            { source: '/api/ai/health/:path*', destination: 'http://127.0.0.1:8000/health/:path*' },
             { source: '/api/avatar/:path*', destination: 'http://127.0.0.1:8001/avatar/:path*' }
         ];
     }
@@ -0,0 +1,279 @@
+"""
+SereneMind — Synthetic Journal Corpus Generator
+===============================================
+Builds large, seeded corpora of journal-like entries for capacity testing
+without touching real user data. Sentences come from the repo's own fixtures:
+
+  - ``CLINICAL_SEED``        per-class example sentences   (training/train_unified_v3.py)
+  - ``LONG_TEXT_TESTS``      long narrative entries, split into sentences
+  - ``TAXONOMY_GUIDELINES``  Level 1-4 crisis taxonomy examples (ai-service config)
+
+The fixtures are read with ``ast`` so neither the training stack nor the
+service settings need to be importable.
+
+Controls: length distribution (log-normal, clipped), class mix, crisis
+prevalence, and exact / near-duplicate rates so response caches see a
+realistic hit ratio. Output streams to NDJSON (optionally gzip'd) or Parquet.
+
+Run:
+    python ml/data/synth_corpus.py --n 1000000 --out ml/data/synth/corpus.ndjson.gz
+    python ml/data/synth_corpus.py --n 200000 --crisis-rate 0.02 --dup-rate 0.2 --out corpus.parquet
+"""
+
+import argparse
+import ast
+import gzip
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional; NDJSON needs only the stdlib
+    pa = pq = None
+
+REPO          = Path(__file__).resolve().parents[2]
+TRAIN_SCRIPT  = REPO / "ml" / "training" / "train_unified_v3.py"
+SERVICE_CONF  = REPO / "services" / "ai-service" / "app" / "core" / "config.py"
+
+LABELS = ["depression", "anxiety", "crisis", "stress", "grief", "fear", "anger", "joy", "normal"]
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+# ─── Fixture loading ──────────────────────────────────────────────────────────
+
+def _literal_assignments(path: Path, names: set) -> dict:
+    """Evaluate top-level (or class-level) literal assignments without importing the file."""
+    found = {}
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in names:
+                found[target.id] = ast.literal_eval(value)
+    return found
+
+
+def load_sources() -> Dict[str, List[str]]:
+    """Sentence pools per label, plus ``context`` (hedged, non-crisis emotional sentences)."""
+    train = _literal_assignments(TRAIN_SCRIPT, {"CLINICAL_SEED", "LONG_TEXT_TESTS"})
+    conf  = _literal_assignments(SERVICE_CONF, {"TAXONOMY_GUIDELINES"})
+
+    pools = {label: list(dict.fromkeys(train["CLINICAL_SEED"].get(label, []))) for label in LABELS}
+    for label, text in train["LONG_TEXT_TESTS"]:
+        pools[label].extend(s for s in _SENTENCE_RE.split(text) if len(s) > 20)
+
+    taxonomy = conf["TAXONOMY_GUIDELINES"]
+    pools["context"] = list(taxonomy["Level 1"]["examples"])            # emotional, not crisis
+    pools["crisis"].extend(taxonomy["Level 2"]["examples"] + taxonomy["Level 3"]["examples"])
+    pools["joy"].extend(taxonomy["Level 4"]["examples"])                # positive confounders
+    return pools
+
+
+# ─── Generation ───────────────────────────────────────────────────────────────
+
+@dataclass
+class CorpusConfig:
+    seed: int = 42
+    crisis_rate: float = 0.05                 # share of entries labelled crisis
+    class_mix: Dict[str, float] = field(default_factory=lambda: {l: 1.0 for l in LABELS if l != "crisis"})
+    length_median: int = 280                  # characters
+    length_sigma: float = 1.0                 # log-normal spread
+    min_chars: int = 20
+    max_chars: int = 10_000
+    signal_share: float = 0.5                 # fraction of sentences drawn from the entry's class
+    dup_rate: float = 0.05                    # exact repeats of an earlier entry
+    near_dup_rate: float = 0.10               # lightly perturbed repeats
+    reservoir_size: int = 10_000              # earlier entries eligible for repetition
+
+
+_OPENERS = ["Today", "Last night", "This morning", "Lately", "This week", "Tonight", "Again today"]
+_SWAPS   = {"I am": "I'm", "I have": "I've", "do not": "don't", "cannot": "can't",
+            "very": "really", "today": "tonight", "feel": "am feeling"}
+
+
+class CorpusGenerator:
+
+    def __init__(self, config: CorpusConfig, pools: Optional[Dict[str, List[str]]] = None):
+        self.config    = config
+        self.pools     = pools or load_sources()
+        self.rng       = random.Random(config.seed)
+        self.labels    = [l for l in config.class_mix if l != "crisis" and self.pools.get(l)]
+        self.weights   = [config.class_mix[l] for l in self.labels]
+        self.filler    = self.pools["normal"] + self.pools["context"]
+        self._reservoir: List[dict] = []
+        self._seen     = 0
+
+    def _target_length(self) -> int:
+        c = self.config
+        n = int(self.rng.lognormvariate(0, c.length_sigma) * c.length_median)
+        return max(c.min_chars, min(c.max_chars, n))
+
+    def _compose(self, label: str, target: int) -> str:
+        pool, sentences, size = self.pools[label], [], 0
+        # At least one class sentence, so the label is always supported by the text
+        while size < target or not sentences:
+            source = pool if not sentences or self.rng.random() < self.config.signal_share else self.filler
+            sentence = self.rng.choice(source).strip()
+            if self.rng.random() < 0.15:
+                sentence = f"{self.rng.choice(_OPENERS)} {sentence[0].lower()}{sentence[1:]}"
+            if sentence[-1] not in ".!?":
+                sentence += "."
+            sentences.append(sentence)
+            size += len(sentence) + 1
+        self.rng.shuffle(sentences)
+        return " ".join(sentences)[: self.config.max_chars]
+
+    def _perturb(self, text: str, crisis: bool) -> str:
+        """Near-duplicate: a couple of surface edits that keep the meaning."""
+        # Trimming could cut the crisis phrase itself, so crisis entries are never trimmed
+        edits = self.rng.sample(["swap", "case", "punct", "append"] + ([] if crisis else ["trim"]), 2)
+        for edit in edits:
+            if edit == "swap":
+                old = self.rng.choice([k for k in _SWAPS if k in text] or [None])
+                if old:
+                    text = text.replace(old, _SWAPS[old], 1)
+            elif edit == "case":
+                text = text.lower() if self.rng.random() < 0.5 else text[:1].upper() + text[1:]
+            elif edit == "punct":
+                text = text.rstrip(".!?") + self.rng.choice(["...", "!", " .", ""])
+            elif edit == "trim" and " " in text:
+                text = text.rsplit(" ", 1)[0]
+            elif edit == "append":
+                text = f"{text} {self.rng.choice(self.filler)}"
+        return text
+
+    def _remember(self, entry: dict):
+        # Reservoir sampling keeps a uniform sample of everything emitted so far
+        self._seen += 1
+        if len(self._reservoir) < self.config.reservoir_size:
+            self._reservoir.append(entry)
+        else:
+            j = self.rng.randrange(self._seen)
+            if j < self.config.reservoir_size:
+                self._reservoir[j] = entry
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.generate()
+
+    def generate(self, n: Optional[int] = None) -> Iterator[dict]:
+        c, i = self.config, 0
+        while n is None or i < n:
+            roll = self.rng.random()
+            if self._reservoir and roll < c.dup_rate:
+                src   = self.rng.choice(self._reservoir)
+                entry = {**src, "kind": "exact_dup", "dup_of": src["id"]}
+            elif self._reservoir and roll < c.dup_rate + c.near_dup_rate:
+                src   = self.rng.choice(self._reservoir)
+                entry = {**src, "text": self._perturb(src["text"], src["crisis"]), "kind": "near_dup", "dup_of": src["id"]}
+            else:
+                label = "crisis" if self.rng.random() < c.crisis_rate else \
+                        self.rng.choices(self.labels, self.weights)[0]
+                entry = {"text": self._compose(label, self._target_length()), "label": label,
+                         "crisis": label == "crisis", "kind": "original", "dup_of": None}
+            entry["id"]    = i
+            entry["chars"] = len(entry["text"])
+            if entry["kind"] == "original":
+                self._remember(entry)
+            yield entry
+            i += 1
+
+
+# ─── Writers ──────────────────────────────────────────────────────────────────
+
+COLUMNS = ["id", "text", "label", "crisis", "chars", "kind", "dup_of"]
+
+
+def write_ndjson(entries: Iterator[dict], path: str) -> Iterator[dict]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps({k: entry[k] for k in COLUMNS}, ensure_ascii=False) + "\n")
+            yield entry
+
+
+def write_parquet(entries: Iterator[dict], path: str, batch_size: int = 50_000) -> Iterator[dict]:
+    if pq is None:
+        raise RuntimeError("Parquet output needs pyarrow — pip install pyarrow (or write .ndjson)")
+    schema = pa.schema([("id", pa.int64()), ("text", pa.string()), ("label", pa.string()),
+                        ("crisis", pa.bool_()), ("chars", pa.int32()), ("kind", pa.string()),
+                        ("dup_of", pa.int64())])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+            yield entry
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in LABELS or name == "crisis":
+            raise ValueError(f"class mix label must be one of {[l for l in LABELS if l != 'crisis']}")
+        mix[name] = float(weight)
+    return mix
+
+
+def main(argv=None) -> int:
+    d = CorpusConfig()
+    parser = argparse.ArgumentParser(description="Seeded synthetic journal corpus generator")
+    parser.add_argument("--n", type=int, default=100_000, help="entries to generate")
+    parser.add_argument("--out", required=True, help=".ndjson, .ndjson.gz or .parquet")
+    parser.add_argument("--seed", type=int, default=d.seed)
+    parser.add_argument("--crisis-rate", type=float, default=d.crisis_rate)
+    parser.add_argument("--class-mix", default=None, help="e.g. depression=2,anxiety=2,normal=4 (crisis via --crisis-rate)")
+    parser.add_argument("--length-median", type=int, default=d.length_median)
+    parser.add_argument("--length-sigma", type=float, default=d.length_sigma)
+    parser.add_argument("--min-chars", type=int, default=d.min_chars)
+    parser.add_argument("--max-chars", type=int, default=d.max_chars)
+    parser.add_argument("--signal-share", type=float, default=d.signal_share)
+    parser.add_argument("--dup-rate", type=float, default=d.dup_rate)
+    parser.add_argument("--near-dup-rate", type=float, default=d.near_dup_rate)
+    args = parser.parse_args(argv)
+
+    config = CorpusConfig(
+        seed=args.seed, crisis_rate=args.crisis_rate,
+        class_mix=parse_mix(args.class_mix) if args.class_mix else d.class_mix,
+        length_median=args.length_median, length_sigma=args.length_sigma,
+        min_chars=args.min_chars, max_chars=args.max_chars, signal_share=args.signal_share,
+        dup_rate=args.dup_rate, near_dup_rate=args.near_dup_rate,
+    )
+    Path(args.out).resolve().parent.mkdir(parents=True, exist_ok=True)
+    entries = CorpusGenerator(config).generate(args.n)
+    writer  = write_parquet if args.out.endswith(".parquet") else write_ndjson
+
+    print(f"🧪 Generating {args.n:,} entries (seed={args.seed}) → {args.out}")
+    start, labels, kinds, total_chars = time.time(), Counter(), Counter(), 0
+    for i, entry in enumerate(writer(entries, args.out), 1):
+        labels[entry["label"]] += 1
+        kinds[entry["kind"]]   += 1
+        total_chars            += entry["chars"]
+        if i % 250_000 == 0:
+            print(f"  … {i:,} entries ({i / (time.time() - start):,.0f}/s)")
+
+    print(f"✅ Done in {time.time() - start:.1f}s — mean length {total_chars / max(args.n, 1):.0f} chars")
+    print(f"   classes: {dict(labels.most_common())}")
+    print(f"   kinds:   {dict(kinds)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
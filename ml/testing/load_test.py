@@ -0,0 +1,310 @@
+"""
+SereneMind — Async Load Generator
+=================================
+Drives the ai-service (and optionally the avatar-service) concurrently with
+payloads drawn from ``TEST_TAXONOMY`` at a configurable length mix.
+
+  - open loop:   Poisson arrivals at ``--rate`` req/s; latency is measured from
+                 the *scheduled* send time, so a slow server cannot hide its
+                 queueing (no coordinated omission)
+  - closed loop: ``--concurrency`` virtual users, each sending back-to-back
+  - ``--sweep``:  steps the rate / concurrency up until the saturation knee —
+                 throughput stops tracking load, p99 blows past the low-load
+                 p99 or errors exceed the budget — and reports the last good step
+
+Per taxonomy category and length bucket: throughput, p50/p95/p99/max latency
+and error rate. The report is written to ``ml/reports/load_test_<ts>.json``.
+
+Usage (from the repo root):
+    python ml/testing/load_test.py --mode open --rate 50 --duration 30
+    python ml/testing/load_test.py --mode closed --concurrency 16 --target chain
+    python ml/testing/load_test.py --mode open --sweep 10,25,50,100,200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from taxonomy import TEST_TAXONOMY
+
+AI_URL     = os.getenv("AI_SERVICE_URL", "http://localhost:8000")
+AVATAR_URL = os.getenv("AVATAR_SERVICE_URL", "http://localhost:8001")
+
+# Neutral journal context used to pad category samples up to the target length;
+# the category sample always ends the entry so its signal is preserved.
+_FILLER = [
+    "I woke up early and made coffee before anyone else was awake.",
+    "The bus was late again so I walked part of the way to work.",
+    "We had a long meeting about the new project schedule.",
+    "In the evening I cooked dinner and watched a bit of television.",
+    "My sister called and we talked about her new apartment.",
+    "It rained most of the afternoon and the streets were quiet.",
+]
+
+LENGTH_BUCKETS = {"sentence": 0, "paragraph": 500, "long": 3_000, "xlong": 9_000}
+DEFAULT_LENGTH_MIX = "sentence=0.6,paragraph=0.3,long=0.08,xlong=0.02"
+
+# Representative analysis fields per category for direct avatar-service calls
+_AVATAR_FIELDS = {
+    "Level 1": {"emotion": "sadness", "risk_level": "LOW",    "crisis_probability": 0.05, "mental_state": "depression"},
+    "Level 2": {"emotion": "sadness", "risk_level": "HIGH",   "crisis_probability": 0.55, "mental_state": "crisis"},
+    "Level 3": {"emotion": "fear",    "risk_level": "CRISIS", "crisis_probability": 0.92, "mental_state": "crisis"},
+    "Level 4": {"emotion": "joy",     "risk_level": "LOW",    "crisis_probability": 0.01, "mental_state": "normal"},
+}
+
+
+# ─── Payloads ─────────────────────────────────────────────────────────────────
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in LENGTH_BUCKETS:
+            raise ValueError(f"unknown length bucket '{name}' (choose from {sorted(LENGTH_BUCKETS)})")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def build_text(sample: str, target_chars: int, rng: random.Random) -> str:
+    parts, size = [], len(sample)
+    while size < target_chars:
+        filler = rng.choice(_FILLER)
+        parts.append(filler)
+        size += len(filler) + 1
+    return " ".join(parts + [sample])
+
+
+class PayloadSource:
+    """Draws ``(category, bucket, text)`` uniformly over categories and by ``mix`` over lengths."""
+
+    def __init__(self, length_mix: Dict[str, float], seed: int = 0):
+        self.rng        = random.Random(seed)
+        self.categories = list(TEST_TAXONOMY)
+        self.buckets    = list(length_mix)
+        self.weights    = [length_mix[b] for b in self.buckets]
+
+    def next(self):
+        category = self.rng.choice(self.categories)
+        bucket   = self.rng.choices(self.buckets, self.weights)[0]
+        text     = build_text(self.rng.choice(TEST_TAXONOMY[category]), LENGTH_BUCKETS[bucket], self.rng)
+        return category, bucket, text
+
+
+# ─── Requests ─────────────────────────────────────────────────────────────────
+
+async def send(client: httpx.AsyncClient, target: str, category: str, text: str):
+    """One logical request; ``chain`` is analyze followed by avatar respond."""
+    if target in ("ai", "chain"):
+        resp = await client.post(f"{AI_URL}/analyze/journal", json={"text": text, "history": []})
+        resp.raise_for_status()
+        if target == "ai":
+            return
+        u = resp.json()["unified"]
+        fields = {"emotion": u["emotion"], "risk_level": u["crisis_risk"],
+                  "crisis_probability": u["crisis_probability"], "mental_state": u["raw_label"],
+                  "severity_rating": u["severity_rating"], "tags": u["tags"]}
+    else:
+        fields = dict(_AVATAR_FIELDS[category.split(":")[0]])
+    resp = await client.post(f"{AVATAR_URL}/avatar/respond",
+                             json={"journal_text": text, "confidence": 0.8, **fields})
+    resp.raise_for_status()
+
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies = defaultdict(list)   # (category, bucket) -> ms
+        self.errors    = defaultdict(int)
+        self.error_kinds = defaultdict(int)
+
+    async def run(self, client, target, category, bucket, text, start: float):
+        try:
+            await send(client, target, category, text)
+            self.latencies[(category, bucket)].append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            self.errors[(category, bucket)] += 1
+            kind = f"HTTP {e.response.status_code}" if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+            self.error_kinds[kind] += 1
+
+
+async def run_open(target: str, rate: float, duration: float, source: PayloadSource,
+                   max_inflight: int, timeout: float) -> dict:
+    rec, tasks = Recorder(), set()
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        t0 = time.perf_counter()
+        scheduled = t0
+        while scheduled - t0 < duration:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            category, bucket, text = source.next()
+            if len(tasks) >= max_inflight:
+                rec.errors[(category, bucket)] += 1       # client-side shed: server is not keeping up
+                rec.error_kinds["client_inflight_limit"] += 1
+            else:
+                task = asyncio.create_task(rec.run(client, target, category, bucket, text, scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            scheduled += source.rng.expovariate(rate)
+        if tasks:
+            await asyncio.wait(tasks)
+        elapsed = time.perf_counter() - t0
+    return summarize(rec, elapsed, {"mode": "open", "offered_rps": rate})
+
+
+async def run_closed(target: str, concurrency: int, duration: float, source: PayloadSource,
+                     timeout: float) -> dict:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        t0 = time.perf_counter()
+        deadline = t0 + duration
+
+        async def user():
+            while time.perf_counter() < deadline:
+                category, bucket, text = source.next()
+                await rec.run(client, target, category, bucket, text, time.perf_counter())
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return summarize(rec, elapsed, {"mode": "closed", "concurrency": concurrency})
+
+
+# ─── Reporting ────────────────────────────────────────────────────────────────
+
+def _latency_stats(values: List[float], errors: int, elapsed: float) -> dict:
+    total = len(values) + errors
+    row = {"requests": total, "errors": errors,
+           "error_rate": round(errors / total, 4) if total else 0.0,
+           "throughput_rps": round(len(values) / elapsed, 2)}
+    if values:
+        arr = np.asarray(values)
+        row.update({
+            "p50_ms": round(float(np.percentile(arr, 50)), 2),
+            "p95_ms": round(float(np.percentile(arr, 95)), 2),
+            "p99_ms": round(float(np.percentile(arr, 99)), 2),
+            "max_ms": round(float(arr.max()), 2),
+        })
+    return row
+
+
+def summarize(rec: Recorder, elapsed: float, load: dict) -> dict:
+    keys = set(rec.latencies) | set(rec.errors)
+    by_category, by_bucket = defaultdict(lambda: ([], 0)), defaultdict(lambda: ([], 0))
+    for category, bucket in keys:
+        lat, err = rec.latencies.get((category, bucket), []), rec.errors.get((category, bucket), 0)
+        for group, key in ((by_category, category), (by_bucket, bucket)):
+            values, errors = group[key]
+            group[key] = (values + lat, errors + err)
+
+    all_values = [v for vs in rec.latencies.values() for v in vs]
+    return {
+        **load,
+        "elapsed_s":    round(elapsed, 2),
+        "overall":      _latency_stats(all_values, sum(rec.errors.values()), elapsed),
+        "by_category":  {k: _latency_stats(v, e, elapsed) for k, (v, e) in sorted(by_category.items())},
+        "by_length":    {k: _latency_stats(v, e, elapsed) for k, (v, e) in sorted(by_bucket.items())},
+        "error_kinds":  dict(rec.error_kinds),
+    }
+
+
+def find_knee(steps: List[dict], p99_factor: float = 3.0, max_error_rate: float = 0.01,
+              min_gain: float = 0.05) -> Optional[dict]:
+    """
+    Last step before saturation. A step is saturated when its error rate exceeds
+    the budget, its p99 exceeds ``p99_factor`` × the lowest-load p99, or its
+    throughput stops tracking load (open loop: < 90% of offered; closed loop:
+    < ``min_gain`` improvement over the previous step).
+    """
+    if not steps:
+        return None
+    base_p99 = steps[0]["overall"].get("p99_ms")
+    for i, step in enumerate(steps):
+        o = step["overall"]
+        reasons = []
+        if o["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {o['error_rate']:.1%}")
+        if base_p99 and o.get("p99_ms", float("inf")) > p99_factor * base_p99:
+            reasons.append(f"p99 {o.get('p99_ms')}ms > {p99_factor}× {base_p99}ms")
+        if step["mode"] == "open" and o["throughput_rps"] < 0.9 * step["offered_rps"]:
+            reasons.append(f"throughput {o['throughput_rps']} < 90% of offered {step['offered_rps']}")
+        if step["mode"] == "closed" and i > 0 and \
+                o["throughput_rps"] < (1 + min_gain) * steps[i - 1]["overall"]["throughput_rps"]:
+            reasons.append("throughput no longer grows with concurrency")
+        if reasons:
+            return {"knee_index": i - 1,
+                    "last_good": steps[i - 1] if i > 0 else None,
+                    "saturated_at": {k: step[k] for k in ("mode", "offered_rps", "concurrency") if k in step},
+                    "reasons": reasons}
+    return {"knee_index": len(steps) - 1, "last_good": steps[-1], "saturated_at": None,
+            "reasons": ["no saturation within the sweep"]}
+
+
+def print_step(step: dict):
+    load = f"{step['offered_rps']} req/s offered" if step["mode"] == "open" else f"{step['concurrency']} users"
+    o = step["overall"]
+    print(f"\n📊 {load} — {o['throughput_rps']} req/s, p50={o.get('p50_ms')}ms "
+          f"p95={o.get('p95_ms')}ms p99={o.get('p99_ms')}ms max={o.get('max_ms')}ms "
+          f"errors={o['error_rate']:.1%}")
+    for name, row in {**step["by_category"], **step["by_length"]}.items():
+        print(f"   {name:<40} n={row['requests']:<6} p50={row.get('p50_ms')} "
+              f"p95={row.get('p95_ms')} p99={row.get('p99_ms')} max={row.get('max_ms')} "
+              f"err={row['error_rate']:.1%}")
+
+
+async def main(args):
+    source = PayloadSource(parse_mix(args.length_mix), seed=args.seed)
+    levels = [float(x) for x in args.sweep.split(",")] if args.sweep else \
+             [args.rate if args.mode == "open" else args.concurrency]
+
+    steps = []
+    for level in levels:
+        if args.mode == "open":
+            step = await run_open(args.target, level, args.duration, source, args.max_inflight, args.timeout)
+        else:
+            step = await run_closed(args.target, int(level), args.duration, source, args.timeout)
+        print_step(step)
+        steps.append(step)
+
+    report = {"timestamp": time.ctime(), "target": args.target, "length_mix": args.length_mix,
+              "duration_s": args.duration, "steps": steps}
+    if args.sweep:
+        report["knee"] = find_knee(steps, p99_factor=args.knee_p99_factor, max_error_rate=args.max_error_rate)
+        knee = report["knee"]
+        good = knee["last_good"]
+        print(f"\n🎯 Saturation knee: "
+              f"{'none found' if good is None else (good.get('offered_rps') or good.get('concurrency'))} "
+              f"({'; '.join(knee['reasons'])})")
+
+    os.makedirs("ml/reports", exist_ok=True)
+    out = args.out or f"ml/reports/load_test_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SereneMind async load generator")
+    parser.add_argument("--target", choices=("ai", "avatar", "chain"), default="ai")
+    parser.add_argument("--mode", choices=("open", "closed"), default="open")
+    parser.add_argument("--rate", type=float, default=20.0, help="open loop: arrivals per second")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed loop: virtual users")
+    parser.add_argument("--sweep", default=None, help="comma-separated rates / concurrencies to step through")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per step")
+    parser.add_argument("--length-mix", default=DEFAULT_LENGTH_MIX)
+    parser.add_argument("--max-inflight", type=int, default=1000, help="open loop: client-side in-flight cap")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--knee-p99-factor", type=float, default=3.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,190 @@
+"""
+SereneMind — Traffic Replay
+===========================
+Re-issues requests recorded by the ai-service capture mode (``CAPTURE_PATH``)
+against a running service and compares latencies and results with what was
+served when the traffic was captured.
+
+  - ``--speed 1``    original inter-arrival timing
+  - ``--speed N``    N× compressed timing (bursts stay bursts, just shorter)
+  - ``--speed max``  as fast as ``--concurrency`` allows
+
+With ``--speed 1`` / ``N`` latency is measured from each request's scheduled
+send time, so client-side queueing behind ``--concurrency`` counts against
+the service as it would for real arrivals. With ``--speed max`` there is no
+schedule: latency is measured from when a concurrency slot is acquired.
+Result diffs cover the label, risk level, crisis probability, severity and tags.
+
+Usage (from the repo root):
+    python ml/testing/replay.py captures/traffic-*.ndjson.gz --speed 1
+    python ml/testing/replay.py captures/*.gz --speed max --concurrency 32 --model-version 3.2.0
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from typing import List, Optional
+
+import httpx
+import numpy as np
+
+AI_URL = os.getenv("AI_SERVICE_URL", "http://localhost:8000")
+
+
+def load_capture(paths: List[str], limit: Optional[int] = None) -> List[dict]:
+    """Merge capture files (one per worker) into a single arrival-ordered stream."""
+    records = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+            except (EOFError, json.JSONDecodeError):
+                # Capture still being written (or the worker died) — keep what was flushed
+                print(f"⚠️  {path} is truncated; using the complete records only")
+    records.sort(key=lambda r: r["ts"])
+    return records[:limit] if limit else records
+
+
+def diff_result(captured: dict, replayed: dict, prob_tolerance: float) -> dict:
+    diffs = {}
+    for key in ("raw_label", "crisis_risk", "severity_rating"):
+        if captured.get(key) != replayed.get(key):
+            diffs[key] = [captured.get(key), replayed.get(key)]
+    delta = abs((captured.get("crisis_probability") or 0.0) - (replayed.get("crisis_probability") or 0.0))
+    if delta > prob_tolerance:
+        diffs["crisis_probability"] = [captured.get("crisis_probability"), replayed.get("crisis_probability")]
+    if set(captured.get("tags") or []) != set(replayed.get("tags") or []):
+        diffs["tags"] = [captured.get("tags"), replayed.get("tags")]
+    return diffs
+
+
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    arr = np.asarray(values)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        "max_ms": round(float(arr.max()), 2),
+    }
+
+
+async def replay(records: List[dict], speed: Optional[float], concurrency: int,
+                 model_version: Optional[str], prob_tolerance: float, timeout: float) -> dict:
+    results   = [None] * len(records)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits    = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def one(i: int, record: dict, client: httpx.AsyncClient, scheduled: Optional[float]):
+        payload = dict(record["req"])
+        if model_version is not None:
+            payload["model_version"] = model_version
+        async with semaphore:
+            # --speed max: every task is created up front, so time from the slot, not creation
+            if scheduled is None:
+                scheduled = time.perf_counter()
+            try:
+                resp = await client.post(f"{AI_URL}/analyze/journal", json=payload)
+                resp.raise_for_status()
+                replayed = resp.json()["unified"]
+                results[i] = {"ms": (time.perf_counter() - scheduled) * 1000,
+                              "diff": diff_result(record["res"], replayed, prob_tolerance),
+                              "res": {k: replayed.get(k) for k in record["res"]}}
+            except Exception as e:
+                kind = f"HTTP {e.response.status_code}" if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+                results[i] = {"error": kind}
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        t0, first_ts, tasks = time.perf_counter(), records[0]["ts"], []
+        for i, record in enumerate(records):
+            scheduled = None
+            if speed is not None:
+                scheduled = t0 + (record["ts"] - first_ts) / speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i, record, client, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - t0
+
+    return summarize(records, results, elapsed)
+
+
+def summarize(records: List[dict], results: List[dict], elapsed: float) -> dict:
+    ok        = [(rec, res) for rec, res in zip(records, results) if res and "ms" in res]
+    errors    = Counter(res["error"] for res in results if res and "error" in res)
+    fields    = Counter(k for _, res in ok for k in res["diff"])
+    risk_moves = Counter(f"{rec['res']['crisis_risk']}->{res['res']['crisis_risk']}"
+                         for rec, res in ok if "crisis_risk" in res["diff"])
+    changed   = [{"ts": rec["ts"], "chars": len(rec["req"]["text"]), "diff": res["diff"]}
+                 for rec, res in ok if res["diff"]]
+    captured_span = records[-1]["ts"] - records[0]["ts"] if len(records) > 1 else 0.0
+
+    return {
+        "requests":          len(records),
+        "completed":         len(ok),
+        "errors":            dict(errors),
+        "captured_span_s":   round(captured_span, 2),
+        "replay_elapsed_s":  round(elapsed, 2),
+        "throughput_rps":    round(len(ok) / elapsed, 2) if elapsed else None,
+        "latency": {
+            "captured": _percentiles([rec["ms"] for rec, _ in ok]),
+            "replayed": _percentiles([res["ms"] for _, res in ok]),
+        },
+        "diffs": {
+            "changed_requests": len(changed),
+            "changed_rate":     round(len(changed) / len(ok), 4) if ok else None,
+            "by_field":         dict(fields),
+            "risk_transitions": dict(risk_moves),
+            "examples":         changed[:50],
+        },
+    }
+
+
+async def main(args):
+    records = load_capture(args.captures, args.limit)
+    if not records:
+        print("❌ No captured requests found")
+        return
+    speed = None if args.speed == "max" else float(args.speed)
+    print(f"🔁 Replaying {len(records)} requests at {args.speed}{'' if speed is None else '×'} speed → {AI_URL}")
+
+    report = await replay(records, speed, args.concurrency, args.model_version,
+                          args.prob_tolerance, args.timeout)
+    report.update({"timestamp": time.ctime(), "captures": args.captures, "speed": args.speed,
+                   "model_version": args.model_version})
+
+    lat = report["latency"]
+    print(f"📊 {report['completed']}/{report['requests']} ok, {report['throughput_rps']} req/s | "
+          f"captured p50/p99={lat['captured']['p50_ms']}/{lat['captured']['p99_ms']}ms → "
+          f"replayed p50/p99={lat['replayed']['p50_ms']}/{lat['replayed']['p99_ms']}ms")
+    print(f"🔍 Result changes: {report['diffs']['changed_requests']} "
+          f"({report['diffs']['by_field']}) risk transitions: {report['diffs']['risk_transitions']}")
+
+    os.makedirs("ml/reports", exist_ok=True)
+    out = args.out or f"ml/reports/replay_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Report saved to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured ai-service traffic")
+    parser.add_argument("captures", nargs="+", help="capture files (.ndjson or .ndjson.gz)")
+    parser.add_argument("--speed", default="1", help="1 = real time, N = N× faster, max = unthrottled")
+    parser.add_argument("--concurrency", type=int, default=64, help="maximum requests in flight")
+    parser.add_argument("--model-version", default=None, help="pin a registered model for the replay")
+    parser.add_argument("--prob-tolerance", type=float, default=0.01,
+                        help="crisis probability changes below this are not counted as diffs")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,224 @@
+"""
+Concurrency governor
+====================
+Keeps uvicorn workers × inference executor threads × native BLAS/OpenMP
+threads within the CPUs actually available to the container, so
+``predict_proba`` and calibration do not oversubscribe small hosts.
+
+Must be applied before NumPy / SciPy are imported — ``main.py`` calls
+``apply_concurrency_plan()`` ahead of the model imports.
+
+Benchmark mode sweeps configurations on the current host:
+
+    cd services/ai-service
+    PYTHONPATH=. python -m app.core.concurrency --benchmark --duration 5
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+# Environment variables read by the native thread pools at library load time
+NATIVE_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+@dataclass
+class ConcurrencyPlan:
+    cpus: int                 # CPUs available after affinity and cgroup limits
+    cpu_source: str           # where the CPU limit came from
+    workers: int              # uvicorn worker processes
+    executor_threads: int     # max inference threads per worker process
+    native_threads: int       # BLAS / OpenMP threads per inference call
+
+    def as_dict(self) -> dict:
+        return {**asdict(self),
+                "total_threads": self.workers * self.executor_threads * self.native_threads}
+
+
+# ─── CPU detection ────────────────────────────────────────────────────────────
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota in cores from cgroup v2 ``cpu.max`` or v1 CFS files, if limited."""
+    v2 = _read("/sys/fs/cgroup/cpu.max")
+    if v2:
+        quota, _, period = v2.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    quota  = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def detect_cpus() -> tuple:
+    """Return ``(cpus, source)`` honouring scheduler affinity and cgroup quotas."""
+    try:
+        cpus, source = len(os.sched_getaffinity(0)), "affinity"
+    except AttributeError:  # not available on macOS
+        cpus, source = os.cpu_count() or 1, "cpu_count"
+
+    quota = _cgroup_cpu_limit()
+    if quota is not None and math.ceil(quota) < cpus:
+        cpus, source = max(1, math.ceil(quota)), "cgroup"
+    return cpus, source
+
+
+# ─── Planning ─────────────────────────────────────────────────────────────────
+
+def plan_concurrency(workers: int = 0, executor_threads: int = 0,
+                     native_threads: int = 0) -> ConcurrencyPlan:
+    """
+    Size each layer; ``0`` means auto. Auto mode gives every CPU to one
+    single-threaded inference slot — the TF-IDF + LogisticRegression path is
+    too small per call for intra-op BLAS parallelism to pay off.
+    """
+    cpus, source = detect_cpus()
+    native  = native_threads or 1
+    workers = workers or max(1, min(2, cpus // native))
+    threads = executor_threads or max(1, cpus // (workers * native))
+    return ConcurrencyPlan(cpus=cpus, cpu_source=source, workers=workers,
+                           executor_threads=threads, native_threads=native)
+
+
+def apply_native_threads(n: int):
+    """Cap native thread pools — env vars for libraries not yet loaded, threadpoolctl for the rest."""
+    for var in NATIVE_THREAD_ENV_VARS:
+        os.environ[var] = str(n)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=n)
+    except ImportError:
+        pass
+
+
+def apply_concurrency_plan() -> ConcurrencyPlan:
+    from app.core.config import settings
+
+    plan = plan_concurrency(settings.WORKERS, settings.EXECUTOR_THREADS, settings.NATIVE_THREADS)
+    apply_native_threads(plan.native_threads)
+    return plan
+
+
+def native_thread_pools() -> list:
+    """Currently loaded native thread pools as reported by threadpoolctl."""
+    try:
+        from threadpoolctl import threadpool_info
+    except ImportError:
+        return []
+    return [
+        {"api": p.get("internal_api"), "num_threads": p.get("num_threads"), "library": p.get("prefix")}
+        for p in threadpool_info()
+    ]
+
+
+# ─── Benchmark mode ───────────────────────────────────────────────────────────
+
+def _bench_worker(model_path: str, threads: int, native: int, duration: float, start_at: float, out):
+    """Child process: run ``threads`` inference loops until ``duration`` elapses."""
+    apply_native_threads(native)
+
+    from concurrent.futures import ThreadPoolExecutor
+    from app.models.unified_model import UnifiedMentalHealthAnalyzer
+    from app.utils.warmup import PROBE_TEXTS
+
+    analyzer = UnifiedMentalHealthAnalyzer(model_path=model_path, instrument=False)
+    texts    = [t for group in PROBE_TEXTS.values() for t in group]
+    for text in texts:
+        analyzer.predict(text)
+
+    def loop(offset: int):
+        latencies, i = [], offset
+        deadline = start_at + duration
+        while time.time() < start_at:
+            time.sleep(0.001)
+        while time.time() < deadline:
+            t0 = time.perf_counter()
+            analyzer.predict(texts[i % len(texts)])
+            latencies.append((time.perf_counter() - t0) * 1000)
+            i += 1
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(loop, range(threads)))
+    out.put([ms for r in results for ms in r])
+
+
+def benchmark(duration: float = 5.0, model_path: Optional[str] = None) -> dict:
+    """Sweep workers × threads × native threads (bounded by 2× CPUs) and rank by throughput."""
+    import multiprocessing as mp
+    import numpy as np
+    from app.core.config import settings
+
+    model_path   = model_path or settings.UNIFIED_MODEL_PATH
+    cpus, source = detect_cpus()
+    levels       = sorted({1, 2, cpus})
+    ctx          = mp.get_context("spawn")  # children must set thread env vars before NumPy loads
+
+    results = []
+    for workers in levels:
+        for threads in levels:
+            for native in levels:
+                if workers * threads * native > 2 * cpus:
+                    continue
+                out      = ctx.Queue()
+                start_at = time.time() + 3.0 + workers  # allow children to load the model
+                procs    = [ctx.Process(target=_bench_worker,
+                                        args=(model_path, threads, native, duration, start_at, out))
+                            for _ in range(workers)]
+                for p in procs:
+                    p.start()
+                latencies = np.array([ms for _ in procs for ms in out.get()])
+                for p in procs:
+                    p.join()
+                row = {
+                    "workers":          workers,
+                    "executor_threads": threads,
+                    "native_threads":   native,
+                    "throughput_rps":   round(len(latencies) / duration, 1),
+                    "p50_ms":           round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+                    "p95_ms":           round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+                }
+                results.append(row)
+                print(f"  workers={workers} threads={threads} native={native} → "
+                      f"{row['throughput_rps']} req/s, p95={row['p95_ms']}ms")
+
+    results.sort(key=lambda r: r["throughput_rps"], reverse=True)
+    return {"cpus": cpus, "cpu_source": source, "duration_s": duration,
+            "best": results[0] if results else None, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SereneMind AI concurrency governor")
+    parser.add_argument("--benchmark", action="store_true", help="sweep configurations on this host")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per configuration")
+    parser.add_argument("--model-path", default=None)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        report = benchmark(duration=args.duration, model_path=args.model_path)
+        print(json.dumps(report, indent=2))
+    else:
+        from app.core.config import settings
+        plan = plan_concurrency(settings.WORKERS, settings.EXECUTOR_THREADS, settings.NATIVE_THREADS)
+        print(json.dumps(plan.as_dict(), indent=2))
@@ -5,6 +5,24 @@ class Settings(BaseSettings):
     # API Settings
     PROJECT_NAME: str = "SereneMind AI Service"
     DEBUG: bool = False
+
+    # Logging — queued JSON records; high-volume info events are sampled per event name
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: dict = {"bridge_tier3": 0.10}
+
+    # Concurrency governor — 0 = auto-size from available CPUs (cgroup-aware)
+    WORKERS: int = 0
+    EXECUTOR_THREADS: int = 0
+    NATIVE_THREADS: int = 0
+
+    # Adaptive inference pool — grows toward EXECUTOR_THREADS under queueing
+    INFERENCE_MIN_THREADS: int = 1
+    INFERENCE_TARGET_WAIT_MS: float = 20.0
+    INFERENCE_SCALE_TICK_S: float = 0.25
+    INFERENCE_SCALE_UP_TICKS: int = 2          # consecutive congested ticks before growing
+    INFERENCE_SCALE_DOWN_TICKS: int = 40       # consecutive idle ticks before shrinking
     
     # Model Paths
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
@@ -14,11 +32,49 @@ class Settings(BaseSettings):
     UNIFIED_MODEL_PATH: str = os.path.join(ML_MODELS_DIR, "unified_mental_health.joblib")
     USE_UNIFIED_MODEL: bool = True
 
+    # Model pool — extra bundles served side by side with the default one
+    DEFAULT_MODEL_VERSION: str = "4.0.0"       # served from UNIFIED_MODEL_PATH, never evicted
+    MODEL_REGISTRY: dict = {}                  # {"3.2.0": "/models/unified_v3.joblib", ...}
+    MODEL_LANGUAGE_ROUTES: dict = {}           # {"ur": "4.0.0-ur", ...}
+    MODEL_POOL_MEMORY_BUDGET_MB: float = 1024.0
+
     # Legacy 3-model paths (fallback if unified model not found)
     EMOTION_MODEL_PATH: str = os.path.join(ML_MODELS_DIR, "lightweight_emotion.joblib")
     CRISIS_MODEL_PATH: str = os.path.join(ML_MODELS_DIR, "lightweight_crisis.joblib")
     MH_MODEL_PATH: str = os.path.join(ML_MODELS_DIR, "lightweight_mental_health.joblib")
 
+    # Startup warm-up & readiness — not ready until warm-up p95 is within budget
+    WARMUP_ROUNDS: int = 3
+    READINESS_P95_BUDGET_MS: float = 50.0
+    WARMUP_RETRY_INTERVAL_S: float = 30.0      # re-measure while failed / over budget
+
+    # /admin endpoints — disabled (404) until a token is set, then require it in X-Admin-Token
+    ADMIN_TOKEN: str = ""
+
+    # On-demand request profiler (/admin/profile) — off by default
+    PROFILER_ENABLED: bool = False
+    PROFILER_MAX_DURATION_S: float = 60.0
+    PROFILER_MIN_INTERVAL_S: float = 300.0     # at most one session per interval
+
+    # Request tracing (W3C traceparent) — spans go to the in-process buffer and/or a JSONL file
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_BUFFER_SIZE: int = 2000
+
+    # Shadow evaluation — candidate bundle scored off the request path (empty = disabled)
+    SHADOW_MODEL_PATH: str = ""
+    SHADOW_SAMPLE_RATE: float = 0.10
+    SHADOW_QUEUE_SIZE: int = 256
+
+    # Traffic capture for offline replay (empty = disabled); "{pid}" is replaced per worker
+    CAPTURE_PATH: str = ""
+    CAPTURE_SAMPLE_RATE: float = 1.0
+    CAPTURE_REDACTORS: list = ["hash_user_id", "mask_pii"]
+    CAPTURE_QUEUE_SIZE: int = 4096
+
+    # Collapse identical analyses that are in flight at the same moment into one inference
+    SINGLEFLIGHT_ENABLED: bool = True
+
     # Crisis Sensitivity Thresholds (Aggressive for Recall)
     THRESHOLD_CRISIS: float = 0.60    # Lowered from 0.65
     THRESHOLD_HIGH: float = 0.35      # Lowered from 0.40
@@ -0,0 +1,135 @@
+"""
+SereneMind — Model Pool
+=======================
+Serves several unified model bundles side by side (audit replays of previous
+versions, per-locale variants, experiments).
+
+  - Bundles are loaded lazily on first use
+  - Each loaded bundle's resident footprint is estimated after loading
+  - When the total exceeds the memory budget, the least-recently-used bundle
+    is evicted (the default bundle is pinned and never evicted)
+  - Requests are routed by explicit version, then by language, then default
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.models.unified_model import UnifiedMentalHealthAnalyzer
+from app.utils.memory import MB, estimate_nbytes
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownModelError(KeyError):
+    """Raised when a request names a model version that is not registered."""
+
+
+class ModelPool:
+
+    def __init__(self, registry: Dict[str, str], default_version: str,
+                 language_routes: Optional[Dict[str, str]] = None,
+                 memory_budget_mb: float = 1024.0):
+        if default_version not in registry:
+            raise ValueError(f"Default model '{default_version}' missing from registry")
+        for lang, version in (language_routes or {}).items():
+            if version not in registry:
+                raise ValueError(f"Language route '{lang}' points at unknown model '{version}'")
+
+        self.registry         = dict(registry)
+        self.default_version  = default_version
+        self.language_routes  = {k.lower(): v for k, v in (language_routes or {}).items()}
+        self.memory_budget    = int(memory_budget_mb * MB)
+
+        self._models: "OrderedDict[str, UnifiedMentalHealthAnalyzer]" = OrderedDict()
+        self._nbytes: Dict[str, int] = {}
+        self._lock         = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {v: threading.Lock() for v in registry}
+        self.loads         = 0
+        self.evictions     = 0
+
+    # ── Routing ─────────────────────────────────────────────────────────────
+    def resolve(self, version: Optional[str] = None, language: Optional[str] = None) -> str:
+        if version:
+            if version not in self.registry:
+                raise UnknownModelError(version)
+            return version
+        if language and language.lower() in self.language_routes:
+            return self.language_routes[language.lower()]
+        return self.default_version
+
+    def get(self, version: Optional[str] = None,
+            language: Optional[str] = None) -> Tuple[str, UnifiedMentalHealthAnalyzer]:
+        """Return ``(served_version, analyzer)``, loading the bundle if needed."""
+        name = self.resolve(version, language)
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                self._models.move_to_end(name)
+                return name, model
+
+        # Load outside the pool lock so other bundles keep serving
+        with self._load_locks[name]:
+            with self._lock:
+                model = self._models.get(name)
+                if model is not None:
+                    self._models.move_to_end(name)
+                    return name, model
+
+            logger.info(f"📦 Loading model '{name}' from {self.registry[name]} ...")
+            model  = UnifiedMentalHealthAnalyzer(model_path=self.registry[name])
+            nbytes = estimate_nbytes(model)
+
+            with self._lock:
+                self._models[name] = model
+                self._nbytes[name] = nbytes
+                self.loads += 1
+                self._evict_over_budget(keep=name)
+            logger.info(f"✅ Model '{name}' resident (~{nbytes / MB:.1f} MB)")
+            return name, model
+
+    # ── Eviction ────────────────────────────────────────────────────────────
+    def _evict_over_budget(self, keep: str):
+        """Drop LRU bundles until within budget. Caller holds ``self._lock``."""
+        for name in list(self._models):
+            if self.resident_bytes() <= self.memory_budget:
+                return
+            if name in (keep, self.default_version):
+                continue
+            del self._models[name]
+            freed = self._nbytes.pop(name)
+            self.evictions += 1
+            logger.info(f"♻️  Evicted model '{name}' (~{freed / MB:.1f} MB) — memory budget exceeded")
+
+        if self.resident_bytes() > self.memory_budget:
+            logger.warning(
+                f"Model pool over budget ({self.resident_bytes() / MB:.1f} MB > "
+                f"{self.memory_budget / MB:.1f} MB) with only pinned/active models resident"
+            )
+
+    def resident_models(self) -> list:
+        """``(version, analyzer)`` pairs currently loaded, most recently used first."""
+        with self._lock:
+            return list(reversed(self._models.items()))
+
+    def resident_bytes(self) -> int:
+        return sum(self._nbytes.values())
+
+    # ── Reporting ───────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "default_version":  self.default_version,
+                "registered":       sorted(self.registry),
+                "language_routes":  dict(self.language_routes),
+                "resident":         [
+                    {"version": name, "resident_mb": round(self._nbytes[name] / MB, 2)}
+                    for name in reversed(self._models)  # most recently used first
+                ],
+                "resident_mb":      round(self.resident_bytes() / MB, 2),
+                "memory_budget_mb": round(self.memory_budget / MB, 2),
+                "loads":            self.loads,
+                "evictions":        self.evictions,
+            }
@@ -15,7 +15,11 @@ import joblib
 import logging
 import re
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from serenemind_common.crisis_keywords import EXPLICIT_CRISIS_KEYWORDS
+
+from app.utils.metrics import null_stage, record_prediction, stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -72,34 +76,8 @@ DISPLAY_NAMES = {
 }
 
 # ─── Crisis keyword override ──────────────────────────────────────────────────
-# Tier 1: EXPLICIT crisis — these ALWAYS override to CRISIS
-EXPLICIT_CRISIS_KEYWORDS = [
-    # Suicidal ideation — direct
-    "kill myself", "kill my self", "killing myself",
-    "end my life", "end myself", "end my self",
-    "want to die", "wanna die", "going to die",
-    "don't want to live", "do not want to live", "don't wanna live",
-    "no reason to live", "nothing to live for",
-    "better off dead", "better off without me",
-    "suicide", "suicidal",
-    # Method — active intent
-    "hang myself", "hang my self",
-    "overdose", "take pills to die",
-    "jump off", "jump from", "going to jump",
-    "taking my life", "take my life", "take my own life",
-    # Physical self-harm with intent
-    "cut myself", "cutting myself", "slit my wrist",
-    "hurt myself on purpose", "want to hurt myself",
-    "hit myself", "hit my self",
-    "harm myself", "self harm",
-    "shooting myself",
-    # Escape / disappear
-    "disappear forever", "want to disappear",
-    "end it all", "end everything",
-    # Want to be dead
-    "wish i was dead", "wish i were dead",
-    "i am dying", "i will die", "i am going to die",
-]
+# Tier 1: EXPLICIT crisis — EXPLICIT_CRISIS_KEYWORDS (serenemind_common, shared with the
+# avatar prompt builder) ALWAYS override to CRISIS
 
 # Tier 2: HIGH-confidence implicit crisis — indirect intent signals
 IMPLICIT_CRISIS_SIGNALS = [
@@ -212,6 +190,60 @@ def _semantic_summary(label: str, emotion: str, severity: int, confidence: float
     return summaries.get(label, f"Emotional state: {label}, severity {severity}/10.")
 
 
+def _reliability_bridge(text_lower: str, all_scores: dict, top_label: str,
+                        confidence: float) -> Tuple[str, float, float, bool, bool, str]:
+    """
+    Apply the 3-tier keyword reliability bridge on top of the model scores.
+    Mutates ``all_scores`` and returns
+    ``(top_label, confidence, crisis_prob, implicit_crisis, distress_signal, tier)``.
+    """
+    # Tier 1: EXPLICIT crisis keywords → always CRISIS
+    explicit_crisis = any(kw in text_lower for kw in EXPLICIT_CRISIS_KEYWORDS)
+    # Tier 2: Implicit crisis signals → force CRISIS (0.75+ prob)
+    implicit_crisis = any(kw in text_lower for kw in IMPLICIT_CRISIS_SIGNALS)
+    # Tier 3: Elevated distress signals → raise floor to MEDIUM at minimum
+    distress_signal = any(kw in text_lower for kw in DISTRESS_SIGNALS)
+
+    tier = ""
+    if explicit_crisis:
+        logger.info("Reliability bridge Tier 1: explicit crisis keyword → overriding to crisis",
+                    extra={"event": "bridge_tier1", "crisis": True})
+        all_scores["crisis"] = max(all_scores.get("crisis", 0.0), 0.90)
+        top_label  = "crisis"
+        confidence = all_scores["crisis"]
+        tier       = "explicit"
+
+    elif implicit_crisis:
+        logger.info("Reliability bridge Tier 2: implicit crisis signal → overriding to crisis",
+                    extra={"event": "bridge_tier2", "crisis": True})
+        all_scores["crisis"] = max(all_scores.get("crisis", 0.0), 0.75)
+        top_label  = "crisis"
+        confidence = all_scores["crisis"]
+        tier       = "implicit"
+
+    elif distress_signal and top_label == "normal":
+        logger.info("Reliability bridge Tier 3: distress signal → bumping from stable",
+                    extra={"event": "bridge_tier3"})
+        non_normal = {k: v for k, v in all_scores.items() if k != "normal"}
+        if non_normal:
+            best_alt   = max(non_normal, key=lambda k: non_normal[k])
+            top_label  = best_alt
+            confidence = all_scores[best_alt]
+        all_scores["crisis"] = max(all_scores.get("crisis", 0.0), 0.20)
+        tier       = "distress"
+
+    # ─ Crisis probability ─────────────────────────────────────────────────────
+    crisis_prob = all_scores.get("crisis", 0.0)
+    if explicit_crisis:
+        crisis_prob = max(crisis_prob, 0.90)
+    elif implicit_crisis:
+        crisis_prob = max(crisis_prob, 0.75)
+    elif distress_signal:
+        crisis_prob = max(crisis_prob, 0.20)
+
+    return top_label, confidence, crisis_prob, implicit_crisis, distress_signal, tier
+
+
 # ─── Long-Text Chunking ───────────────────────────────────────────────────────
 
 def _chunk_text(text: str, chunk_words: int = 60, overlap_words: int = 20) -> List[str]:
@@ -232,6 +264,41 @@ def _chunk_text(text: str, chunk_words: int = 60, overlap_words: int = 20) -> Li
     return chunks if chunks else [text]
 
 
+# Classes that carry no distress when ranking passages
+_CALM_CLASSES = ("normal", "joy")
+
+
+def _chunk_signals(text: str, n_clean_words: int, chunk_probas: np.ndarray, classes: List[str],
+                   chunk_words: int = 60, overlap_words: int = 20) -> List[Dict]:
+    """
+    Distress signal per chunk, mapped back onto character spans of the original
+    text so the avatar prompt builder can keep the highest-signal passages
+    verbatim. ``signal`` is 1 − P(calm classes) + P(crisis); ``crisis`` marks
+    spans containing an explicit crisis keyword. Spans are approximate where
+    cleaning merged or split words. Empty for single-chunk texts.
+    """
+    if len(chunk_probas) < 2:
+        return []
+    spans  = [m.span() for m in re.finditer(r"\S+", text)]
+    scale  = len(spans) / max(1, n_clean_words)
+    calm   = [classes.index(c) for c in _CALM_CLASSES if c in classes]
+    crisis = classes.index("crisis") if "crisis" in classes else None
+    step   = chunk_words - overlap_words
+    signals = []
+    for k, proba in enumerate(chunk_probas):
+        first = min(len(spans) - 1, int(k * step * scale))
+        last  = min(len(spans), max(first + 1, round((k * step + chunk_words) * scale))) - 1
+        start, end = spans[first][0], spans[last][1]
+        signal = 1.0 - float(proba[calm].sum()) + (float(proba[crisis]) if crisis is not None else 0.0)
+        signals.append({
+            "start":  start,
+            "end":    end,
+            "signal": round(signal, 4),
+            "crisis": any(kw in text[start:end].lower() for kw in EXPLICIT_CRISIS_KEYWORDS),
+        })
+    return signals
+
+
 class UnifiedMentalHealthAnalyzer:
     """
     Unified model for full mental health semantic analysis.
@@ -251,11 +318,15 @@ class UnifiedMentalHealthAnalyzer:
         "requires_immediate_action": True,
         "semantic_summary":          "Text reflects...",
         "triggered_by":              "unified_model",
+        "chunk_signals":             [{"start": 0, "end": 412, "signal": 1.31, "crisis": False}, ...],
     }
     """
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, instrument: bool = True):
         self.model_path = model_path
+        # Per-stage metrics; disabled for shadow / offline copies of the model
+        self._stage     = stage_timer if instrument else null_stage
+        self.instrument = instrument
         self._load_model()
 
     def _load_model(self):
@@ -285,29 +356,39 @@ class UnifiedMentalHealthAnalyzer:
             logger.error(f"Unified model load failed: {e}")
             raise
 
-    def _predict_proba_raw(self, texts: list) -> np.ndarray:
+    def _predict_proba_raw(self, texts: list, stage=None) -> np.ndarray:
         """Predict calibrated probabilities for a list of clean texts."""
+        stage = stage or self._stage
         if self._use_bundle:
-            X   = self.vectorizer.transform(texts)
-            raw = self.classifier.predict_proba(X)
+            with stage("vectorize"):
+                X   = self.vectorizer.transform(texts)
+            with stage("predict_proba"):
+                raw = self.classifier.predict_proba(X)
             if self.calibrators is not None:
-                cal = np.zeros_like(raw)
-                for i, ir in enumerate(self.calibrators):
-                    cal[:, i] = ir.predict(raw[:, i])
-                row_s = cal.sum(axis=1, keepdims=True)
-                return cal / np.maximum(row_s, 1e-9)
+                with stage("calibrate"):
+                    cal = np.zeros_like(raw)
+                    for i, ir in enumerate(self.calibrators):
+                        cal[:, i] = ir.predict(raw[:, i])
+                    row_s = cal.sum(axis=1, keepdims=True)
+                    return cal / np.maximum(row_s, 1e-9)
             return raw
         else:
-            return self.pipeline.predict_proba(texts)
+            with stage("predict_proba"):
+                return self.pipeline.predict_proba(texts)
 
-    def predict(self, text: str) -> Dict:
+    def predict(self, text: str, instrument: bool = True) -> Dict:
+        """``instrument=False`` keeps synthetic calls (warm-up probes) out of the metrics."""
+        stage = self._stage if instrument else null_stage
         try:
             text_lower = text.lower()
 
             # ── Chunk-and-aggregate for long texts ────────────────────────────
-            chunks       = _chunk_text(_clean(text))
-            clean_chunks = [_clean(c) for c in chunks]
-            chunk_probas = self._predict_proba_raw(clean_chunks)  # shape: (n_chunks, n_classes)
+            with stage("clean"):
+                cleaned = _clean(text)
+            with stage("chunk"):
+                chunks       = _chunk_text(cleaned)
+                clean_chunks = [_clean(c) for c in chunks]
+            chunk_probas = self._predict_proba_raw(clean_chunks, stage)  # shape: (n_chunks, n_classes)
             # Weighted average: later chunks (conclusion) get slightly higher weight
             weights = np.linspace(0.8, 1.2, len(clean_chunks))
             weights /= weights.sum()
@@ -323,43 +404,10 @@ class UnifiedMentalHealthAnalyzer:
             confidence = float(avg_proba[top_idx])
 
             # ─── RELIABILITY BRIDGE — 3 Tiers ────────────────────────────────
-
-            # Tier 1: EXPLICIT crisis keywords → always CRISIS
-            explicit_crisis = any(kw in text_lower for kw in EXPLICIT_CRISIS_KEYWORDS)
-            # Tier 2: Implicit crisis signals → force CRISIS (0.75+ prob)
-            implicit_crisis = any(kw in text_lower for kw in IMPLICIT_CRISIS_SIGNALS)
-            # Tier 3: Elevated distress signals → raise floor to MEDIUM at minimum
-            distress_signal = any(kw in text_lower for kw in DISTRESS_SIGNALS)
-
-            if explicit_crisis:
-                logger.info("Reliability bridge Tier 1: explicit crisis keyword → overriding to crisis")
-                all_scores["crisis"] = max(all_scores.get("crisis", 0.0), 0.90)
-                top_label  = "crisis"
-                confidence = all_scores["crisis"]
-
-            elif implicit_crisis:
-                logger.info("Reliability bridge Tier 2: implicit crisis signal → overriding to crisis")
-                all_scores["crisis"] = max(all_scores.get("crisis", 0.0), 0.75)
-                top_label  = "crisis"
-                confidence = all_scores["crisis"]
-
-            elif distress_signal and top_label == "normal":
-                logger.info("Reliability bridge Tier 3: distress signal → bumping from stable")
-                non_normal = {k: v for k, v in all_scores.items() if k != "normal"}
-                if non_normal:
-                    best_alt   = max(non_normal, key=lambda k: non_normal[k])
-                    top_label  = best_alt
-                    confidence = all_scores[best_alt]
-                all_scores["crisis"] = max(all_scores.get("crisis", 0.0), 0.20)
-
-            # ─ Crisis probability ─────────────────────────────────────────────
-            crisis_prob = all_scores.get("crisis", 0.0)
-            if explicit_crisis:
-                crisis_prob = max(crisis_prob, 0.90)
-            elif implicit_crisis:
-                crisis_prob = max(crisis_prob, 0.75)
-            elif distress_signal:
-                crisis_prob = max(crisis_prob, 0.20)
+            with stage("bridge"):
+                (top_label, confidence, crisis_prob,
+                 implicit_crisis, distress_signal, bridge_tier) = _reliability_bridge(
+                    text_lower, all_scores, top_label, confidence)
 
             # ─ Risk level mapping ─────────────────────────────────────────────
             if crisis_prob >= 0.60:
@@ -372,12 +420,17 @@ class UnifiedMentalHealthAnalyzer:
                 risk_level = "LOW";    requires_action = False
 
             # ─ Severity, tags, summary ────────────────────────────────────────
-            severity = _compute_severity(top_label, crisis_prob, all_scores,
-                                         implicit_crisis=implicit_crisis,
-                                         distress=distress_signal)
-            emotion  = STATE_TO_EMOTION.get(top_label, "neutral")
-            tags     = _get_contextual_tags(top_label, text, all_scores)
-            summary  = _semantic_summary(top_label, emotion, severity, confidence, text)
+            with stage("tags"):
+                severity = _compute_severity(top_label, crisis_prob, all_scores,
+                                             implicit_crisis=implicit_crisis,
+                                             distress=distress_signal)
+                emotion  = STATE_TO_EMOTION.get(top_label, "neutral")
+                tags     = _get_contextual_tags(top_label, text, all_scores)
+                summary  = _semantic_summary(top_label, emotion, severity, confidence, text)
+                signals  = _chunk_signals(text, len(cleaned.split()), chunk_probas, self.classes_)
+
+            if self.instrument and instrument:
+                record_prediction(bridge_tier, risk_level, len(clean_chunks), len(text))
 
             return {
                 "mental_state":              DISPLAY_NAMES.get(top_label, top_label.capitalize()),
@@ -392,6 +445,7 @@ class UnifiedMentalHealthAnalyzer:
                 "requires_immediate_action": requires_action,
                 "semantic_summary":          summary,
                 "triggered_by":              "unified_model",
+                "chunk_signals":             signals,
             }
 
         except Exception as e:
@@ -409,4 +463,5 @@ class UnifiedMentalHealthAnalyzer:
                 "requires_immediate_action": False,
                 "semantic_summary":          "Unable to analyze. Default stable state.",
                 "triggered_by":              "fallback",
+                "chunk_signals":             [],
             }
@@ -0,0 +1,173 @@
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.core.config import settings
+from app.utils.memory import MB, AllocationTracker, model_components, process_memory
+from app.utils.profiler import ProfilerBusy, ProfilerRateLimited
+
+
+async def require_admin_token(request: Request):
+    """Admin endpoints do not exist until ``ADMIN_TOKEN`` is set, then require it in ``X-Admin-Token``."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    x_admin_token = request.headers.get("x-admin-token")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+allocation_tracker = AllocationTracker()
+
+
+@router.get("/shadow")
+async def shadow_stats():
+    """Disagreement and latency statistics for the shadow candidate model."""
+    from main import shadow_evaluator
+    if shadow_evaluator is None:
+        return {"active": False}
+    return shadow_evaluator.stats()
+
+
+@router.get("/capture")
+async def capture_stats():
+    """Traffic capture file, sampling rate and writer counters."""
+    from main import traffic_capture
+    if traffic_capture is None:
+        return {"active": False}
+    return traffic_capture.stats()
+
+
+@router.get("/coalescing")
+async def coalescing_stats():
+    """Single-flight counters for /analyze/journal: leaders, collapsed calls, keys in flight."""
+    from app.routers.analyze import inflight
+    return inflight.stats()
+
+
+@router.get("/models")
+async def model_pool_stats():
+    """Registered and resident model bundles with their estimated footprint."""
+    from main import model_pool
+    if model_pool is None:
+        return {"resident": []}
+    return model_pool.stats()
+
+
+@router.get("/concurrency")
+async def concurrency_config():
+    """Effective worker / executor / native-thread configuration for this process."""
+    from main import concurrency_plan
+    from app.core.concurrency import native_thread_pools
+    return {**concurrency_plan.as_dict(), "native_pools": native_thread_pools()}
+
+
+@router.get("/inference-pool")
+async def inference_pool_stats():
+    """Adaptive inference pool size, queue depth and recent scaling events."""
+    from main import inference_executor
+    if inference_executor is None:
+        return {"workers": 0}
+    return inference_executor.stats()
+
+
+@router.post("/profile")
+async def profile_requests(
+    duration_s:  float = Query(10.0, gt=0),
+    sample_rate: float = Query(0.1, gt=0, le=1),
+    interval_ms: float = Query(5.0, ge=1),
+    top:         int   = Query(20, ge=1, le=200),
+):
+    """Sample live /analyze/journal requests and return collapsed stacks + top functions."""
+    from main import request_profiler
+    if request_profiler is None:
+        raise HTTPException(status_code=403, detail="Profiler disabled (set PROFILER_ENABLED=true)")
+    try:
+        duration_s = request_profiler.start(duration_s, sample_rate, interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ProfilerRateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    while request_profiler.active:
+        await asyncio.sleep(min(0.25, duration_s))
+    return {"duration_s": duration_s, "sample_rate": sample_rate, **request_profiler.report(top)}
+
+
+# ── Memory accounting ──────────────────────────────────────────────────────
+def _model_breakdown(model_pool) -> dict:
+    models = {}
+    for version, analyzer in (model_pool.resident_models() if model_pool else []):
+        components = model_components(analyzer)
+        models[version] = {
+            "total_mb":   round(sum(components.values()) / MB, 2),
+            "components": {k: round(v / MB, 3) for k, v in sorted(components.items(), key=lambda kv: -kv[1])},
+        }
+    return models
+
+
+@router.get("/memory")
+async def memory_report():
+    """Per-component model footprint, process RSS/PSS, and model-pool and queue sizes."""
+    from main import model_pool, inference_executor, shadow_evaluator
+
+    # Walking the vocabularies takes a while — keep it off the event loop
+    models = await asyncio.to_thread(_model_breakdown, model_pool)
+
+    return {
+        "process": process_memory(),
+        "models":  models,
+        # No in-process response cache exists here (app/utils/cache.py is a Redis client, unused)
+        "pools": {
+            "model_pool_resident_mb": model_pool.stats()["resident_mb"] if model_pool else 0,
+            "inference_queue_depth":  inference_executor.stats()["queue_depth"] if inference_executor else 0,
+            "shadow_queue_depth":     shadow_evaluator.stats()["queue_depth"] if shadow_evaluator else 0,
+        },
+        "tracemalloc": {"tracing": allocation_tracker.tracing, "snapshots": allocation_tracker.labels()},
+    }
+
+
+@router.post("/memory/tracemalloc/start")
+async def tracemalloc_start(frames: int = Query(10, ge=1, le=64)):
+    allocation_tracker.start(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.post("/memory/tracemalloc/snapshot")
+async def tracemalloc_snapshot(label: str = Query(..., min_length=1, max_length=64)):
+    # take_snapshot / compare_to walk every traced block — keep them off the event loop
+    try:
+        return await asyncio.to_thread(allocation_tracker.snapshot, label)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/tracemalloc/diff")
+async def tracemalloc_diff(
+    base:     str = Query(...),
+    target:   str = Query(...),
+    top:      int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Allocation growth between two snapshots, largest first."""
+    try:
+        stats = await asyncio.to_thread(allocation_tracker.diff, base, target, top, group_by)
+        return {"base": base, "target": target, "stats": stats}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot: {e}")
+
+
+@router.post("/memory/tracemalloc/stop")
+async def tracemalloc_stop():
+    allocation_tracker.stop()
+    return {"tracing": False}
+
+
+@router.get("/traces")
+async def recent_traces(trace_id: str = Query(None), limit: int = Query(20, ge=1, le=500)):
+    """Recently finished spans from the in-process collector, grouped by trace."""
+    from app.utils.tracing import tracer
+    if tracer.collector is None:
+        return {"sample_rate": tracer.sample_rate, "traces": []}
+    return {"sample_rate": tracer.sample_rate, "traces": tracer.collector.traces(trace_id, limit)}
@@ -1,19 +1,31 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel, Field
 from typing import Optional, List
+import asyncio
+from contextlib import nullcontext
 import time
 import logging
 
+from app.core.config import settings
+from app.utils.metrics import COALESCED_REQUESTS, observe_stage, stage_timer
+from app.utils.tracing import tracer
+from serenemind_common.singleflight import SingleFlight, request_key
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Identical entries submitted concurrently (double-submits, retries) share one inference
+inflight = SingleFlight("analyze", enabled=settings.SINGLEFLIGHT_ENABLED, counter=COALESCED_REQUESTS)
+
 
 # ── Request ─────────────────────────────────────────────────────────────────
 class AnalysisRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=10000)
     user_id: Optional[str] = None
     language: Optional[str] = "en"
-    history: Optional[list] = []
+    history: Optional[list] = []          # deprecated, unused — the avatar-service keeps the conversation
+    session_id: Optional[str] = None
+    model_version: Optional[str] = None   # pin a registered bundle (e.g. audit replays)
 
 
 # ── Response schemas ─────────────────────────────────────────────────────────
@@ -35,6 +47,13 @@ class MentalHealthResult(BaseModel):
     all_scores: dict
 
 
+class ChunkSignal(BaseModel):
+    start: int                          # character span in the submitted text
+    end: int
+    signal: float                       # 1 − P(normal, joy) + P(crisis)
+    crisis: bool                        # span contains an explicit crisis keyword
+
+
 class UnifiedResult(BaseModel):
     """Full unified model output."""
     mental_state: str
@@ -49,6 +68,7 @@ class UnifiedResult(BaseModel):
     requires_immediate_action: bool
     semantic_summary: str
     triggered_by: str
+    chunk_signals: List[ChunkSignal] = []   # long entries only; used to trim the avatar prompt
 
 
 class AnalysisResponse(BaseModel):
@@ -71,15 +91,56 @@ async def analyze_journal_entry(request: AnalysisRequest):
     Uses the single Unified Mental Health Model v4 (LogisticRegression + TF-IDF + 3-tier reliability bridge).
     """
     start_time = time.time()
+    start_perf = time.perf_counter()
 
-    try:
-        from main import unified_analyzer
+    from main import model_pool, shadow_evaluator, inference_executor, request_profiler, traffic_capture
+    from app.models.model_pool import UnknownModelError
 
-        if unified_analyzer is None:
+    try:
+        if model_pool is None:
             raise RuntimeError("Unified model not loaded — please restart the service.")
 
-        result = unified_analyzer.predict(request.text)
+        try:
+            served_version = model_pool.resolve(request.model_version, request.language)
+        except UnknownModelError:
+            raise HTTPException(status_code=404, detail=f"Unknown model version: {request.model_version}")
+
+        submitted    = time.perf_counter()
+        submitted_ns = time.time_ns()
+        predict_ms   = None   # bare predict() time — the boundary the shadow model is timed at
+
+        def _infer():
+            nonlocal predict_ms
+            observe_stage("queue_wait", time.perf_counter() - submitted)
+            tracer.record("queue_wait", submitted_ns, time.time_ns())
+            with stage_timer("model_route"):
+                _, analyzer = model_pool.get(served_version)
+            profiling = request_profiler is not None and request_profiler.active
+            with request_profiler.track() if profiling else nullcontext():
+                predict_start = time.perf_counter()
+                try:
+                    return analyzer.predict(request.text)
+                finally:
+                    predict_ms = (time.perf_counter() - predict_start) * 1000
+
+        span = tracer.current_span()
+        if span is not None:
+            span.set_attribute("model_version", served_version)
+            span.set_attribute("text_chars", len(request.text))
+
+        loop = asyncio.get_running_loop()
+        result, shared = await inflight.do(
+            request_key(request.text, served_version),
+            lambda: loop.run_in_executor(inference_executor, _infer),
+        )
+        if shared and span is not None:
+            span.set_attribute("coalesced", True)
+
+        if shadow_evaluator is not None and not shared and served_version == model_pool.default_version:
+            shadow_evaluator.offer(request.text, result, predict_ms)
 
+        serialize_start = time.perf_counter()
+        serialize_ns    = time.time_ns()
         unified_out = UnifiedResult(
             mental_state              = result["mental_state"],
             raw_label                 = result["raw_label"],
@@ -93,6 +154,7 @@ async def analyze_journal_entry(request: AnalysisRequest):
             requires_immediate_action = result["requires_immediate_action"],
             semantic_summary          = result["semantic_summary"],
             triggered_by              = result["triggered_by"],
+            chunk_signals             = result.get("chunk_signals", []),
         )
 
         # Build backward-compat fields so existing frontend doesn't break
@@ -114,16 +176,27 @@ async def analyze_journal_entry(request: AnalysisRequest):
 
         processing_time = (time.time() - start_time) * 1000
 
-        return AnalysisResponse(
+        response = AnalysisResponse(
             unified            = unified_out,
             emotion            = emotion_compat,
             crisis             = crisis_compat,
             mental_health      = mh_compat,
             processing_time_ms = round(processing_time, 2),
             language_detected  = request.language or "en",
-            model_version      = "4.0.0",
+            model_version      = served_version,
         )
-
+        # Encode here (instead of letting FastAPI re-validate) so serialization is measured
+        body = response.model_dump_json()
+        tracer.record("serialize", serialize_ns, time.time_ns())
+        observe_stage("serialize", time.perf_counter() - serialize_start)
+        observe_stage("total", time.perf_counter() - start_perf)
+        if traffic_capture is not None:
+            traffic_capture.offer(start_time, request.model_dump(), result,
+                                  (time.perf_counter() - start_perf) * 1000, served_version)
+        return Response(content=body, media_type="application/json")
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
@@ -8,7 +9,8 @@ async def health_check():
 
 @router.get("/ready")
 async def readiness_check():
-    from main import emotion_analyzer, crisis_detector
-    if emotion_analyzer and crisis_detector:
-        return {"status": "ready"}
-    return {"status": "not_ready"}, 503
+    from main import unified_analyzer, warmup_state
+    if unified_analyzer is None or warmup_state is None:
+        return JSONResponse({"status": "not_ready", "warmup_status": "pending"}, status_code=503)
+    payload = warmup_state.payload()
+    return JSONResponse(payload, status_code=200 if warmup_state.ready else 503)
@@ -0,0 +1,234 @@
+"""
+Traffic capture
+===============
+Opt-in recording of ``/analyze/journal`` traffic for offline replay
+(``ml/testing/replay.py``). Each record holds the arrival timestamp, the
+request payload after redaction, the served model version, the latency and
+the key result fields, written as gzip'd NDJSON.
+
+The request path only pays for a random draw and a non-blocking ``put_nowait``;
+redaction and I/O run on a background writer thread. I/O errors (full disk,
+unwritable path) are counted and logged, never raised: a failing writer drops
+records rather than stalling requests or shutdown.
+
+Redaction hooks are callables ``payload -> payload | None`` (``None`` drops the
+record). Built-ins are referenced by name; custom hooks as ``"module:function"``.
+"""
+
+import gzip
+import hashlib
+import importlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Redactor = Callable[[dict], Optional[dict]]
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_URL_RE   = re.compile(r"https?://\S+|www\.\S+")
+
+# Result fields kept for replay diffs
+RESULT_FIELDS = ("raw_label", "crisis_risk", "crisis_probability", "severity_rating", "tags")
+
+
+# ─── Redaction hooks ──────────────────────────────────────────────────────────
+
+def hash_user_id(payload: dict) -> dict:
+    if payload.get("user_id"):
+        payload["user_id"] = hashlib.sha256(payload["user_id"].encode()).hexdigest()[:16]
+    return payload
+
+
+def mask_pii(payload: dict) -> dict:
+    def _mask(text: str) -> str:
+        text = _EMAIL_RE.sub("<email>", text)
+        text = _URL_RE.sub("<url>", text)
+        return _PHONE_RE.sub("<phone>", text)
+
+    payload["text"] = _mask(payload["text"])
+    payload["history"] = [
+        {**m, "content": _mask(m["content"])} if isinstance(m, dict) and isinstance(m.get("content"), str) else m
+        for m in payload.get("history") or []
+    ]
+    return payload
+
+
+def drop_history(payload: dict) -> dict:
+    payload["history"] = []
+    return payload
+
+
+REDACTORS = {
+    "hash_user_id": hash_user_id,
+    "mask_pii":     mask_pii,
+    "drop_history": drop_history,
+}
+
+
+def load_redactors(names: Iterable[Union[str, Redactor]]) -> List[Redactor]:
+    hooks = []
+    for name in names:
+        if callable(name):
+            hooks.append(name)
+        elif name in REDACTORS:
+            hooks.append(REDACTORS[name])
+        elif ":" in name:
+            module, _, attr = name.partition(":")
+            hooks.append(getattr(importlib.import_module(module), attr))
+        else:
+            raise ValueError(f"Unknown capture redactor '{name}'")
+    return hooks
+
+
+# ─── Capture ──────────────────────────────────────────────────────────────────
+
+class TrafficCapture:
+    """Background NDJSON writer for sampled request payloads."""
+
+    def __init__(self, path: str, sample_rate: float = 1.0,
+                 redactors: Iterable[Union[str, Redactor]] = ("hash_user_id", "mask_pii"),
+                 queue_size: int = 4096, flush_interval_s: float = 1.0):
+        # One file per worker process — replay merges them by timestamp
+        self.path             = path.format(pid=os.getpid())
+        self.sample_rate      = max(0.0, min(1.0, sample_rate))
+        self.redactors        = load_redactors(redactors)
+        self.flush_interval_s = flush_interval_s
+        self._queue           = queue.Queue(maxsize=queue_size)
+        self._stop            = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.captured = 0
+        self.dropped  = 0
+        self.redacted = 0
+        self.errors   = 0
+
+    # ── Lifecycle ───────────────────────────────────────────────────────────
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        thread = self._thread
+        if thread is None:
+            return
+        # Never block shutdown on a full queue: the writer also watches the stop event
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        self._thread = None
+
+    # ── Request path ────────────────────────────────────────────────────────
+    def offer(self, arrival: float, payload: dict, result: dict,
+              latency_ms: float, model_version: str) -> bool:
+        """Queue one request for capture. Never blocks; returns False if skipped."""
+        if self._thread is None or random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((arrival, payload, result, latency_ms, model_version))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    # ── Writer ──────────────────────────────────────────────────────────────
+    def _redact(self, payload: dict) -> Optional[dict]:
+        for hook in self.redactors:
+            payload = hook(payload)
+            if payload is None:
+                return None
+        return payload
+
+    def _run(self):
+        opener = gzip.open if self.path.endswith(".gz") else open
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            f = opener(self.path, "at", encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Traffic capture disabled, cannot open {self.path}: {e}")
+            self.errors += 1
+            self._thread = None
+            return
+
+        try:
+            last_flush = time.monotonic()
+            while not self._stop.is_set():
+                try:
+                    item = self._queue.get(timeout=self.flush_interval_s)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                due = time.monotonic() - last_flush >= self.flush_interval_s
+                self._io(f, item, flush=due)
+                if due:
+                    last_flush = time.monotonic()
+            # Records queued before stop() are still written (bounded by the queue size)
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item:
+                    self._io(f, item)
+        finally:
+            try:
+                f.close()
+            except OSError as e:
+                logger.warning(f"Traffic capture close failed: {e}")
+                self.errors += 1
+
+    def _io(self, f, item, flush: bool = False):
+        try:
+            if item:
+                self._write(f, *item)
+            if flush:
+                f.flush()
+        except OSError as e:
+            logger.warning(f"Traffic capture write failed, record dropped: {e}")
+            self.errors += 1
+
+    def _write(self, f, arrival, payload, result, latency_ms, model_version):
+        try:
+            payload = self._redact(dict(payload))
+        except Exception as e:
+            logger.warning(f"Capture redaction failed, record dropped: {e}")
+            self.errors += 1
+            return
+        if payload is None:
+            self.redacted += 1
+            return
+        record = {
+            "ts":     round(arrival, 6),
+            "req":    payload,
+            "model":  model_version,
+            "ms":     round(latency_ms, 3),
+            "res":    {k: result.get(k) for k in RESULT_FIELDS},
+        }
+        f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self.captured += 1
+
+    # ── Reporting ───────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        return {
+            "active":      self._thread is not None,
+            "path":        self.path,
+            "sample_rate": self.sample_rate,
+            "queue_depth": self._queue.qsize(),
+            "captured":    self.captured,
+            "dropped":     self.dropped,
+            "redacted":    self.redacted,
+            "errors":      self.errors,
+        }
@@ -0,0 +1,196 @@
+"""
+Adaptive inference pool
+=======================
+A ``concurrent.futures.Executor`` whose thread count grows and shrinks between
+configured bounds based on queue depth and observed service time.
+
+  - Scale up when the estimated queue wait exceeds the target for several
+    consecutive ticks; scale down only after a longer idle streak (hysteresis)
+  - New workers run a warm-up callable before they take any traffic
+  - Every scaling decision is recorded as an event and counted
+"""
+
+import contextvars
+import logging
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_RETIRE = object()   # sentinel: one worker exits when it dequeues this
+
+
+class AdaptiveInferencePool(Executor):
+
+    def __init__(self, min_workers: int = 1, max_workers: int = 4,
+                 warmup: Optional[Callable[[], None]] = None,
+                 target_wait_ms: float = 20.0, tick_s: float = 0.25,
+                 scale_up_ticks: int = 2, scale_down_ticks: int = 40):
+        self.min_workers      = max(1, min_workers)
+        self.max_workers      = max(self.min_workers, max_workers)
+        self.warmup           = warmup
+        self.target_wait_ms   = target_wait_ms
+        self.tick_s           = tick_s
+        self.scale_up_ticks   = scale_up_ticks
+        self.scale_down_ticks = scale_down_ticks
+
+        self._tasks      = queue.Queue()
+        self._lock       = threading.Lock()
+        self._shutdown   = False
+        self._stopping   = threading.Event()   # wakes the scaler on shutdown
+        self._workers    = 0        # started, including warming
+        self._warming    = 0
+        self._busy       = 0
+        self._service_ms = None     # EWMA of task service time
+        self._up_streak  = 0
+        self._down_streak = 0
+        self._seq        = 0
+
+        self.scale_ups   = 0
+        self.scale_downs = 0
+        self.completed   = 0
+        self.events      = deque(maxlen=100)
+
+        for _ in range(self.min_workers):
+            self._spawn()
+        self._scaler = threading.Thread(target=self._scale_loop, name="inference-scaler", daemon=True)
+        self._scaler.start()
+
+    # ── Executor API ────────────────────────────────────────────────────────
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        if self._shutdown:
+            raise RuntimeError("cannot submit after shutdown")
+        future = Future()
+        # Carry the caller's context (e.g. trace spans) onto the worker thread
+        self._tasks.put((future, contextvars.copy_context(), fn, args, kwargs))
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self._lock:
+            self._shutdown = True
+            workers = self._workers
+        self._stopping.set()
+        # _spawn refuses once _shutdown is set, so ``workers`` is final and each gets a sentinel
+        for _ in range(workers):
+            self._tasks.put(_RETIRE)
+        self._scaler.join()
+        if wait:
+            deadline = time.time() + 10
+            while self._workers and time.time() < deadline:
+                time.sleep(0.01)
+
+    # ── Workers ─────────────────────────────────────────────────────────────
+    def _spawn(self) -> bool:
+        """Start one worker; False once shutdown has begun (checked under the lock shutdown takes)."""
+        with self._lock:
+            if self._shutdown:
+                return False
+            self._workers += 1
+            self._warming += 1
+            self._seq     += 1
+            name = f"inference-{self._seq}"
+        threading.Thread(target=self._worker, name=name, daemon=True).start()
+        return True
+
+    def _worker(self):
+        try:
+            if self.warmup is not None:
+                self.warmup()
+        except Exception as e:
+            logger.warning(f"Inference worker warm-up failed: {e}")
+        finally:
+            with self._lock:
+                self._warming -= 1
+
+        while True:
+            item = self._tasks.get()
+            if item is _RETIRE:
+                break
+            future, ctx, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._busy += 1
+            start = time.perf_counter()
+            try:
+                future.set_result(ctx.run(fn, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    self._busy -= 1
+                    self.completed += 1
+                    self._service_ms = (elapsed if self._service_ms is None
+                                        else 0.9 * self._service_ms + 0.1 * elapsed)
+
+        with self._lock:
+            self._workers -= 1
+
+    # ── Scaling ─────────────────────────────────────────────────────────────
+    def _record(self, action: str, before: int, after: int, reason: str):
+        self.events.append({"ts": time.time(), "action": action,
+                            "from": before, "to": after, "reason": reason})
+        logger.info(f"⚖️  Inference pool {action}: {before} → {after} workers ({reason})")
+
+    def _scale_loop(self):
+        while not self._stopping.wait(self.tick_s):
+            self._tick()
+
+    def _tick(self):
+        depth = self._tasks.qsize()
+        with self._lock:
+            if self._shutdown:
+                return
+            workers = self._workers
+            serving = max(1, workers - self._warming)
+            service = self._service_ms or 0.0
+            idle    = workers - self._busy - self._warming
+        est_wait_ms = depth * service / serving
+
+        if depth and (est_wait_ms > self.target_wait_ms or depth > serving):
+            self._up_streak, self._down_streak = self._up_streak + 1, 0
+        elif depth == 0 and idle > 1:
+            self._up_streak, self._down_streak = 0, self._down_streak + 1
+        else:
+            self._up_streak = self._down_streak = 0
+
+        if self._up_streak >= self.scale_up_ticks and workers < self.max_workers:
+            add = sum(self._spawn() for _ in range(
+                min(self.max_workers - workers, max(1, math.ceil(depth / serving) - 1))))
+            if not add:
+                return
+            with self._lock:
+                self.scale_ups += 1
+            self._record("scale_up", workers, workers + add,
+                         f"queue_depth={depth} est_wait={est_wait_ms:.1f}ms")
+            self._up_streak = 0
+
+        elif self._down_streak >= self.scale_down_ticks and workers > self.min_workers:
+            self._tasks.put(_RETIRE)
+            with self._lock:
+                self.scale_downs += 1
+            self._record("scale_down", workers, workers - 1, f"idle_workers={idle}")
+            self._down_streak = 0
+
+    # ── Reporting ───────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers":         self._workers,
+                "warming":         self._warming,
+                "busy":            self._busy,
+                "min_workers":     self.min_workers,
+                "max_workers":     self.max_workers,
+                "queue_depth":     self._tasks.qsize(),
+                "service_ms_ewma": round(self._service_ms, 3) if self._service_ms is not None else None,
+                "completed":       self.completed,
+                "scale_ups":       self.scale_ups,
+                "scale_downs":     self.scale_downs,
+                "recent_events":   list(self.events)[-10:],
+            }
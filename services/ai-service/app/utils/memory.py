@@ -0,0 +1,191 @@
+"""
+Memory accounting helpers: model bundle footprints, process RSS/PSS and
+tracemalloc allocation snapshots.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # scipy ships with scikit-learn, but keep the helper standalone
+    sp = None
+
+MB = 1024 * 1024
+
+
+def estimate_nbytes(obj, _seen: set = None) -> int:
+    """
+    Recursively estimate the in-memory size of an object graph in bytes.
+
+    NumPy arrays and SciPy sparse matrices are counted by their buffer size;
+    containers and plain objects are walked through their items / ``__dict__``.
+    Shared sub-objects are only counted once.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # Views share their base buffer — count the base once
+        if obj.base is not None and isinstance(obj.base, np.ndarray):
+            return sys.getsizeof(obj) + estimate_nbytes(obj.base, _seen)
+        return sys.getsizeof(obj) + obj.nbytes
+    if sp is not None and sp.issparse(obj):
+        return sum(estimate_nbytes(getattr(obj, a), _seen)
+                   for a in ("data", "indices", "indptr", "row", "col") if hasattr(obj, a))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(estimate_nbytes(k, _seen) + estimate_nbytes(v, _seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(estimate_nbytes(i, _seen) for i in obj)
+    if hasattr(obj, "__dict__"):
+        size += estimate_nbytes(vars(obj), _seen)
+    if hasattr(obj, "__slots__"):
+        size += sum(estimate_nbytes(getattr(obj, s), _seen)
+                    for s in obj.__slots__ if hasattr(obj, s))
+    return size
+
+
+# ─── Model component breakdown ────────────────────────────────────────────────
+
+def _vectorizer_components(name: str, vec) -> dict:
+    out = {}
+    if hasattr(vec, "transformer_list"):          # FeatureUnion of TF-IDF vectorizers
+        for sub_name, sub in vec.transformer_list:
+            out.update(_vectorizer_components(f"{name}.{sub_name}", sub))
+        return out
+    seen = set()
+    if hasattr(vec, "vocabulary_"):
+        out[f"{name}.vocabulary"] = estimate_nbytes(vec.vocabulary_, seen)
+    if hasattr(vec, "_tfidf") and hasattr(vec._tfidf, "idf_"):
+        out[f"{name}.idf"] = estimate_nbytes(vec._tfidf.idf_, seen)
+    if getattr(vec, "stop_words_", None):
+        out[f"{name}.stop_words"] = estimate_nbytes(vec.stop_words_, seen)
+    out[f"{name}.other"] = max(0, estimate_nbytes(vec) - sum(out.values()))
+    return out
+
+
+def model_components(analyzer) -> dict:
+    """Estimated bytes per component of a loaded ``UnifiedMentalHealthAnalyzer``."""
+    if not getattr(analyzer, "_use_bundle", False):
+        return {"pipeline": estimate_nbytes(analyzer.pipeline)}
+
+    out = _vectorizer_components("vectorizer", analyzer.vectorizer)
+    clf = analyzer.classifier
+    out["classifier.coef"]      = estimate_nbytes(clf.coef_)
+    out["classifier.intercept"] = estimate_nbytes(clf.intercept_)
+    out["classifier.other"]     = max(0, estimate_nbytes(clf) - out["classifier.coef"] - out["classifier.intercept"])
+    if analyzer.calibrators is not None:
+        out["calibrators"] = estimate_nbytes(analyzer.calibrators)
+    out["label_encoder"] = estimate_nbytes(analyzer.le)
+    return out
+
+
+# ─── Process memory ───────────────────────────────────────────────────────────
+
+def _proc_kb(path: str, fields: tuple) -> dict:
+    out = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    out[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return out
+
+
+def process_memory() -> dict:
+    """RSS / PSS of this worker process in MB (Linux ``/proc``; peak RSS elsewhere)."""
+    status = _proc_kb("/proc/self/status", ("VmRSS", "VmHWM"))
+    smaps  = _proc_kb("/proc/self/smaps_rollup", ("Pss", "Pss_Anon", "Pss_File", "Shared_Clean", "Private_Dirty"))
+    if not status:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        status = {"VmHWM": peak // 1024 if sys.platform == "darwin" else peak}
+    return {
+        "pid":             os.getpid(),
+        "rss_mb":          round(status["VmRSS"] / 1024, 2) if "VmRSS" in status else None,
+        "peak_rss_mb":     round(status["VmHWM"] / 1024, 2) if "VmHWM" in status else None,
+        **{f"{k.lower()}_mb": round(v / 1024, 2) for k, v in smaps.items()},
+    }
+
+
+# ─── Allocation snapshots ─────────────────────────────────────────────────────
+
+class AllocationTracker:
+    """
+    Named tracemalloc snapshots that can be diffed, e.g. before/after a
+    request burst. Tracing costs CPU and memory, so it is only on between
+    ``start()`` and ``stop()``; at most ``max_snapshots`` are retained.
+    ``snapshot`` and ``diff`` are slow on a large heap and meant to run on a
+    worker thread; the snapshot registry is guarded by a lock.
+    """
+
+    def __init__(self, max_snapshots: int = 4):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def snapshot(self, label: str) -> dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        with self._lock:
+            self._snapshots[label] = snap
+            self._snapshots.move_to_end(label)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+            labels = list(self._snapshots)
+        current, peak = tracemalloc.get_traced_memory()
+        return {"label": label, "traced_mb": round(current / MB, 2), "peak_traced_mb": round(peak / MB, 2),
+                "snapshots": labels}
+
+    def diff(self, base: str, target: str, top: int = 25, group_by: str = "lineno") -> list:
+        with self._lock:
+            base_snap, target_snap = self._snapshots[base], self._snapshots[target]
+        stats = target_snap.compare_to(base_snap, group_by)
+        return [
+            {
+                "location":   str(stat.traceback[0]) if stat.traceback else "?",
+                "traceback":  [str(f) for f in stat.traceback] if group_by == "traceback" else None,
+                "size_diff_kb": round(stat.size_diff / 1024, 2),
+                "size_kb":      round(stat.size / 1024, 2),
+                "count_diff":   stat.count_diff,
+                "count":        stat.count,
+            }
+            for stat in stats[:top]
+        ]
+
+    def labels(self) -> list:
+        with self._lock:
+            return list(self._snapshots)
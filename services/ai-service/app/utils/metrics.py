@@ -0,0 +1,157 @@
+"""
+Prometheus metrics for the AI service
+=====================================
+Per-stage latency histograms for the inference path plus counters for
+reliability-bridge tiers, risk levels, chunk counts, text lengths and
+coalesced (single-flight) requests.
+
+Stage timers are pre-bound label children, so an observation costs one
+``perf_counter`` pair and a histogram increment — cheap enough to leave on.
+On sampled requests each stage is also recorded as a trace span.
+
+With several uvicorn workers set ``PROMETHEUS_MULTIPROC_DIR`` so ``/metrics``
+aggregates all worker processes.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.utils.tracing import tracer
+
+# Stages of the analysis path, in execution order
+STAGES = (
+    "model_route",     # model pool lookup / lazy load
+    "queue_wait",      # waiting for an inference worker
+    "clean",           # _clean over the full text
+    "chunk",           # _chunk_text + per-chunk _clean
+    "vectorize",       # vectorizer.transform
+    "predict_proba",   # classifier.predict_proba
+    "calibrate",       # isotonic calibrators + renormalisation
+    "bridge",          # 3-tier keyword reliability bridge
+    "tags",            # severity, contextual tags, summary
+    "serialize",       # pydantic response models + JSON encoding
+    "total",           # whole /analyze/journal handler
+)
+
+STAGE_LATENCY = Histogram(
+    "serenemind_stage_latency_seconds",
+    "Latency of each analysis stage",
+    ["stage"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+             0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+BRIDGE_TRIGGERS = Counter(
+    "serenemind_bridge_triggers_total",
+    "Reliability bridge activations by tier",
+    ["tier"],
+)
+RISK_LEVELS = Counter(
+    "serenemind_risk_level_total",
+    "Analyses by resulting crisis risk level",
+    ["risk_level"],
+)
+CHUNKS_PER_REQUEST = Histogram(
+    "serenemind_chunks_per_request",
+    "Number of text chunks scored per analysis",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 250),
+)
+TEXT_LENGTH_CHARS = Histogram(
+    "serenemind_text_length_chars",
+    "Journal entry length in characters",
+    buckets=(50, 100, 250, 500, 1000, 2000, 5000, 10000),
+)
+COALESCED_REQUESTS = Counter(
+    "serenemind_coalesced_requests_total",
+    "Requests served by another identical in-flight request's computation",
+    ["endpoint"],
+)
+
+_STAGE_CHILDREN = {stage: STAGE_LATENCY.labels(stage) for stage in STAGES}
+_BRIDGE_CHILDREN = {tier: BRIDGE_TRIGGERS.labels(tier) for tier in ("explicit", "implicit", "distress")}
+
+
+def observe_stage(stage: str, seconds: float):
+    _STAGE_CHILDREN[stage].observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Observe the block's latency; also a trace span when the request is sampled."""
+    child = _STAGE_CHILDREN[stage]
+    start = time.perf_counter()
+    with tracer.span(stage):
+        try:
+            yield
+        finally:
+            child.observe(time.perf_counter() - start)
+
+
+@contextmanager
+def null_stage(stage: str):
+    yield
+
+
+def record_prediction(bridge_tier: str, risk_level: str, n_chunks: int, n_chars: int):
+    if bridge_tier:
+        _BRIDGE_CHILDREN[bridge_tier].inc()
+    RISK_LEVELS.labels(risk_level).inc()
+    CHUNKS_PER_REQUEST.observe(n_chunks)
+    TEXT_LENGTH_CHARS.observe(n_chars)
+
+
+# ─── Pool collectors ──────────────────────────────────────────────────────────
+
+class PoolCollector:
+    """Exposes the inference and model pools' own counters at scrape time."""
+
+    def __init__(self, inference_pool=None, model_pool=None):
+        self.inference_pool = inference_pool
+        self.model_pool     = model_pool
+
+    def collect(self):
+        if self.inference_pool is not None:
+            s = self.inference_pool.stats()
+            yield GaugeMetricFamily("serenemind_inference_workers", "Inference worker threads", s["workers"])
+            yield GaugeMetricFamily("serenemind_inference_busy_workers", "Inference workers serving", s["busy"])
+            yield GaugeMetricFamily("serenemind_inference_queue_depth", "Queued inference tasks", s["queue_depth"])
+            events = CounterMetricFamily("serenemind_inference_scaling_events",
+                                         "Inference pool scaling decisions", labels=["direction"])
+            events.add_metric(["up"], s["scale_ups"])
+            events.add_metric(["down"], s["scale_downs"])
+            yield events
+        if self.model_pool is not None:
+            s = self.model_pool.stats()
+            yield GaugeMetricFamily("serenemind_model_pool_resident_bytes", "Estimated resident model bytes",
+                                    s["resident_mb"] * 1024 * 1024)
+            yield CounterMetricFamily("serenemind_model_pool_loads", "Model bundle loads", s["loads"])
+            yield CounterMetricFamily("serenemind_model_pool_evictions", "Model bundle evictions", s["evictions"])
+
+
+_pool_collector = PoolCollector()
+REGISTRY.register(_pool_collector)
+
+
+def bind_pools(inference_pool=None, model_pool=None):
+    _pool_collector.inference_pool = inference_pool
+    _pool_collector.model_pool     = model_pool
+
+
+def render_latest() -> tuple:
+    """Return ``(body, content_type)`` for the ``/metrics`` endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
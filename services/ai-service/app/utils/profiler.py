@@ -0,0 +1,148 @@
+"""
+On-demand sampling profiler
+===========================
+Profiles a sampled fraction of live ``/analyze/journal`` requests for a bounded
+window. A background thread samples the stacks of the inference threads that
+are currently serving a tracked request and aggregates them into collapsed
+stacks (flamegraph input) and a top-N function table.
+
+When no session is running the request path only reads ``profiler.active``.
+Counters and the tracked-thread set are shared between request threads, the
+sampler and ``report()``, so they are only touched under ``_lock``; stacks are
+walked outside it.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+
+class ProfilerError(Exception):
+    """Base error for profiling sessions that cannot be started."""
+
+
+class ProfilerBusy(ProfilerError):
+    """A session is already running."""
+
+
+class ProfilerRateLimited(ProfilerError):
+    """A session ran too recently."""
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+
+    def __init__(self, min_interval_s: float = 300.0, max_duration_s: float = 60.0):
+        self.min_interval_s = min_interval_s
+        self.max_duration_s = max_duration_s
+        self.active         = False
+
+        self._lock          = threading.Lock()
+        self._tracked       = set()          # thread idents serving a sampled request
+        self._sample_rate   = 0.0
+        self._interval_s    = 0.005
+        self._last_start: Optional[float] = None
+        self._stacks        = Counter()
+        self._samples       = 0
+        self._requests      = 0
+
+    # ── Session control ─────────────────────────────────────────────────────
+    def start(self, duration_s: float, sample_rate: float, interval_ms: float = 5.0):
+        with self._lock:
+            if self.active:
+                raise ProfilerBusy("a profiling session is already running")
+            now = time.monotonic()
+            if self._last_start is not None and now - self._last_start < self.min_interval_s:
+                wait = self.min_interval_s - (now - self._last_start)
+                raise ProfilerRateLimited(f"next session allowed in {wait:.0f}s")
+            self._last_start  = now
+            self._sample_rate = max(0.0, min(1.0, sample_rate))
+            self._interval_s  = max(0.001, interval_ms / 1000)
+            self._stacks      = Counter()
+            self._samples     = 0
+            self._requests    = 0
+            self.active       = True
+
+        duration_s = min(duration_s, self.max_duration_s)
+        threading.Thread(target=self._sample_loop, args=(time.monotonic() + duration_s,),
+                         name="request-profiler", daemon=True).start()
+        return duration_s
+
+    def _sample_loop(self, deadline: float):
+        own = threading.get_ident()
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(self._interval_s)
+                with self._lock:
+                    tracked = set(self._tracked)
+                if not tracked:
+                    continue
+                stacks = []
+                for ident, frame in sys._current_frames().items():
+                    if ident not in tracked or ident == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    stacks.append(";".join(reversed(stack)))
+                with self._lock:
+                    self._stacks.update(stacks)
+                    self._samples += len(stacks)
+        finally:
+            self.active = False
+
+    # ── Request path ────────────────────────────────────────────────────────
+    @contextmanager
+    def track(self):
+        """Sample the current thread for the duration of the block, if selected."""
+        if not self.active or random.random() >= self._sample_rate:
+            yield
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            self._tracked.add(ident)
+            self._requests += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._tracked.discard(ident)
+
+    # ── Reporting ───────────────────────────────────────────────────────────
+    def report(self, top: int = 20) -> dict:
+        with self._lock:
+            stacks, sampled, requests = Counter(self._stacks), self._samples, self._requests
+
+        self_counts, total_counts = Counter(), Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for fn in set(frames):
+                total_counts[fn] += count
+
+        samples = sampled or 1
+        return {
+            "samples":            sampled,
+            "profiled_requests":  requests,
+            "interval_ms":        round(self._interval_s * 1000, 2),
+            "collapsed":          "\n".join(f"{s} {c}" for s, c in stacks.most_common()),
+            "top_functions": [
+                {
+                    "function":  fn,
+                    "self":      self_counts[fn],
+                    "self_pct":  round(100 * self_counts[fn] / samples, 2),
+                    "total":     total_counts[fn],
+                    "total_pct": round(100 * total_counts[fn] / samples, 2),
+                }
+                for fn, _ in self_counts.most_common(top)
+            ],
+        }
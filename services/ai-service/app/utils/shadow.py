@@ -0,0 +1,163 @@
+"""
+Shadow-model evaluation
+=======================
+Scores a sampled fraction of live journal inputs with a candidate model bundle
+on a background thread and records how it disagrees with the primary model.
+
+The request path only pays for a random draw and a non-blocking ``put_nowait``;
+when the shadow worker falls behind, samples are dropped instead of queued.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.models.unified_model import UnifiedMentalHealthAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# Number of recent latency samples kept for percentile reporting
+LATENCY_WINDOW = 1000
+
+
+class ShadowEvaluator:
+    """Background comparison of a candidate bundle against the primary model."""
+
+    def __init__(self, model_path: str, sample_rate: float = 0.1, queue_size: int = 256):
+        self.model_path  = model_path
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self._queue      = queue.Queue(maxsize=queue_size)
+        self._lock       = threading.Lock()
+        self._stop       = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._analyzer: Optional[UnifiedMentalHealthAnalyzer] = None
+
+        self.sampled              = 0
+        self.dropped              = 0
+        self.compared             = 0
+        self.errors               = 0
+        self.label_disagreements  = 0
+        self.risk_disagreements   = 0
+        self.risk_transitions: Dict[str, int] = {}
+        self._primary_ms = deque(maxlen=LATENCY_WINDOW)
+        self._shadow_ms  = deque(maxlen=LATENCY_WINDOW)
+
+    # ── Lifecycle ───────────────────────────────────────────────────────────
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        # Never block shutdown on a full queue: the worker also watches the stop event
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ── Request path ────────────────────────────────────────────────────────
+    def offer(self, text: str, primary_result: dict, primary_ms: float) -> bool:
+        """
+        Queue a sample for shadow scoring. Never blocks; returns False if skipped.
+        ``primary_ms`` is the primary's bare ``predict`` time, the same boundary
+        the shadow model is timed at.
+        """
+        if self._thread is None or random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((text, primary_result["raw_label"],
+                                    primary_result["crisis_risk"], primary_ms))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.sampled += 1
+        return True
+
+    # ── Worker ──────────────────────────────────────────────────────────────
+    def _run(self):
+        try:
+            self._analyzer = UnifiedMentalHealthAnalyzer(model_path=self.model_path, instrument=False)
+            logger.info(f"👥 Shadow model loaded from {self.model_path}")
+        except Exception as e:
+            logger.error(f"Shadow model load failed, shadow mode disabled: {e}")
+            self._thread = None
+            return
+
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            text, primary_label, primary_risk, primary_ms = item
+            start = time.perf_counter()
+            try:
+                result = self._analyzer.predict(text)
+            except Exception as e:
+                logger.warning(f"Shadow prediction failed: {e}")
+                with self._lock:
+                    self.errors += 1
+                continue
+            shadow_ms = (time.perf_counter() - start) * 1000
+            self._record(primary_label, primary_risk, primary_ms,
+                         result["raw_label"], result["crisis_risk"], shadow_ms)
+
+    def _record(self, primary_label: str, primary_risk: str, primary_ms: float,
+                shadow_label: str, shadow_risk: str, shadow_ms: float):
+        with self._lock:
+            self.compared += 1
+            self._primary_ms.append(primary_ms)
+            self._shadow_ms.append(shadow_ms)
+            if shadow_label != primary_label:
+                self.label_disagreements += 1
+            if shadow_risk != primary_risk:
+                self.risk_disagreements += 1
+                key = f"{primary_risk}->{shadow_risk}"
+                self.risk_transitions[key] = self.risk_transitions.get(key, 0) + 1
+
+    # ── Reporting ───────────────────────────────────────────────────────────
+    @staticmethod
+    def _latency_summary(samples) -> dict:
+        if not samples:
+            return {"p50_ms": None, "p95_ms": None, "mean_ms": None}
+        arr = np.fromiter(samples, dtype=float)
+        return {
+            "p50_ms":  round(float(np.percentile(arr, 50)), 2),
+            "p95_ms":  round(float(np.percentile(arr, 95)), 2),
+            "mean_ms": round(float(arr.mean()), 2),
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            compared = self.compared
+            return {
+                "active":               self._thread is not None,
+                "model_path":           self.model_path,
+                "sample_rate":          self.sample_rate,
+                "queue_depth":          self._queue.qsize(),
+                "sampled":              self.sampled,
+                "dropped":              self.dropped,
+                "compared":             compared,
+                "errors":               self.errors,
+                "label_disagreements":  self.label_disagreements,
+                "risk_disagreements":   self.risk_disagreements,
+                "label_agreement_rate": round(1 - self.label_disagreements / compared, 4) if compared else None,
+                "risk_agreement_rate":  round(1 - self.risk_disagreements / compared, 4) if compared else None,
+                "risk_transitions":     dict(self.risk_transitions),
+                "primary_latency":      self._latency_summary(self._primary_ms),
+                "shadow_latency":       self._latency_summary(self._shadow_ms),
+            }
@@ -0,0 +1,138 @@
+"""
+Startup warm-up and latency self-check
+======================================
+Runs the analyzer over a built-in probe set (short, long and crisis texts)
+so lazy imports, first-touch allocations and cold caches are paid before the
+first real request. The measured latencies back the readiness probe.
+
+A pass that fails or lands over budget (cold CPU, throttled container) is not
+final: ``run_until_ready`` repeats it every ``retry_interval_s`` until the
+p95 fits. Probes run with ``instrument=False`` so they never reach the
+production prediction metrics.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ─── Probe set ────────────────────────────────────────────────────────────────
+_LONG_ENTRY = (
+    "I went to the office today and tried to focus on my work, but my mind kept drifting back to "
+    "the argument I had with my family last night. I have not been sleeping well for weeks and I "
+    "feel tired all the time. My boss asked me about the deadline and I felt my chest tighten. "
+    "After work I sat in the car for a long time because I did not want to go home. "
+) * 6
+
+PROBE_TEXTS = {
+    "short":  [
+        "I feel good today.",
+        "Work was stressful.",
+        "I miss my grandmother.",
+    ],
+    "long":   [
+        _LONG_ENTRY,
+        _LONG_ENTRY[: len(_LONG_ENTRY) // 2],
+    ],
+    "crisis": [
+        "I want to kill myself.",
+        "I went to the rooftop and wanted to jump.",
+        "Everyone would be better without me.",
+    ],
+}
+
+
+class WarmupState:
+    """Tracks the warm-up pass and decides readiness against a p95 budget."""
+
+    def __init__(self, p95_budget_ms: float, rounds: int = 3, retry_interval_s: float = 30.0):
+        self.p95_budget_ms    = p95_budget_ms
+        self.rounds           = rounds
+        self.retry_interval_s = retry_interval_s
+        self.status           = "pending"    # pending | running | done | failed
+        self.attempts         = 0
+        self.error: Optional[str] = None
+        self.report: dict     = {}
+        self._lock            = threading.Lock()
+        self._stop            = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return (self.status == "done"
+                and self.report.get("p95_ms") is not None
+                and self.report["p95_ms"] <= self.p95_budget_ms)
+
+    def run(self, analyzer):
+        """Blocking warm-up pass; safe to call from a worker thread."""
+        with self._lock:
+            if self.status == "running":
+                return
+            self.status = "running"
+            self.attempts += 1
+
+        try:
+            start = time.perf_counter()
+            timings = {category: [] for category in PROBE_TEXTS}
+            for _ in range(self.rounds):
+                for category, texts in PROBE_TEXTS.items():
+                    for text in texts:
+                        t0 = time.perf_counter()
+                        result = analyzer.predict(text, instrument=False)
+                        if result.get("triggered_by") == "fallback":
+                            raise RuntimeError(f"analyzer fell back on {category} probe")
+                        timings[category].append((time.perf_counter() - t0) * 1000)
+
+            # The first round carries the one-time costs — exclude it from the percentiles
+            steady = {
+                c: (t[len(PROBE_TEXTS[c]):] if self.rounds > 1 else t) for c, t in timings.items()
+            }
+            steady_ms = np.array([ms for t in steady.values() for ms in t])
+            self.report = {
+                "rounds":          self.rounds,
+                "probes":          sum(len(t) for t in PROBE_TEXTS.values()),
+                "cold_max_ms":     round(max(timings[c][0] for c in PROBE_TEXTS), 2),
+                "p50_ms":          round(float(np.percentile(steady_ms, 50)), 2),
+                "p95_ms":          round(float(np.percentile(steady_ms, 95)), 2),
+                "max_ms":          round(float(steady_ms.max()), 2),
+                "by_category_p95": {
+                    c: round(float(np.percentile(t, 95)), 2) for c, t in steady.items()
+                },
+                "total_ms":        round((time.perf_counter() - start) * 1000, 2),
+            }
+            self.error  = None
+            self.status = "done"
+            logger.info(
+                f"🔥 Warm-up complete — p50={self.report['p50_ms']}ms "
+                f"p95={self.report['p95_ms']}ms (budget {self.p95_budget_ms}ms)"
+            )
+        except Exception as e:
+            self.status = "failed"
+            self.error  = str(e)
+            logger.error(f"Warm-up failed: {e}", exc_info=True)
+
+    def run_until_ready(self, analyzer):
+        """Repeat the warm-up pass every ``retry_interval_s`` until ready or ``stop()``."""
+        while not self._stop.is_set():
+            self.run(analyzer)
+            if self.ready:
+                return
+            logger.warning(f"Not ready after warm-up attempt {self.attempts} — "
+                           f"re-measuring in {self.retry_interval_s:.0f}s")
+            self._stop.wait(self.retry_interval_s)
+
+    def stop(self):
+        self._stop.set()
+
+    def payload(self) -> dict:
+        return {
+            "status":        "ready" if self.ready else "not_ready",
+            "warmup_status": self.status,
+            "attempts":      self.attempts,
+            "p95_budget_ms": self.p95_budget_ms,
+            "warmup":        self.report,
+            **({"error": self.error} if self.error else {}),
+        }
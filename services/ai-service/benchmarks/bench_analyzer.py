@@ -0,0 +1,264 @@
+"""
+SereneMind AI — Analyzer Microbenchmarks
+========================================
+Times ``UnifiedMentalHealthAnalyzer.predict`` and each of its internal stages
+across text-length buckets (one sentence → 10,000 characters).
+
+  - Each sample times a calibrated batch of calls (at least ``--min-sample-ms``)
+    so timer resolution does not dominate short stages
+  - Reported statistics are robust: median, IQR, MAD, p95 and a bootstrap
+    95% confidence interval of the median
+  - Results are written as JSON; with ``--baseline`` the run is compared
+    against a stored result and exits non-zero when a median slows down by
+    more than ``--threshold`` and the confidence intervals do not overlap
+
+Usage (from services/ai-service):
+    PYTHONPATH=. python -m benchmarks.bench_analyzer --out bench.json
+    PYTHONPATH=. python -m benchmarks.bench_analyzer --baseline benchmarks/baseline.json
+    PYTHONPATH=. python -m benchmarks.bench_analyzer --save-baseline benchmarks/baseline.json
+
+``benchmarks/baseline.json`` is committed and CI compares every run against
+it. Timings are machine-specific (see its ``meta`` block): regenerate it with
+the ``--save-baseline`` command above, on the machine class CI runs on,
+whenever the model bundle changes or an intended slowdown is accepted, and
+commit the new file together with that change.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from app.models.unified_model import (
+    UnifiedMentalHealthAnalyzer,
+    _chunk_text,
+    _clean,
+    _get_contextual_tags,
+    _reliability_bridge,
+)
+
+# ─── Inputs ───────────────────────────────────────────────────────────────────
+_SENTENCES = [
+    "I have not been sleeping well and I feel tired all the time.",
+    "Work has been overwhelming and my boss keeps adding deadlines.",
+    "I miss my mother and the house feels empty without her.",
+    "Some days I feel fine, and then out of nowhere my chest tightens.",
+    "My partner says I seem distant but I do not know how to explain it.",
+    "I went for a walk this morning and the fresh air helped a little.",
+    "I keep replaying the argument with my family over and over.",
+    "Nothing feels like it matters anymore and I am exhausted.",
+]
+
+LENGTH_BUCKETS = {
+    "sentence": 60,
+    "short":    280,
+    "medium":   1_000,
+    "long":     3_000,
+    "xlong":    10_000,
+}
+
+
+def make_text(n_chars: int) -> str:
+    """Deterministic journal-like text of roughly ``n_chars`` characters."""
+    parts, size, i = [], 0, 0
+    while size < n_chars:
+        sentence = _SENTENCES[i % len(_SENTENCES)]
+        parts.append(sentence)
+        size += len(sentence) + 1
+        i += 1
+    return " ".join(parts)[:n_chars]
+
+
+# ─── Statistics ───────────────────────────────────────────────────────────────
+
+def robust_stats(samples_ms: np.ndarray, seed: int = 0, n_boot: int = 1000) -> dict:
+    """Median-centred summary with a bootstrap CI; insensitive to scheduler outliers."""
+    rng    = np.random.default_rng(seed)
+    median = float(np.median(samples_ms))
+    q1, q3 = np.percentile(samples_ms, [25, 75])
+    boot   = np.median(rng.choice(samples_ms, size=(n_boot, len(samples_ms))), axis=1)
+    lo, hi = np.percentile(boot, [2.5, 97.5])
+    return {
+        "n":           int(len(samples_ms)),
+        "median_ms":   round(median, 5),
+        "ci95_ms":     [round(float(lo), 5), round(float(hi), 5)],
+        "iqr_ms":      round(float(q3 - q1), 5),
+        "mad_ms":      round(float(np.median(np.abs(samples_ms - median))), 5),
+        "p95_ms":      round(float(np.percentile(samples_ms, 95)), 5),
+        "min_ms":      round(float(samples_ms.min()), 5),
+        "mean_ms":     round(float(samples_ms.mean()), 5),
+    }
+
+
+def measure(fn: Callable[[], object], samples: int, min_sample_ms: float, warmup: int = 3) -> dict:
+    """Time ``fn`` in calibrated batches; per-call milliseconds per sample."""
+    for _ in range(warmup):
+        fn()
+
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        if elapsed_ms >= min_sample_ms or loops >= 1 << 20:
+            break
+        loops = min(1 << 20, max(loops * 2, int(loops * min_sample_ms / max(elapsed_ms, 1e-3))))
+
+    timings = np.empty(samples)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(samples):
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            timings[i] = (time.perf_counter() - t0) * 1000 / loops
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"loops": loops, **robust_stats(timings)}
+
+
+# ─── Suite ────────────────────────────────────────────────────────────────────
+
+def stage_callables(analyzer: UnifiedMentalHealthAnalyzer, text: str) -> Dict[str, Callable]:
+    """One zero-argument callable per stage, with inputs precomputed from ``text``."""
+    cleaned      = _clean(text)
+    clean_chunks = [_clean(c) for c in _chunk_text(cleaned)]
+    proba        = analyzer._predict_proba_raw(clean_chunks)
+    weights      = np.linspace(0.8, 1.2, len(clean_chunks))
+    avg_proba    = (proba * (weights / weights.sum())[:, None]).sum(axis=0)
+    scores       = {cls: round(float(avg_proba[i]), 4) for i, cls in enumerate(analyzer.classes_)}
+    top_label    = analyzer.classes_[int(avg_proba.argmax())]
+    confidence   = float(avg_proba.max())
+    text_lower   = text.lower()
+
+    return {
+        "clean":             lambda: _clean(text),
+        "chunk":             lambda: [_clean(c) for c in _chunk_text(cleaned)],
+        "predict_proba_raw": lambda: analyzer._predict_proba_raw(clean_chunks),
+        "bridge":            lambda: _reliability_bridge(text_lower, dict(scores), top_label, confidence),
+        "tags":              lambda: _get_contextual_tags(top_label, text, scores),
+        "predict":           lambda: analyzer.predict(text),
+    }
+
+
+def run_suite(model_path: str, samples: int = 30, min_sample_ms: float = 20.0,
+              buckets: Optional[Dict[str, int]] = None) -> dict:
+    # Uninstrumented copy: Prometheus observations are not part of what we measure
+    analyzer = UnifiedMentalHealthAnalyzer(model_path=model_path, instrument=False)
+    results = {}
+    for bucket, n_chars in (buckets or LENGTH_BUCKETS).items():
+        text = make_text(n_chars)
+        results[bucket] = {"chars": len(text), "stages": {}}
+        for stage, fn in stage_callables(analyzer, text).items():
+            stats = measure(fn, samples, min_sample_ms)
+            results[bucket]["stages"][stage] = stats
+            print(f"  {bucket:>8} ({len(text):>5} chars)  {stage:<18} "
+                  f"median={stats['median_ms']:.4f}ms  p95={stats['p95_ms']:.4f}ms", file=sys.stderr)
+
+    import sklearn
+    return {
+        "meta": {
+            "created":       time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "model":         os.path.basename(model_path),
+            "python":        platform.python_version(),
+            "numpy":         np.__version__,
+            "sklearn":       sklearn.__version__,
+            "platform":      platform.platform(),
+            "cpus":          os.cpu_count(),
+            "samples":       samples,
+            "min_sample_ms": min_sample_ms,
+        },
+        "results": results,
+    }
+
+
+# ─── Baseline comparison ──────────────────────────────────────────────────────
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> list:
+    """
+    Per bucket/stage median ratios against ``baseline``. A row is a regression
+    when the median grew by more than ``threshold`` *and* the current CI lies
+    entirely above the baseline CI (so run-to-run noise does not fail builds).
+    """
+    rows = []
+    for bucket, entry in current["results"].items():
+        base_entry = baseline.get("results", {}).get(bucket)
+        if not base_entry:
+            continue
+        for stage, stats in entry["stages"].items():
+            base = base_entry["stages"].get(stage)
+            if not base:
+                continue
+            ratio = stats["median_ms"] / max(base["median_ms"], 1e-9)
+            rows.append({
+                "bucket":      bucket,
+                "stage":       stage,
+                "baseline_ms": base["median_ms"],
+                "current_ms":  stats["median_ms"],
+                "ratio":       round(ratio, 3),
+                "regression":  ratio > 1 + threshold and stats["ci95_ms"][0] > base["ci95_ms"][1],
+            })
+    return rows
+
+
+def main(argv=None) -> int:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="SereneMind analyzer microbenchmarks")
+    parser.add_argument("--model-path", default=settings.UNIFIED_MODEL_PATH)
+    parser.add_argument("--samples", type=int, default=30, help="timed samples per stage")
+    parser.add_argument("--min-sample-ms", type=float, default=20.0, help="minimum duration of one sample")
+    parser.add_argument("--bucket", action="append", choices=sorted(LENGTH_BUCKETS),
+                        help="only run these length buckets (repeatable)")
+    parser.add_argument("--out", default=None, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed median slowdown (0.10 = 10%%)")
+    parser.add_argument("--save-baseline", default=None, help="also store the results as a new baseline")
+    args = parser.parse_args(argv)
+
+    # Bridge log lines would otherwise be timed as I/O
+    logging.disable(logging.INFO)
+
+    buckets = {b: LENGTH_BUCKETS[b] for b in args.bucket} if args.bucket else None
+    report  = run_suite(args.model_path, samples=args.samples,
+                        min_sample_ms=args.min_sample_ms, buckets=buckets)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report, json.load(f), args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "rows": rows}
+        regressions = [r for r in rows if r["regression"]]
+        for r in regressions:
+            print(f"❌ REGRESSION {r['bucket']}/{r['stage']}: {r['baseline_ms']:.4f}ms → "
+                  f"{r['current_ms']:.4f}ms (×{r['ratio']})", file=sys.stderr)
+        if regressions:
+            exit_code = 1
+        else:
+            print(f"✅ No regressions beyond {args.threshold:.0%} across {len(rows)} measurements",
+                  file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(payload + "\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
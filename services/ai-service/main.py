@@ -1,37 +1,125 @@
-from fastapi import FastAPI, HTTPException
+# Size native thread pools before NumPy / SciPy are imported
+from app.core.concurrency import apply_concurrency_plan
+concurrency_plan = apply_concurrency_plan()
+
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
+import asyncio
 from contextlib import asynccontextmanager
 from app.models.unified_model import UnifiedMentalHealthAnalyzer
-from app.routers import analyze, health
+from app.models.model_pool import ModelPool
+from app.utils.shadow import ShadowEvaluator
+from app.utils.capture import TrafficCapture
+from app.utils.warmup import PROBE_TEXTS, WarmupState
+from app.utils.inference_pool import AdaptiveInferencePool
+from app.utils.profiler import SamplingProfiler
+from app.utils.metrics import bind_pools, render_latest
+from app.utils.tracing import TracingMiddleware, tracer
+from app.routers import admin, analyze, health
 from app.core.config import settings
+from serenemind_common.log_config import setup_logging
 import logging
 import os
 
-logging.basicConfig(level=logging.INFO)
+setup_logging(level=settings.LOG_LEVEL, json_format=settings.LOG_JSON,
+              sample_rates=settings.LOG_SAMPLE_RATES, queue_size=settings.LOG_QUEUE_SIZE)
 logger = logging.getLogger(__name__)
 
 # ── Global model instance ───────────────────────────────────────────────────
 unified_analyzer: UnifiedMentalHealthAnalyzer = None
+model_pool: ModelPool = None
+shadow_evaluator: ShadowEvaluator = None
+warmup_state: WarmupState = None
+inference_executor: AdaptiveInferencePool = None
+request_profiler: SamplingProfiler = None
+traffic_capture: TrafficCapture = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global unified_analyzer
+    global unified_analyzer, model_pool, shadow_evaluator, warmup_state, inference_executor
+    global request_profiler, traffic_capture
 
     logger.info(f"🚀 Starting {settings.PROJECT_NAME} ...")
+    logger.info(
+        f"🧮 Concurrency plan — {concurrency_plan.cpus} CPUs ({concurrency_plan.cpu_source}): "
+        f"{concurrency_plan.workers} workers × {concurrency_plan.executor_threads} threads × "
+        f"{concurrency_plan.native_threads} native"
+    )
 
     if not os.path.exists(settings.UNIFIED_MODEL_PATH):
         logger.critical(f"❌ Model not found at {settings.UNIFIED_MODEL_PATH}")
         raise RuntimeError(f"Unified model file not found: {settings.UNIFIED_MODEL_PATH}")
 
     logger.info("📦 Loading Unified Mental Health Model v4 ...")
-    unified_analyzer = UnifiedMentalHealthAnalyzer(model_path=settings.UNIFIED_MODEL_PATH)
+    model_pool = ModelPool(
+        registry         = {**settings.MODEL_REGISTRY,
+                            settings.DEFAULT_MODEL_VERSION: settings.UNIFIED_MODEL_PATH},
+        default_version  = settings.DEFAULT_MODEL_VERSION,
+        language_routes  = settings.MODEL_LANGUAGE_ROUTES,
+        memory_budget_mb = settings.MODEL_POOL_MEMORY_BUDGET_MB,
+    )
+    _, unified_analyzer = model_pool.get()
     logger.info("✅ Unified model loaded — full semantic analysis active")
 
+    def _prewarm_worker():
+        for text in (PROBE_TEXTS["short"][0], PROBE_TEXTS["long"][0]):
+            unified_analyzer.predict(text, instrument=False)
+
+    inference_executor = AdaptiveInferencePool(
+        min_workers      = min(settings.INFERENCE_MIN_THREADS, concurrency_plan.executor_threads),
+        max_workers      = concurrency_plan.executor_threads,
+        warmup           = _prewarm_worker,
+        target_wait_ms   = settings.INFERENCE_TARGET_WAIT_MS,
+        tick_s           = settings.INFERENCE_SCALE_TICK_S,
+        scale_up_ticks   = settings.INFERENCE_SCALE_UP_TICKS,
+        scale_down_ticks = settings.INFERENCE_SCALE_DOWN_TICKS,
+    )
+
+    bind_pools(inference_pool=inference_executor, model_pool=model_pool)
+
+    # Warm up in the background — /health stays live, /health/ready waits for this
+    warmup_state = WarmupState(p95_budget_ms=settings.READINESS_P95_BUDGET_MS,
+                               rounds=settings.WARMUP_ROUNDS,
+                               retry_interval_s=settings.WARMUP_RETRY_INTERVAL_S)
+    warmup_task = asyncio.create_task(asyncio.to_thread(warmup_state.run_until_ready, unified_analyzer))
+
+    if settings.PROFILER_ENABLED:
+        request_profiler = SamplingProfiler(min_interval_s=settings.PROFILER_MIN_INTERVAL_S,
+                                            max_duration_s=settings.PROFILER_MAX_DURATION_S)
+
+    if settings.SHADOW_MODEL_PATH:
+        shadow_evaluator = ShadowEvaluator(
+            model_path  = settings.SHADOW_MODEL_PATH,
+            sample_rate = settings.SHADOW_SAMPLE_RATE,
+            queue_size  = settings.SHADOW_QUEUE_SIZE,
+        )
+        shadow_evaluator.start()
+        logger.info(f"👥 Shadow evaluation enabled ({settings.SHADOW_SAMPLE_RATE:.0%} of traffic)")
+
+    if settings.CAPTURE_PATH:
+        traffic_capture = TrafficCapture(
+            path        = settings.CAPTURE_PATH,
+            sample_rate = settings.CAPTURE_SAMPLE_RATE,
+            redactors   = settings.CAPTURE_REDACTORS,
+            queue_size  = settings.CAPTURE_QUEUE_SIZE,
+        )
+        traffic_capture.start()
+        logger.info(f"🎙️  Traffic capture enabled → {traffic_capture.path}")
+
     yield
     logger.info("🛑 Shutting down AI service ...")
+    warmup_state.stop()
+    await warmup_task
+    if traffic_capture is not None:
+        traffic_capture.stop()
+        traffic_capture = None
+    if shadow_evaluator is not None:
+        shadow_evaluator.stop()
+        shadow_evaluator = None
+    inference_executor.shutdown(wait=True)
 
 
 app = FastAPI(
@@ -41,6 +129,10 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+tracer.configure(sample_rate=settings.TRACE_SAMPLE_RATE,
+                 export_path=settings.TRACE_EXPORT_PATH,
+                 buffer_size=settings.TRACE_BUFFER_SIZE)
+
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 app.add_middleware(
     CORSMiddleware,
@@ -48,11 +140,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["traceparent"],
 )
+app.add_middleware(TracingMiddleware, tracer=tracer)
 
 app.include_router(health.router,  prefix="/health",  tags=["Health"])
 app.include_router(analyze.router, prefix="/analyze", tags=["Analysis"])
+app.include_router(admin.router,   prefix="/admin",   tags=["Admin"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False, workers=2)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False,
+                workers=concurrency_plan.workers)
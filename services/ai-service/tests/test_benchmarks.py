@@ -0,0 +1,41 @@
+import json
+import os
+
+import numpy as np
+
+from benchmarks.bench_analyzer import LENGTH_BUCKETS, compare, make_text, robust_stats
+
+BASELINE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "baseline.json")
+
+
+def _report(median, ci):
+    return {"results": {"short": {"chars": 280, "stages": {
+        "predict": {"median_ms": median, "ci95_ms": ci}}}}}
+
+
+def test_robust_stats_ignore_outliers():
+    samples = np.array([1.0] * 19 + [100.0])
+    stats = robust_stats(samples)
+    assert stats["median_ms"] == 1.0
+    assert stats["mad_ms"] == 0.0
+    assert stats["ci95_ms"] == [1.0, 1.0]
+
+
+def test_compare_flags_only_significant_slowdowns():
+    baseline = _report(2.0, [1.9, 2.1])
+    assert compare(_report(2.1, [2.0, 2.2]), baseline)[0]["regression"] is False
+    assert compare(_report(2.6, [2.5, 2.7]), baseline)[0]["regression"] is True
+    # Large ratio but overlapping CIs is treated as noise
+    assert compare(_report(2.6, [2.0, 3.0]), baseline)[0]["regression"] is False
+
+
+def test_make_text_hits_requested_length():
+    assert len(make_text(10_000)) == 10_000
+
+
+def test_committed_baseline_covers_every_bucket():
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    assert set(baseline["results"]) == set(LENGTH_BUCKETS)
+    rows = compare(baseline, baseline)
+    assert rows and not any(r["regression"] for r in rows)
@@ -0,0 +1,58 @@
+import gzip
+import json
+import time
+
+from app.utils.capture import TrafficCapture
+
+
+def _drop_tests(payload):
+    return None if payload["text"].startswith("test:") else payload
+
+
+def test_capture_redacts_and_writes_ndjson(tmp_path):
+    path = str(tmp_path / "traffic-{pid}.ndjson.gz")
+    capture = TrafficCapture(path, sample_rate=1.0,
+                             redactors=["hash_user_id", "mask_pii", _drop_tests])
+    capture.start()
+    result = {"raw_label": "stress", "crisis_risk": "LOW", "crisis_probability": 0.03,
+              "severity_rating": 4, "tags": ["work-related stress"], "all_scores": {}}
+    assert capture.offer(1700000000.0, {"text": "Mail me at jo@example.com", "user_id": "u-1",
+                                        "history": []}, result, 12.5, "4.0.0")
+    assert capture.offer(1700000001.0, {"text": "test: synthetic", "history": []}, result, 3.0, "4.0.0")
+    capture.stop()
+
+    with gzip.open(capture.path, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 1
+    assert records[0]["req"]["text"] == "Mail me at <email>"
+    assert records[0]["req"]["user_id"] != "u-1"
+    assert records[0]["res"]["crisis_risk"] == "LOW"
+    assert "all_scores" not in records[0]["res"]
+    assert capture.stats()["redacted"] == 1
+
+
+def test_write_errors_do_not_stall_the_queue_or_shutdown():
+    # /dev/full accepts the open and fails every flush with ENOSPC
+    capture = TrafficCapture("/dev/full", redactors=[], queue_size=4, flush_interval_s=0.01)
+    capture.start()
+    result = {"raw_label": "stress", "crisis_risk": "LOW"}
+    for i in range(200):
+        capture.offer(float(i), {"text": "x" * 4096, "history": []}, result, 1.0, "4.0.0")
+        time.sleep(0.001)
+    start = time.monotonic()
+    capture.stop(timeout=2.0)
+    assert time.monotonic() - start < 2.5
+    assert capture.stats()["errors"] > 0
+
+
+def test_unwritable_path_disables_capture(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    capture = TrafficCapture(str(blocker / "traffic.ndjson"))
+    capture.start()
+    deadline = time.monotonic() + 2.0
+    while capture.errors == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert capture.errors == 1
+    assert not capture.offer(0.0, {"text": "hi", "history": []}, {}, 1.0, "4.0.0")
+    capture.stop()
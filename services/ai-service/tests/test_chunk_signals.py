@@ -0,0 +1,18 @@
+from app.core.config import settings
+from app.models.unified_model import UnifiedMentalHealthAnalyzer
+
+
+def test_chunk_signals_cover_long_entries_and_flag_crisis_spans():
+    analyzer = UnifiedMentalHealthAnalyzer(settings.UNIFIED_MODEL_PATH, instrument=False)
+    text = ("Today was a normal day at work and I had lunch with friends. " * 12
+            + "But honestly I want to end my life, I cannot go on. "
+            + "The weather was nice and we walked in the park. " * 10)
+    signals = analyzer.predict(text)["chunk_signals"]
+
+    assert len(signals) > 1
+    assert signals[0]["start"] == 0 and signals[-1]["end"] == len(text.rstrip())
+    assert all(0 <= s["start"] < s["end"] <= len(text) for s in signals)
+    crisis = [s for s in signals if s["crisis"]]
+    assert crisis and all("end my life" in text[s["start"]:s["end"]] for s in crisis)
+
+    assert analyzer.predict("I feel fine today.")["chunk_signals"] == []
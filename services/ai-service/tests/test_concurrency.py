@@ -0,0 +1,22 @@
+from app.core import concurrency
+from app.core.concurrency import plan_concurrency
+
+
+def test_auto_plan_fits_available_cpus(monkeypatch):
+    monkeypatch.setattr(concurrency, "detect_cpus", lambda: (4, "cgroup"))
+    plan = plan_concurrency()
+    assert plan.native_threads == 1
+    assert plan.workers == 2
+    assert plan.as_dict()["total_threads"] == 4
+
+
+def test_explicit_plan_is_respected(monkeypatch):
+    monkeypatch.setattr(concurrency, "detect_cpus", lambda: (1, "affinity"))
+    plan = plan_concurrency(workers=1, executor_threads=3, native_threads=2)
+    assert (plan.workers, plan.executor_threads, plan.native_threads) == (1, 3, 2)
+
+
+def test_cgroup_v2_quota(monkeypatch):
+    monkeypatch.setattr(concurrency, "_read",
+                        lambda path: "150000 100000" if path.endswith("cpu.max") else None)
+    assert concurrency._cgroup_cpu_limit() == 1.5
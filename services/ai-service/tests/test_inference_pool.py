@@ -0,0 +1,53 @@
+import threading
+import time
+
+from app.utils.inference_pool import AdaptiveInferencePool
+
+
+def test_pool_scales_up_under_backlog_and_back_down():
+    warmed = []
+    pool = AdaptiveInferencePool(min_workers=1, max_workers=4,
+                                 warmup=lambda: warmed.append(threading.current_thread().name),
+                                 target_wait_ms=1, tick_s=0.02,
+                                 scale_up_ticks=1, scale_down_ticks=5)
+    try:
+        futures = [pool.submit(time.sleep, 0.05) for _ in range(40)]
+        for f in futures:
+            f.result(timeout=10)
+        assert pool.stats()["scale_ups"] >= 1
+        # every worker that ever served ran the warm-up first
+        assert len(warmed) == len(set(warmed)) >= 2
+
+        deadline = time.time() + 5
+        while pool.stats()["workers"] > 1 and time.time() < deadline:
+            time.sleep(0.05)
+        stats = pool.stats()
+        assert stats["workers"] == 1
+        assert stats["scale_downs"] >= 1
+        assert {e["action"] for e in stats["recent_events"]} == {"scale_up", "scale_down"}
+    finally:
+        pool.shutdown()
+
+
+def test_pool_propagates_results_and_errors():
+    pool = AdaptiveInferencePool(min_workers=1, max_workers=1)
+    try:
+        assert pool.submit(sum, [1, 2, 3]).result(timeout=5) == 6
+        error = pool.submit(int, "not a number").exception(timeout=5)
+        assert isinstance(error, ValueError)
+    finally:
+        pool.shutdown()
+
+
+def test_no_worker_is_spawned_once_shutdown_has_begun():
+    pool = AdaptiveInferencePool(min_workers=1, max_workers=4, tick_s=0.01, scale_up_ticks=1)
+    for _ in range(20):
+        pool.submit(time.sleep, 0.05)
+    pool.shutdown(wait=False)
+    assert not pool._scaler.is_alive()
+    assert not pool._spawn()
+
+    deadline = time.time() + 5
+    while pool.stats()["workers"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()["workers"] == 0
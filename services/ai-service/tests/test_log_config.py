@@ -0,0 +1,41 @@
+import json
+import logging
+import queue
+
+from serenemind_common.log_config import EventSampler, JsonFormatter, NonBlockingQueueHandler
+
+
+def _record(level=logging.INFO, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, "value=%s", (42,), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampler_drops_sampled_events_but_keeps_crisis_and_warnings():
+    sampler = EventSampler({"bridge_tier3": 0.0})
+    assert not sampler.filter(_record(event="bridge_tier3"))
+    assert sampler.filter(_record(event="bridge_tier3", crisis=True))
+    assert sampler.filter(_record(logging.WARNING, event="bridge_tier3"))
+    assert sampler.filter(_record(event="unsampled"))
+
+
+def test_queue_handler_drops_when_full_and_json_keeps_extras():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record(event="a"))
+    handler.handle(_record(event="b"))
+    assert handler.dropped == 1
+
+    doc = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+    assert doc["msg"] == "value=42"
+    assert doc["event"] == "a"
+    assert doc["level"] == "INFO"
+
+
+def test_message_is_rendered_when_enqueued_not_when_written():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    state = {"step": 1}
+    handler.handle(logging.LogRecord("test", logging.INFO, __file__, 1, "state=%s", (state,), None))
+    state["step"] = 2   # mutated before the listener formats the record
+
+    doc = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+    assert doc["msg"] == "state={'step': 1}"
@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from main import app
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+def test_memory_report_breaks_down_model_components(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", ADMIN_TOKEN)
+    with TestClient(app, headers={"X-Admin-Token": ADMIN_TOKEN}) as client:
+        data = client.get("/admin/memory").json()
+    assert data["process"]["pid"] > 0
+    (model,) = data["models"].values()
+    components = model["components"]
+    assert "classifier.coef" in components
+    assert any(k.endswith(".vocabulary") for k in components)
+    assert model["total_mb"] > 0
+    assert data["pools"]["model_pool_resident_mb"] > 0
+
+
+def test_tracemalloc_snapshot_diff_around_burst(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", ADMIN_TOKEN)
+    with TestClient(app, headers={"X-Admin-Token": ADMIN_TOKEN}) as client:
+        client.post("/admin/memory/tracemalloc/start", params={"frames": 5})
+        try:
+            client.post("/admin/memory/tracemalloc/snapshot", params={"label": "before"})
+            for _ in range(5):
+                client.post("/analyze/journal", json={"text": "Work was stressful and I could not sleep."})
+            client.post("/admin/memory/tracemalloc/snapshot", params={"label": "after"})
+            diff = client.get("/admin/memory/tracemalloc/diff",
+                              params={"base": "before", "target": "after", "top": 5})
+            assert diff.status_code == 200
+            assert len(diff.json()["stats"]) <= 5
+            missing = client.get("/admin/memory/tracemalloc/diff", params={"base": "x", "target": "after"})
+            assert missing.status_code == 404
+        finally:
+            client.post("/admin/memory/tracemalloc/stop")
+
+
+def test_admin_endpoints_are_off_without_a_token_and_need_it_when_set(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get("/admin/memory", headers={"X-Admin-Token": ""}).status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", ADMIN_TOKEN)
+    assert client.get("/admin/memory").status_code == 401
+    assert client.get("/admin/memory", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get("/admin/shadow", headers={"X-Admin-Token": ADMIN_TOKEN}).status_code == 200
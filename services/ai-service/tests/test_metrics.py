@@ -0,0 +1,15 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def test_metrics_endpoint_exposes_stage_latencies():
+    with TestClient(app) as client:
+        client.post("/analyze/journal", json={"text": "I want to kill myself."})
+        body = client.get("/metrics").text
+
+    for stage in ("clean", "chunk", "vectorize", "predict_proba", "bridge", "tags", "serialize", "total"):
+        assert f'serenemind_stage_latency_seconds_count{{stage="{stage}"}}' in body
+    assert 'serenemind_bridge_triggers_total{tier="explicit"}' in body
+    assert 'serenemind_risk_level_total{risk_level="CRISIS"}' in body
+    assert "serenemind_inference_workers" in body
@@ -0,0 +1,44 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.model_pool import ModelPool, UnknownModelError
+from main import app
+
+
+def _pool(budget_mb):
+    path = settings.UNIFIED_MODEL_PATH
+    return ModelPool(
+        registry         = {"default": path, "audit": path, "ur": path},
+        default_version  = "default",
+        language_routes  = {"ur": "ur"},
+        memory_budget_mb = budget_mb,
+    )
+
+
+def test_routing_by_version_and_language():
+    pool = _pool(budget_mb=10_000)
+    assert pool.resolve() == "default"
+    assert pool.resolve(language="UR") == "ur"
+    assert pool.resolve(version="audit", language="ur") == "audit"
+    with pytest.raises(UnknownModelError):
+        pool.resolve(version="0.0.1")
+
+
+def test_lru_eviction_keeps_default_pinned():
+    pool = _pool(budget_mb=0.001)  # every extra bundle pushes the pool over budget
+    pool.get()
+    pool.get("audit")
+    pool.get(language="ur")
+    resident = [m["version"] for m in pool.stats()["resident"]]
+    assert resident == ["ur", "default"]
+    assert pool.stats()["evictions"] == 1
+
+
+def test_response_reports_served_model():
+    with TestClient(app) as client:
+        response = client.post("/analyze/journal", json={"text": "I feel calm today."})
+        assert response.json()["model_version"] == settings.DEFAULT_MODEL_VERSION
+
+        response = client.post("/analyze/journal", json={"text": "hello", "model_version": "nope"})
+        assert response.status_code == 404
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.profiler import ProfilerRateLimited, SamplingProfiler
+
+
+def _busy_work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(i * i for i in range(200))
+
+
+def test_profiler_collects_collapsed_stacks_and_rate_limits():
+    profiler = SamplingProfiler(min_interval_s=60, max_duration_s=0.3)
+    assert not profiler.active
+    profiler.start(duration_s=5, sample_rate=1.0, interval_ms=2)
+
+    def worker():
+        with profiler.track():
+            _busy_work(0.2)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    while profiler.active:
+        time.sleep(0.01)
+
+    report = profiler.report(top=5)
+    assert report["profiled_requests"] == 1
+    assert report["samples"] > 0
+    assert "_busy_work" in report["collapsed"]
+    assert any("_busy_work" in row["function"] or "genexpr" in row["function"]
+               for row in report["top_functions"])
+
+    with pytest.raises(ProfilerRateLimited):
+        profiler.start(duration_s=1, sample_rate=1.0)
+
+
+def test_report_can_be_read_while_samples_are_written():
+    profiler = SamplingProfiler(min_interval_s=0, max_duration_s=1.0)
+    profiler.start(duration_s=1.0, sample_rate=1.0, interval_ms=1)
+
+    def worker():
+        with profiler.track():
+            _busy_work(0.6)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        profiler.report(top=5)
+    for t in threads:
+        t.join()
+    while profiler.active:
+        time.sleep(0.01)
+    assert profiler.report()["profiled_requests"] == 8
@@ -0,0 +1,83 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.utils.warmup import WarmupState
+from main import app
+
+
+class _StubAnalyzer:
+    def __init__(self, delay_s=0.0):
+        self.delay_s = delay_s
+        self.instrumented_calls = 0
+
+    def predict(self, text, instrument=True):
+        self.instrumented_calls += instrument
+        time.sleep(self.delay_s)
+        return {"triggered_by": "unified_model"}
+
+
+class _ColdThenWarmAnalyzer(_StubAnalyzer):
+    """Over budget (or failing) for the first ``cold_calls`` predictions, fast afterwards."""
+
+    def __init__(self, cold_calls, fail=False):
+        super().__init__()
+        self.cold_calls = cold_calls
+        self.fail       = fail
+
+    def predict(self, text, instrument=True):
+        self.cold_calls -= 1
+        if self.cold_calls >= 0:
+            if self.fail:
+                return {"triggered_by": "fallback"}
+            time.sleep(0.01)
+        return super().predict(text, instrument)
+
+
+def test_warmup_reports_latency_and_readiness():
+    state = WarmupState(p95_budget_ms=1000, rounds=2)
+    assert not state.ready
+    state.run(_StubAnalyzer())
+    assert state.ready
+    assert set(state.report["by_category_p95"]) == {"short", "long", "crisis"}
+
+
+def test_probes_are_not_instrumented():
+    analyzer = _StubAnalyzer()
+    WarmupState(p95_budget_ms=1000, rounds=1).run(analyzer)
+    assert analyzer.instrumented_calls == 0
+
+
+def test_not_ready_when_over_budget():
+    state = WarmupState(p95_budget_ms=0.001, rounds=1)
+    state.run(_StubAnalyzer(delay_s=0.002))
+    assert state.status == "done"
+    assert not state.ready
+    assert state.payload()["status"] == "not_ready"
+
+
+def test_slow_pass_is_remeasured_until_within_budget():
+    state = WarmupState(p95_budget_ms=5, rounds=1, retry_interval_s=0.01)
+    state.run_until_ready(_ColdThenWarmAnalyzer(cold_calls=8))
+    assert state.ready
+    assert state.attempts == 2
+
+
+def test_failed_pass_is_retried():
+    state = WarmupState(p95_budget_ms=1000, rounds=1, retry_interval_s=0.01)
+    state.run_until_ready(_ColdThenWarmAnalyzer(cold_calls=1, fail=True))
+    assert state.ready and state.error is None
+    assert state.attempts == 2
+
+
+def test_ready_endpoint_after_warmup():
+    with TestClient(app) as client:
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            response = client.get("/health/ready")
+            if response.json()["warmup_status"] == "done":
+                break
+            time.sleep(0.1)
+        data = response.json()
+        assert data["warmup"]["p95_ms"] is not None
+        assert response.status_code == (200 if data["status"] == "ready" else 503)
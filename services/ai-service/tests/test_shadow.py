@@ -0,0 +1,82 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.utils.shadow import ShadowEvaluator
+
+
+def _wait_for(predicate, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_shadow_records_comparisons():
+    evaluator = ShadowEvaluator(settings.UNIFIED_MODEL_PATH, sample_rate=1.0, queue_size=8)
+    evaluator.start()
+    try:
+        primary = {"raw_label": "joy", "crisis_risk": "LOW"}
+        assert evaluator.offer("I am feeling very happy today!", primary, 5.0)
+        assert _wait_for(lambda: evaluator.stats()["compared"] == 1)
+        stats = evaluator.stats()
+        assert stats["errors"] == 0
+        assert stats["primary_latency"]["p50_ms"] == 5.0
+        assert stats["shadow_latency"]["p50_ms"] is not None
+    finally:
+        evaluator.stop()
+
+
+def test_shadow_drops_instead_of_blocking():
+    # Never started → nothing is sampled; a full queue drops the sample.
+    evaluator = ShadowEvaluator(settings.UNIFIED_MODEL_PATH, sample_rate=1.0, queue_size=1)
+    primary = {"raw_label": "normal", "crisis_risk": "LOW"}
+    assert not evaluator.offer("hello", primary, 1.0)
+
+    evaluator._thread = object()  # pretend the worker is running but stalled
+    assert evaluator.offer("first", primary, 1.0)
+    assert not evaluator.offer("second", primary, 1.0)
+    assert evaluator.stats()["dropped"] == 1
+
+
+def test_stop_does_not_block_on_a_full_queue():
+    evaluator = ShadowEvaluator(settings.UNIFIED_MODEL_PATH, sample_rate=1.0, queue_size=1)
+    evaluator._thread = threading.Thread(target=evaluator._stop.wait, daemon=True)  # stalled worker
+    evaluator._thread.start()
+    assert evaluator.offer("fills the queue", {"raw_label": "normal", "crisis_risk": "LOW"}, 1.0)
+
+    start = time.time()
+    evaluator.stop(timeout=2.0)
+    assert time.time() - start < 1.0
+    assert evaluator.stats()["active"] is False
+
+
+def test_primary_is_timed_at_the_predict_call(monkeypatch):
+    import main
+    offers = []
+
+    class _Recorder:
+        def offer(self, text, result, primary_ms):
+            offers.append(primary_ms)
+
+        def stop(self):
+            pass
+
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(main, "shadow_evaluator", _Recorder())
+        get = main.model_pool.get
+
+        def slow_get(version):   # request-path work outside predict() must not count
+            time.sleep(0.3)
+            return get(version)
+
+        monkeypatch.setattr(main.model_pool, "get", slow_get)
+        response = client.post("/analyze/journal", json={"text": "Shadow timing boundary check."})
+
+    assert response.status_code == 200
+    (primary_ms,) = offers
+    assert 0 < primary_ms < 300
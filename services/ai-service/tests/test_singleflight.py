@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.utils.metrics import COALESCED_REQUESTS
+from serenemind_common.singleflight import SingleFlight, request_key
+
+
+def test_concurrent_identical_calls_share_one_run():
+    flight = SingleFlight("test_share", counter=COALESCED_REQUESTS)
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"risk": "LOW"}
+
+    async def main():
+        key = request_key("same text", "v4")
+        return await asyncio.gather(*(flight.do(key, compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert all(r == {"risk": "LOW"} for r, _ in results)
+    assert sum(shared for _, shared in results) == 4
+    stats = flight.stats()
+    assert stats["collapsed"] == 4 and stats["in_flight_keys"] == 0
+    assert REGISTRY.get_sample_value("serenemind_coalesced_requests_total", {"endpoint": "test_share"}) == 4
+
+
+def test_sequential_calls_and_distinct_keys_are_not_collapsed():
+    flight = SingleFlight("test_distinct")
+
+    async def compute():
+        await asyncio.sleep(0)
+        return 1
+
+    async def main():
+        await flight.do(request_key("a"), compute)
+        await flight.do(request_key("a"), compute)
+        await asyncio.gather(flight.do(request_key("b"), compute), flight.do(request_key("c"), compute))
+
+    asyncio.run(main())
+    assert flight.stats()["collapsed"] == 0
+    assert flight.stats()["leaders"] == 4
+
+
+def test_errors_reach_every_waiter_and_leader_cancel_does_not_abort_followers():
+    flight = SingleFlight("test_errors")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        outcomes = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(o, ValueError) for o in outcomes)
+
+        leader = asyncio.ensure_future(flight.do("s", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("s", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == ("ok", True)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.utils.tracing import tracer
+from main import app
+
+ADMIN_TOKEN = "test-admin-token"
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def test_traceparent_is_continued_with_stage_spans(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", ADMIN_TOKEN)
+    previous = tracer.sample_rate
+    tracer.configure(sample_rate=0.0, buffer_size=500)
+    try:
+        with TestClient(app, headers={"X-Admin-Token": ADMIN_TOKEN}) as client:
+            response = client.post(
+                "/analyze/journal",
+                json={"text": "I feel anxious about work."},
+                headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"},
+            )
+            assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+            # Unsampled callers at rate 0 produce no spans
+            client.post("/analyze/journal", json={"text": "hello"},
+                        headers={"traceparent": "00-" + "1" * 32 + "-00f067aa0ba902b7-00"})
+
+            (trace,) = client.get("/admin/traces", params={"trace_id": TRACE_ID}).json()["traces"]
+            assert len(client.get("/admin/traces").json()["traces"]) == 1
+    finally:
+        tracer.configure(sample_rate=previous, buffer_size=2000)
+
+    names = {s["name"] for s in trace["spans"]}
+    assert {"POST /analyze/journal", "queue_wait", "vectorize", "predict_proba", "bridge", "serialize"} <= names
+    root = next(s for s in trace["spans"] if s["name"] == "POST /analyze/journal")
+    assert root["parent_id"] == "00f067aa0ba902b7"
+    assert root["attributes"]["model_version"]
@@ -0,0 +1,73 @@
+"""
+Internal ai-service client
+==========================
+Persistent ``httpx`` connection pool from the avatar-service to the
+ai-service, used by the ``/avatar/pipeline`` endpoints so the browser makes
+one round trip per journal entry instead of two. Keep-alive connections
+make the internal hop a request on an open socket rather than a fresh
+connect per message. The pool is closed on shutdown and reopened on the next
+request, so a later app lifespan in the same process gets a fresh one.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException
+
+from app.config import settings
+from app.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class AIServiceClient:
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self._http: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.errors   = 0
+
+    def _pool(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(settings.AI_SERVICE_TIMEOUT_S, connect=settings.AI_SERVICE_CONNECT_TIMEOUT_S),
+                limits=httpx.Limits(max_connections=settings.AI_SERVICE_MAX_CONNECTIONS,
+                                    max_keepalive_connections=settings.AI_SERVICE_MAX_CONNECTIONS),
+            )
+        return self._http
+
+    async def analyze(self, text: str, language: Optional[str] = "en", user_id: Optional[str] = None,
+                      session_id: Optional[str] = None, traceparent: Optional[str] = None) -> dict:
+        """``POST /analyze/journal``; ai-service errors are re-raised with their status and detail."""
+        self.requests += 1
+        headers = {"traceparent": traceparent} if traceparent else None
+        # No history: the analysis is per entry, the conversation window lives in the session store
+        payload = {"text": text, "language": language, "user_id": user_id, "session_id": session_id}
+        try:
+            with tracer.span("ai_service.analyze", text_chars=len(text)):
+                resp = await self._pool().post("/analyze/journal", json=payload, headers=headers)
+        except httpx.HTTPError as e:
+            self.errors += 1
+            logger.error(f"ai-service unreachable: {e}")
+            raise HTTPException(status_code=502, detail="Analysis service unavailable")
+        if resp.status_code >= 400:
+            self.errors += 1
+            try:
+                detail = resp.json().get("detail", resp.text)
+            except ValueError:
+                detail = resp.text
+            raise HTTPException(status_code=resp.status_code, detail=detail)
+        return resp.json()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+
+    def stats(self) -> dict:
+        return {"base_url": self.base_url, "requests": self.requests, "errors": self.errors}
+
+
+ai_client = AIServiceClient(settings.AI_SERVICE_URL)
@@ -0,0 +1,80 @@
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    PROJECT_NAME: str = "SereneMind Avatar Service"
+
+    # Logging — queued JSON records; high-volume info events are sampled per event name
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: dict = {"avatar_response": 0.10}
+
+    # LLM client — shared connection pool, per-call timeouts and bounded concurrency
+    LLM_TIMEOUT_S: float = 10.0
+    LLM_CONNECT_TIMEOUT_S: float = 2.0
+    LLM_MAX_CONNECTIONS: int = 64
+    LLM_MAX_CONCURRENCY: int = 32
+    LLM_QUEUE_TIMEOUT_S: float = 2.0
+    LLM_MAX_RETRIES: int = 1
+
+    # Latency budget per reply (0 = wait for LLM_TIMEOUT_S); the template reply is served on overrun
+    LLM_BUDGET_S: float = 4.0
+    # Hedging — a second identical request after the recent latency percentile (default until warmed up)
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_DEFAULT_DELAY_S: float = 1.5
+    LLM_HEDGE_MIN_DELAY_S: float = 0.25
+    # Circuit breaker — skip the LLM for the cooldown after consecutive errors / budget overruns
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_COOLDOWN_S: float = 30.0
+
+    # Prompt budget — journal excerpt + history tokens sent to the LLM (0 = unbounded)
+    PROMPT_TOKEN_BUDGET: int = 1200
+    PROMPT_HISTORY_TURNS: int = 6
+    PROMPT_HISTORY_SHARE: float = 0.35
+
+    # Template catalog — JSON pools file (empty = built-in pools) and users tracked for variant rotation
+    TEMPLATE_CATALOG_PATH: str = ""
+    TEMPLATE_RECENT_USERS: int = 10000
+
+    # Conversation sessions — server-side window of PROMPT_HISTORY_TURNS turns per session_id
+    SESSION_IDLE_TTL_S: float = 1800.0
+    SESSION_MAX_SESSIONS: int = 10000
+    SESSION_MAX_TURN_CHARS: int = 2000
+
+    # Text-to-speech — local engine ("espeak", falling back to the "tone" stand-in when espeak is
+    # missing), sentence-level streaming and a content-addressed clip cache on disk (empty
+    # TTS_CACHE_DIR disables it)
+    TTS_ENGINE: str = "espeak"
+    TTS_VOICE: str = ""
+    TTS_SAMPLE_RATE: int = 22050
+    TTS_MAX_SENTENCE_CHARS: int = 240
+    TTS_CACHE_DIR: str = "/tmp/serenemind-tts"
+    TTS_CACHE_MAX_MB: int = 256
+    TTS_PREWARM: bool = True      # synthesize the crisis additions into the cache at startup
+
+    # ai-service used by /avatar/pipeline — persistent keep-alive pool
+    AI_SERVICE_URL: str = "http://127.0.0.1:8000"
+    AI_SERVICE_TIMEOUT_S: float = 15.0
+    AI_SERVICE_CONNECT_TIMEOUT_S: float = 2.0
+    AI_SERVICE_MAX_CONNECTIONS: int = 32
+
+    # Shared GPT replies keyed by analysis signature. Cacheable requests (LOW/MEDIUM risk, no
+    # history — i.e. a session's first message) get a reply written from the signature alone,
+    # not the entry; disable to have GPT always write about the entry itself
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_S: float = 3600.0
+    RESPONSE_CACHE_MAX_KEYS: int = 5000
+    RESPONSE_CACHE_VARIANTS: int = 3
+
+    # Collapse identical /avatar/respond calls that are in flight at the same moment into one
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # Request tracing (W3C traceparent) — spans go to the in-process buffer and/or a JSONL file
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_EXPORT_PATH: str = ""
+    TRACE_BUFFER_SIZE: int = 2000
+
+
+settings = Settings()
@@ -0,0 +1,321 @@
+"""
+Pooled async LLM client
+=======================
+One ``AsyncOpenAI`` client per process over a shared ``httpx`` connection
+pool, so concurrent avatar requests overlap their LLM round trips instead of
+blocking the event loop one after another.
+
+  - connect / read timeouts per call (``LLM_CONNECT_TIMEOUT_S`` / ``LLM_TIMEOUT_S``)
+  - at most ``LLM_MAX_CONCURRENCY`` completions in flight; further callers
+    wait up to ``LLM_QUEUE_TIMEOUT_S`` for a slot and then fall back
+  - the pool is closed on service shutdown (``aclose``) and reopened on the
+    next call, so a later app lifespan in the same process gets a fresh pool
+
+Budgeted calls (``chat_within_budget`` / ``stream_within_budget``) add:
+
+  - a per-request latency budget (``LLM_BUDGET_S``); when it runs out the
+    call is abandoned and the caller serves the template reply instead
+  - optional hedging: if the first attempt has not answered by the
+    ``LLM_HEDGE_PERCENTILE`` of recent latencies, a second identical request
+    races it and the first answer wins (only when a slot is free)
+  - a circuit breaker that skips the LLM for ``LLM_BREAKER_COOLDOWN_S`` after
+    ``LLM_BREAKER_FAILURES`` consecutive errors or budget overruns, then lets
+    a single probe through before closing again
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.config import settings
+from app.metrics import BREAKER_STATE, observe_llm_outcome
+
+logger = logging.getLogger(__name__)
+
+
+class LLMSaturated(Exception):
+    """No completion slot became free within the queue timeout."""
+
+
+class LLMBudgetExceeded(Exception):
+    """The LLM did not answer within the request's latency budget."""
+
+
+class CircuitOpen(Exception):
+    """The circuit breaker is open; the LLM is skipped until the cooldown ends."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open (cooldown) → half-open (one probe) → closed."""
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int = 5, cooldown_s: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_s        = cooldown_s
+        self.state             = self.CLOSED
+        self.failures          = 0
+        self.opened_at         = 0.0
+        self.trips             = 0
+        self._probing          = False
+        BREAKER_STATE.set(0)
+
+    def _set(self, state: str):
+        self.state = state
+        BREAKER_STATE.set(self._STATE_VALUE[state])
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown_s:
+                return False
+            self._set(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def abandon(self):
+        """The caller went away mid-call — free the half-open probe without judging the LLM."""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self._probing = False
+        if self.state != self.CLOSED:
+            logger.info("LLM circuit breaker closed")
+            self._set(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.warning("LLM circuit breaker open for %.0fs after %d failures",
+                               self.cooldown_s, self.failures)
+            self.opened_at = time.monotonic()
+            self._set(self.OPEN)
+
+    def stats(self) -> dict:
+        remaining = self.cooldown_s - (time.monotonic() - self.opened_at) if self.state == self.OPEN else 0.0
+        return {
+            "state":                self.state,
+            "consecutive_failures": self.failures,
+            "trips":                self.trips,
+            "cooldown_remaining_s": round(max(0.0, remaining), 2),
+        }
+
+
+class LLMClient:
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        self.api_key   = api_key
+        self.base_url  = base_url
+        self._open()   # ImportError here without the openai package
+        self.breaker   = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_S)
+        self._latency  = deque(maxlen=500)   # seconds, successful completions only
+        self.in_flight = 0
+        self.rejected  = 0
+        self.hedged    = 0
+        self.hedge_won = 0
+
+    def _open(self):
+        from openai import AsyncOpenAI
+
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT_S, connect=settings.LLM_CONNECT_TIMEOUT_S),
+            limits=httpx.Limits(max_connections=settings.LLM_MAX_CONNECTIONS,
+                                max_keepalive_connections=settings.LLM_MAX_CONNECTIONS),
+        )
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=self._http,
+                                  max_retries=settings.LLM_MAX_RETRIES)
+        # A fresh semaphore too: the old one may be bound to the previous lifespan's event loop
+        self._slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+    def _ensure_open(self):
+        if self._http is None or self._http.is_closed:
+            logger.info("Reopening LLM connection pool")
+            self._open()
+
+    async def _acquire(self):
+        self._ensure_open()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), settings.LLM_QUEUE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LLMSaturated(f"{settings.LLM_MAX_CONCURRENCY} LLM calls already in flight")
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def chat(self, **kwargs):
+        """``chat.completions.create`` bounded by the concurrency limit."""
+        await self._acquire()
+        try:
+            start    = time.perf_counter()
+            response = await self.client.chat.completions.create(**kwargs)
+            self._latency.append(time.perf_counter() - start)
+            return response
+        finally:
+            self._release()
+
+    async def stream(self, **kwargs) -> AsyncIterator[str]:
+        """Streamed completion yielding content deltas; holds its slot until the stream ends."""
+        await self._acquire()
+        try:
+            stream = await self.client.chat.completions.create(stream=True, **kwargs)
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+        finally:
+            self._release()
+
+    def hedge_delay(self) -> float:
+        """Recent ``LLM_HEDGE_PERCENTILE`` latency, or the default until enough samples exist."""
+        if len(self._latency) < 20:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_S
+        ordered = sorted(self._latency)
+        delay   = ordered[min(len(ordered) - 1, int(len(ordered) * settings.LLM_HEDGE_PERCENTILE / 100))]
+        return max(settings.LLM_HEDGE_MIN_DELAY_S, delay)
+
+    def _check_breaker(self) -> bool:
+        """Raise ``CircuitOpen`` when skipped; True when this call is the half-open probe."""
+        if not self.breaker.allow():
+            observe_llm_outcome("short_circuited")
+            raise CircuitOpen(f"LLM skipped, breaker {self.breaker.state}")
+        return self.breaker.state == CircuitBreaker.HALF_OPEN
+
+    def _record_failure(self, error: Exception, outcome: str):
+        observe_llm_outcome(outcome)
+        if isinstance(error, LLMSaturated):
+            # Local back-pressure says nothing about the upstream — but free the probe
+            self.breaker.abandon()
+        else:
+            self.breaker.record_failure()
+
+    async def chat_within_budget(self, budget_s: Optional[float] = None, **kwargs):
+        """``chat`` that gives up after ``budget_s`` (default ``LLM_BUDGET_S``; 0 = unbounded)."""
+        probe    = self._check_breaker()
+        budget_s = settings.LLM_BUDGET_S if budget_s is None else budget_s
+        loop     = asyncio.get_running_loop()
+        start    = loop.time()
+        deadline = start + budget_s if budget_s > 0 else float("inf")
+        hedge_at = start + self.hedge_delay() if settings.LLM_HEDGE_ENABLED else None
+
+        primary    = asyncio.ensure_future(self.chat(**kwargs))
+        hedge      = None
+        pending    = {primary}
+        last_error = None
+        try:
+            while pending:
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                timeout = None if wake == float("inf") else max(0.0, wake - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.breaker.record_success()
+                        if task is hedge:
+                            self.hedge_won += 1
+                            observe_llm_outcome("hedge_won")
+                        observe_llm_outcome("ok")
+                        return task.result()
+                    last_error = task.exception()
+
+                now = loop.time()
+                if pending and now >= deadline:
+                    break
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if pending and not self._slots.locked():
+                        self.hedged += 1
+                        observe_llm_outcome("hedged")
+                        hedge = asyncio.ensure_future(self.chat(**kwargs))
+                        pending.add(hedge)
+
+            if not pending:
+                self._record_failure(last_error, "error")
+                raise last_error
+            error = LLMBudgetExceeded(f"no LLM answer within {budget_s:.2f}s")
+            self._record_failure(error, "budget_exceeded")
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            # Any exit that did not judge the LLM (cancellation, saturation, a bug) frees the probe;
+            # after record_success / record_failure this is a no-op
+            if probe:
+                self.breaker.abandon()
+
+    async def stream_within_budget(self, budget_s: Optional[float] = None, **kwargs) -> AsyncIterator[str]:
+        """``stream`` whose first delta must arrive within the budget; later deltas are not bounded."""
+        probe    = self._check_breaker()
+        budget_s = settings.LLM_BUDGET_S if budget_s is None else budget_s
+        deltas   = self.stream(**kwargs)
+        try:
+            try:
+                first = await asyncio.wait_for(deltas.__anext__(), budget_s if budget_s > 0 else None)
+            except asyncio.TimeoutError:
+                error = LLMBudgetExceeded(f"no first token within {budget_s:.2f}s")
+                self._record_failure(error, "budget_exceeded")
+                raise error
+            except StopAsyncIteration:
+                self.breaker.record_success()
+                observe_llm_outcome("ok")
+                return
+            yield first
+            async for text in deltas:
+                yield text
+        except LLMBudgetExceeded:
+            raise
+        except Exception as e:
+            self._record_failure(e, "error")
+            raise
+        else:
+            self.breaker.record_success()
+            observe_llm_outcome("ok")
+        finally:
+            if probe:
+                self.breaker.abandon()
+            await deltas.aclose()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight":       self.in_flight,
+            "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+            "rejected":        self.rejected,
+            "budget_s":        settings.LLM_BUDGET_S,
+            "hedging":         settings.LLM_HEDGE_ENABLED,
+            "hedge_delay_s":   round(self.hedge_delay(), 3),
+            "hedged":          self.hedged,
+            "hedge_won":       self.hedge_won,
+            "breaker":         self.breaker.stats(),
+        }
+
+
+def create_llm_client() -> Optional[LLMClient]:
+    """Client for ``OPENAI_API_KEY`` (and optional ``OPENAI_BASE_URL``), or ``None``."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    try:
+        return LLMClient(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+    except ImportError:
+        logger.warning("openai package not installed — ML-driven template engine will be used.")
+        return None
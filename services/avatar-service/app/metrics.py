@@ -0,0 +1,109 @@
+"""
+Prometheus metrics for the avatar service
+=========================================
+Time-to-first-token and full-response latency for avatar replies, split by
+the path that produced them (``gpt``, ``cache`` or ``template``) and by delivery mode
+(``stream`` or ``unary``), plus a count of replies served by coalescing onto an
+identical in-flight request. LLM call outcomes (budget overruns, hedges,
+breaker short-circuits), the circuit breaker state, prompt token usage
+after budgeting and text-to-speech sentences (synthesized vs. served from
+the clip cache) are exported alongside.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0)
+
+TIME_TO_FIRST_TOKEN = Histogram(
+    "serenemind_avatar_ttft_seconds",
+    "Time from request start to the first reply text sent to the client",
+    ["source", "mode"],
+    buckets=_LATENCY_BUCKETS,
+)
+RESPONSE_LATENCY = Histogram(
+    "serenemind_avatar_response_seconds",
+    "Time from request start to the complete avatar reply",
+    ["source", "mode"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+COALESCED_REQUESTS = Counter(
+    "serenemind_avatar_coalesced_requests_total",
+    "Requests served by another identical in-flight request's computation",
+    ["endpoint"],
+)
+
+LLM_OUTCOMES = Counter(
+    "serenemind_avatar_llm_calls_total",
+    "Budgeted LLM calls by outcome (ok, error, budget_exceeded, short_circuited, hedged, hedge_won)",
+    ["outcome"],
+)
+BREAKER_STATE = Gauge(
+    "serenemind_avatar_llm_breaker_state",
+    "LLM circuit breaker state: 0 closed, 1 half-open, 2 open",
+    multiprocess_mode="max",
+)
+
+PROMPT_TOKENS = Histogram(
+    "serenemind_avatar_prompt_tokens",
+    "Journal + history tokens sent to the LLM after budgeting",
+    buckets=(50, 100, 200, 400, 800, 1200, 1600, 2400, 3200),
+)
+PROMPT_TOKENS_SAVED = Counter(
+    "serenemind_avatar_prompt_tokens_saved_total",
+    "Journal + history tokens trimmed from LLM prompts by the token budget",
+)
+
+TTS_SENTENCES = Counter(
+    "serenemind_avatar_tts_sentences_total",
+    "Sentences voiced by text-to-speech, by source (engine or cache)",
+    ["source"],
+)
+TTS_SYNTH_SECONDS = Histogram(
+    "serenemind_avatar_tts_synth_seconds",
+    "Engine time to synthesize one sentence (cache hits excluded)",
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+def observe_tts_sentence(source: str, seconds: float):
+    TTS_SENTENCES.labels(source).inc()
+    if source == "engine":
+        TTS_SYNTH_SECONDS.observe(seconds)
+
+
+def observe_prompt(tokens_used: int, tokens_saved: int):
+    PROMPT_TOKENS.observe(tokens_used)
+    PROMPT_TOKENS_SAVED.inc(tokens_saved)
+
+
+def observe_llm_outcome(outcome: str):
+    LLM_OUTCOMES.labels(outcome).inc()
+
+
+def observe_ttft(source: str, mode: str, seconds: float):
+    TIME_TO_FIRST_TOKEN.labels(source, mode).observe(seconds)
+
+
+def observe_response(source: str, mode: str, seconds: float):
+    RESPONSE_LATENCY.labels(source, mode).observe(seconds)
+
+
+def render_latest() -> tuple:
+    """Return ``(body, content_type)`` for the ``/metrics`` endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
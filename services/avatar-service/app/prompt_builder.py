@@ -0,0 +1,168 @@
+"""
+Token-budgeted prompt inputs
+============================
+Fits the journal entry and conversation history of the avatar prompt into
+``PROMPT_TOKEN_BUDGET`` tokens, so input tokens, cost and latency stop
+growing with entry length.
+
+  - short entries and history that fit are passed through untouched
+  - long entries are split into sentences and ranked by the ai-service's
+    per-chunk distress signals (``chunk_signals``); the highest-signal
+    sentences are kept verbatim in their original order and the gaps are
+    marked as omitted
+  - sentences overlapping a chunk the analyzer flagged ``crisis`` or containing
+    one of the shared ``EXPLICIT_CRISIS_KEYWORDS`` are always kept, even past
+    the budget
+  - history keeps the newest turns that fit its share of the budget
+
+Token counts use ``tiktoken`` when it is installed, otherwise ~4 characters
+per token.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from serenemind_common.crisis_keywords import EXPLICIT_CRISIS_KEYWORDS
+
+from app.config import settings
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # not installed, or the encoding cannot be fetched offline
+    _ENCODING = None
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n+|$)")
+_OMITTED     = "[… {} sentence(s) omitted …]"
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, round(len(text) / 4))
+
+
+@dataclass
+class PromptPlan:
+    journal: str
+    history: List[Dict] = field(default_factory=list)
+    tokens_full: int = 0          # journal + history tokens before trimming
+    tokens_used: int = 0
+    passages_kept: int = 0
+    passages_dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_full - self.tokens_used)
+
+
+def _omitted_tokens() -> int:
+    return estimate_tokens(_OMITTED.format(9999))
+
+
+def _passages(text: str) -> List[Tuple[int, int]]:
+    """Sentence spans ``(start, end)`` with surrounding whitespace stripped."""
+    spans = []
+    for m in _SENTENCE_RE.finditer(text):
+        start, end = m.span()
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            spans.append((start, end))
+    return spans
+
+
+def _passage_signal(span: Tuple[int, int], chunk_signals: List[Dict]) -> float:
+    """Strongest signal among the analyzer chunks overlapping the passage."""
+    start, end = span
+    return max((c.get("signal", 0.0) for c in chunk_signals
+                if c.get("start", 0) < end and c.get("end", 0) > start), default=0.0)
+
+
+def _passage_crisis(span: Tuple[int, int], chunk_signals: List[Dict]) -> bool:
+    """Whether any analyzer chunk overlapping the passage was flagged ``crisis``."""
+    start, end = span
+    return any(c.get("crisis") for c in chunk_signals
+               if c.get("start", 0) < end and c.get("end", 0) > start)
+
+
+def trim_journal(text: str, budget: int, chunk_signals: Optional[List[Dict]] = None,
+                 crisis_keywords: Optional[List[str]] = None) -> Tuple[str, int, int]:
+    """Return ``(excerpt, kept, dropped)``; ``text`` is returned unchanged when it fits."""
+    spans = _passages(text)
+    if estimate_tokens(text) <= budget or len(spans) < 2:
+        return text, len(spans), 0
+
+    # Chunk spans are approximate, so the keyword check also runs when signals are present
+    keywords = [k.lower() for k in (crisis_keywords or EXPLICIT_CRISIS_KEYWORDS)]
+    signals  = chunk_signals or []
+    tokens   = [estimate_tokens(text[s:e]) for s, e in spans]
+    keep     = {i for i, (s, e) in enumerate(spans)
+                if _passage_crisis((s, e), signals) or any(k in text[s:e].lower() for k in keywords)}
+    used     = sum(tokens[i] for i in keep)
+
+    # Highest signal first; ties favour the end of the entry, which the analyzer also weights up.
+    # k kept sentences leave at most k + 1 gaps, so one omission marker is charged per sentence plus one.
+    marker = _omitted_tokens()
+    ranked = sorted((i for i in range(len(spans)) if i not in keep),
+                    key=lambda i: (_passage_signal(spans[i], signals), i), reverse=True)
+    for i in ranked:
+        if used + tokens[i] + marker * (len(keep) + 2) <= budget or not keep:
+            keep.add(i)
+            used += tokens[i]
+
+    parts, last = [], -1
+    for i in sorted(keep):
+        if i > last + 1:
+            parts.append(_OMITTED.format(i - last - 1))
+        parts.append(text[spans[i][0]:spans[i][1]])
+        last = i
+    if last < len(spans) - 1:
+        parts.append(_OMITTED.format(len(spans) - 1 - last))
+    return " ".join(parts), len(keep), len(spans) - len(keep)
+
+
+def trim_history(history: List[Dict], budget: int) -> List[Dict]:
+    """Newest turns that fit ``budget``; the newest one is truncated rather than dropped."""
+    kept, used = [], 0
+    for turn in reversed(history):
+        cost = estimate_tokens(turn["content"])
+        if used + cost > budget:
+            if not kept and budget > 0:
+                kept.append({**turn, "content": turn["content"][:budget * 4].rstrip() + " …"})
+            break
+        kept.append(turn)
+        used += cost
+    return list(reversed(kept))
+
+
+def build_prompt_inputs(journal_text: str, conversation_history: Optional[list] = None,
+                        chunk_signals: Optional[List[Dict]] = None,
+                        budget_tokens: Optional[int] = None) -> PromptPlan:
+    """Journal excerpt and history for the avatar prompt within ``budget_tokens`` (default ``PROMPT_TOKEN_BUDGET``)."""
+    budget  = settings.PROMPT_TOKEN_BUDGET if budget_tokens is None else budget_tokens
+    history = [
+        {"role": h["role"], "content": h.get("content") or h.get("text", "")}
+        for h in (conversation_history or [])[-settings.PROMPT_HISTORY_TURNS:]
+    ]
+    journal_tokens = estimate_tokens(journal_text)
+    history_tokens = sum(estimate_tokens(h["content"]) for h in history)
+    full = journal_tokens + history_tokens
+    plan = PromptPlan(journal=journal_text, history=history, tokens_full=full, tokens_used=full,
+                      passages_kept=len(_passages(journal_text)))
+    if budget <= 0 or full <= budget:
+        return plan
+
+    # History gets at most its share; whatever the journal does not need goes back to history
+    history_budget = min(history_tokens, int(budget * settings.PROMPT_HISTORY_SHARE))
+    plan.journal, plan.passages_kept, plan.passages_dropped = trim_journal(
+        journal_text, budget - history_budget, chunk_signals)
+    journal_used   = estimate_tokens(plan.journal)
+    plan.history   = trim_history(history, max(history_budget, budget - journal_used))
+    plan.tokens_used = journal_used + sum(estimate_tokens(h["content"]) for h in plan.history)
+    return plan
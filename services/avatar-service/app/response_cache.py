@@ -0,0 +1,114 @@
+"""
+Semantic response cache
+=======================
+Shares generated GPT replies between requests with the same analysis, so a
+common emotional situation costs a handful of LLM calls rather than one per
+entry.
+
+  - key: the bucketed analysis signature — emotion, mental state, risk level,
+    severity band and tag set — with no user, session or journal text in it
+  - replies for cacheable requests are written by GPT from that signature
+    alone (``app.response_generator``), so they contain nothing from any one
+    user's entry and are safe to serve to everyone with the same signature
+  - each key collects up to ``variants`` replies from real LLM calls, then
+    serves them in rotation so repeat visitors do not see the same text
+  - whole keys expire ``ttl_s`` after their first reply; least recently used
+    keys are evicted beyond ``max_keys``
+  - HIGH / CRISIS requests and requests with conversation history are never
+    cached: those replies must speak to the entry and the conversation
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+UNCACHEABLE_RISK = {"HIGH", "CRISIS"}
+
+
+def severity_band(severity: int) -> str:
+    if severity <= 3:
+        return "low"
+    if severity <= 6:
+        return "mid"
+    return "high"
+
+
+@dataclass
+class _Entry:
+    created: float
+    variants: List[str] = field(default_factory=list)
+    served: int = 0
+
+
+class ResponseCache:
+
+    def __init__(self, ttl_s: float = 3600.0, max_keys: int = 5000, variants: int = 3):
+        self.ttl_s    = ttl_s
+        self.max_keys = max_keys
+        self.variants = max(1, variants)
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+
+        self.hits      = 0
+        self.misses    = 0
+        self.bypassed  = 0
+        self.evictions = 0
+        self.expired   = 0
+
+    def signature(self, emotion: str, mental_state: str, risk_level: str, severity_rating: int,
+                  tags: List[str], conversation_history: Optional[list] = None) -> Optional[Tuple]:
+        """Cache key for a request, or ``None`` when it must not be cached."""
+        if risk_level.upper() in UNCACHEABLE_RISK or conversation_history:
+            self.bypassed += 1
+            return None
+        return (emotion.lower(), mental_state.lower(), risk_level.upper(),
+                severity_band(severity_rating), tuple(sorted({t.lower() for t in tags})))
+
+    def get(self, key: Optional[Tuple]) -> Optional[str]:
+        """A cached variant once the key has a full set, rotating on each hit."""
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.created > self.ttl_s:
+            del self._entries[key]
+            self.expired += 1
+            entry = None
+        if entry is None or len(entry.variants) < self.variants:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        text = entry.variants[entry.served % len(entry.variants)]
+        entry.served += 1
+        self.hits += 1
+        return text
+
+    def put(self, key: Optional[Tuple], text: str):
+        if key is None or not text:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(created=time.monotonic())
+        # Duplicates still count towards filling the key, or a model that repeats
+        # itself would keep the key cold forever
+        if len(entry.variants) < self.variants:
+            entry.variants.append(text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "keys":             len(self._entries),
+            "full_keys":        sum(len(e.variants) >= self.variants for e in self._entries.values()),
+            "max_keys":         self.max_keys,
+            "variants_per_key": self.variants,
+            "ttl_s":            self.ttl_s,
+            "hits":             self.hits,
+            "misses":           self.misses,
+            "bypassed":         self.bypassed,
+            "hit_rate":         round(self.hits / lookups, 4) if lookups else None,
+            "evictions":        self.evictions,
+            "expired":          self.expired,
+        }
@@ -11,21 +11,38 @@ No OpenAI key required — responses are built from model outputs.
 If an OpenAI key IS present, it uses GPT-4o-mini for richer, generative text.
 """
 
-import os
-import random
+import re
+import time
 import logging
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.config import settings
+from app.llm_client import CircuitOpen, LLMBudgetExceeded, create_llm_client
+from app.metrics import observe_prompt, observe_response, observe_ttft
+from app.prompt_builder import build_prompt_inputs
+from app.response_cache import ResponseCache, severity_band
+from app.template_catalog import TemplateCatalog
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
-api_key = os.getenv("OPENAI_API_KEY")
-client = None
-if api_key:
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
-    except ImportError:
-        logger.warning("openai package not installed — ML-driven template engine will be used.")
+# Shared async client (connection pool + concurrency limit); None without an API key
+client = create_llm_client()
+
+# Shared cache for GPT replies written from the analysis signature — template replies are cheap
+# and never cached
+response_cache = ResponseCache(
+    ttl_s    = settings.RESPONSE_CACHE_TTL_S,
+    max_keys = settings.RESPONSE_CACHE_MAX_KEYS,
+    variants = settings.RESPONSE_CACHE_VARIANTS,
+) if settings.RESPONSE_CACHE_ENABLED else None
+
+
+def _cache_key(emotion, mental_state, risk_level, severity_rating, tags, conversation_history):
+    if client is None or response_cache is None:
+        return None
+    return response_cache.signature(emotion, mental_state, risk_level, severity_rating, tags,
+                                    conversation_history)
 
 # ---------------------------------------------------------------------------
 # EMOTION TEMPLATES — Multiple variants per emotion so responses feel natural
@@ -170,6 +187,19 @@ CRISIS_ADDS = {
     "CRISIS": "🆘 I'm genuinely concerned about your safety right now. Please reach out immediately — Umang helpline: 0317-4288665. You matter deeply, and support is available right now.",
 }
 
+# Pools compiled once into an indexed catalog with per-user variant rotation;
+# TEMPLATE_CATALOG_PATH swaps in pools from a JSON data file
+if settings.TEMPLATE_CATALOG_PATH:
+    template_catalog = TemplateCatalog.load(settings.TEMPLATE_CATALOG_PATH,
+                                            max_users=settings.TEMPLATE_RECENT_USERS)
+else:
+    template_catalog = TemplateCatalog.from_data({
+        "emotion_openers":      EMOTION_OPENERS,
+        "mental_state_bridges": MENTAL_STATE_BRIDGES,
+        "closing_questions":    CLOSING_QUESTIONS,
+        "crisis_adds":          CRISIS_ADDS,
+    }, max_users=settings.TEMPLATE_RECENT_USERS)
+
 # CONFIDENCE threshold labels
 def _conf_label(conf: float) -> str:
     if conf >= 0.85: return "high"
@@ -184,10 +214,13 @@ def _build_smart_response(
     crisis_probability: float,
     mental_state: str,
     mental_health_confidence: float,
+    include_crisis_add: bool = True,
+    user_id: Optional[str] = None,
 ) -> str:
     """
     Build a dynamic, contextual response purely from ML model outputs.
-    Uses weighted random selection across template pools to avoid repetition.
+    Variants come from the template catalog, which avoids the ones this user saw recently.
+    ``include_crisis_add=False`` leaves out the helpline line (streaming sends it first).
     """
     emotion_key = emotion.lower()
     mental_key = mental_state.lower()
@@ -196,8 +229,7 @@ def _build_smart_response(
     conf_word = _conf_label(confidence)
 
     # 1. Opening — emotion-driven
-    openers = EMOTION_OPENERS.get(emotion_key, EMOTION_OPENERS["neutral"])
-    opener = random.choice(openers)
+    opener = template_catalog.pick("emotion_openers", emotion_key, user_id)
 
     # 2. Confidence context — tell user what the model detected
     if confidence >= 0.70:
@@ -206,8 +238,7 @@ def _build_smart_response(
         conf_line = f"Your words carry undertones of {emotion_key} ({conf_pct}% confidence from our model), though emotions are rarely one thing."
 
     # 3. Mental health bridge — insight from the mental health classifier
-    mh_options = MENTAL_STATE_BRIDGES.get(mental_key, MENTAL_STATE_BRIDGES["normal"])
-    mh_bridge = random.choice([m for m in mh_options if m])  # skip empty options
+    mh_bridge = template_catalog.pick("mental_state_bridges", mental_key, user_id)
     if mh_bridge:
         mh_bridge = mh_bridge.replace("{conf_pct}", str(mh_pct))
 
@@ -220,11 +251,10 @@ def _build_smart_response(
         crisis_line = ""
 
     # 5. Closing question — emotion-driven, encourages reflection
-    closing_opts = CLOSING_QUESTIONS.get(emotion_key, CLOSING_QUESTIONS["neutral"])
-    closing = random.choice([c for c in closing_opts if c]) if any(closing_opts) else ""
+    closing = template_catalog.pick("closing_questions", emotion_key, user_id)
 
     # 6. Crisis resource if needed
-    crisis_add = CRISIS_ADDS.get(risk_level, "")
+    crisis_add = template_catalog.crisis_add(risk_level) if include_crisis_add else ""
 
     # --- Assemble ---
     parts = [opener, conf_line]
@@ -252,11 +282,78 @@ SAFETY: If risk_level is HIGH or CRISIS, include Umang 0317-4288665. Never minim
 CONTEXT: Use the provided severity_rating (1-10), tags, and semantic_summary to tailor your empathy.
 """
 
+# Streaming sends the helpline as its own ``crisis`` event before the reply, so GPT must not repeat it
+GPT_STREAM_SYSTEM_PROMPT = GPT_SYSTEM_PROMPT.replace(
+    "SAFETY: If risk_level is HIGH or CRISIS, include Umang 0317-4288665.",
+    "SAFETY: For HIGH or CRISIS risk the Umang helpline is already shown above your reply — do not repeat it.",
+)
+
+
+# Cached replies are served to everyone with the same analysis signature, so GPT writes them
+# without ever seeing an entry
+GPT_SHARED_SYSTEM_PROMPT = GPT_SYSTEM_PROMPT + (
+    "SHARED REPLY: You see the analysis only, not the journal entry. Do not invent or refer to "
+    "specific events; speak to the emotion, mental state and themes given.\n"
+)
+
 
 # ---------------------------------------------------------------------------
 # PUBLIC API
 # ---------------------------------------------------------------------------
-def generate_avatar_response(
+def _build_shared_messages(emotion: str, mental_state: str, risk_level: str, severity_rating: int,
+                           tags: List[str]) -> list:
+    """Chat messages for a cacheable reply: exactly the fields of the cache key, nothing from the entry."""
+    user_msg = (
+        f'Emotion       → {emotion}\n'
+        f'Mental Health → {mental_state}\n'
+        f'Crisis Risk   → {risk_level}\n'
+        f'Severity      → {severity_band(severity_rating)}\n'
+        f'Tags          → {", ".join(sorted(set(tags))) if tags else "none"}\n'
+    )
+    return [{"role": "system", "content": GPT_SHARED_SYSTEM_PROMPT}, {"role": "user", "content": user_msg}]
+
+
+def _build_messages(
+    journal_text: str,
+    emotion: str,
+    confidence: float,
+    risk_level: str,
+    crisis_probability: float,
+    mental_state: str,
+    mental_health_confidence: float,
+    severity_rating: int,
+    tags: List[str],
+    semantic_summary: str,
+    conversation_history: Optional[list],
+    chunk_signals: Optional[list] = None,
+    helpline_shown: bool = False,
+) -> Tuple[list, int]:
+    """
+    Chat messages for GPT-4o-mini — system prompt, recent history and the analysis
+    summary — plus the number of tokens the prompt budget trimmed away.
+    ``helpline_shown`` (streaming) leaves the helpline out of GPT's instructions.
+    """
+    # History is reduced to role + content; long entries / history are cut to PROMPT_TOKEN_BUDGET
+    plan = build_prompt_inputs(journal_text, conversation_history, chunk_signals)
+    observe_prompt(plan.tokens_used, plan.tokens_saved)
+    messages = [{"role": "system", "content": GPT_STREAM_SYSTEM_PROMPT if helpline_shown else GPT_SYSTEM_PROMPT}]
+    messages.extend(plan.history)
+
+    user_msg = (
+        f'Journal: "{plan.journal}"\n'
+        f'Emotion Model → {emotion} ({confidence*100:.1f}%)\n'
+        f'Crisis Model  → {risk_level} (p={crisis_probability:.2f})\n'
+        f'Mental Health → {mental_state} ({mental_health_confidence*100:.1f}%)\n'
+        f'Severity      → {severity_rating}/10\n'
+        f'Tags          → {", ".join(tags) if tags else "none"}\n'
+        f'Summary       → {semantic_summary}\n'
+        f'{"CRITICAL: Include Umang 0317-4288665" if risk_level in ["HIGH","CRISIS"] and not helpline_shown else ""}'
+    )
+    messages.append({"role": "user", "content": user_msg})
+    return messages, plan.tokens_saved
+
+
+async def generate_avatar_response(
     journal_text: str,
     emotion: str,
     confidence: float,
@@ -268,44 +365,59 @@ def generate_avatar_response(
     tags: List[str] = [],
     semantic_summary: str = "",
     conversation_history: Optional[list] = None,
+    budget_s: Optional[float] = None,
+    chunk_signals: Optional[list] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
 ) -> dict:
     """
     Generate a contextual avatar response using:
     - All 3 ML model outputs (including unified v2 fields) as primary inputs
     - GPT-4o-mini if OPENAI_API_KEY is set, otherwise the smart template engine
+    - the template engine as soon as ``budget_s`` (default LLM_BUDGET_S) runs out,
+      or straight away while the LLM circuit breaker is open
     """
+    start = time.perf_counter()
+
+    # LOW / MEDIUM opening entries share signature-only replies; everything else is written for the entry
+    cache_key = _cache_key(emotion, mental_state, risk_level, severity_rating, tags, conversation_history)
+    cached = response_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        observe_response("cache", "unary", time.perf_counter() - start)
+        return {
+            "text": cached,
+            "emotion_context": emotion,
+            "mental_state": mental_state,
+            "risk_acknowledged": False,
+            "source": "cache",
+            "tokens_used": 0,
+        }
 
     # Try GPT-4o-mini first if key is available
     if client:
         try:
-            messages = [{"role": "system", "content": GPT_SYSTEM_PROMPT}]
-            if conversation_history:
-                # Clean history: only keep role and content for GPT safety
-                clean_history = [
-                    {"role": h["role"], "content": h.get("content") or h.get("text", "")}
-                    for h in conversation_history[-6:]
-                ]
-                messages.extend(clean_history)
-
-            user_msg = (
-                f'Journal: "{journal_text}"\n'
-                f'Emotion Model → {emotion} ({confidence*100:.1f}%)\n'
-                f'Crisis Model  → {risk_level} (p={crisis_probability:.2f})\n'
-                f'Mental Health → {mental_state} ({mental_health_confidence*100:.1f}%)\n'
-                f'Severity      → {severity_rating}/10\n'
-                f'Tags          → {", ".join(tags) if tags else "none"}\n'
-                f'Summary       → {semantic_summary}\n'
-                f'{"CRITICAL: Include Umang 0317-4288665" if risk_level in ["HIGH","CRISIS"] else ""}'
-            )
-            messages.append({"role": "user", "content": user_msg})
-
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                max_tokens=220,
-                temperature=0.72,
-            )
+            if cache_key is not None:
+                messages, tokens_saved = _build_shared_messages(emotion, mental_state, risk_level,
+                                                                severity_rating, tags), 0
+            else:
+                messages, tokens_saved = _build_messages(
+                    journal_text, emotion, confidence, risk_level, crisis_probability, mental_state,
+                    mental_health_confidence, severity_rating, tags, semantic_summary, conversation_history,
+                    chunk_signals,
+                )
+            with tracer.span("llm.chat_completion", model="gpt-4o-mini", prompt_tokens_saved=tokens_saved) as span:
+                response = await client.chat_within_budget(
+                    budget_s,
+                    model="gpt-4o-mini",
+                    messages=messages,
+                    max_tokens=220,
+                    temperature=0.72,
+                )
+                span.set_attribute("tokens_used", response.usage.total_tokens)
             avatar_text = response.choices[0].message.content.strip()
+            if cache_key is not None:
+                response_cache.put(cache_key, avatar_text)
+            observe_response("gpt", "unary", time.perf_counter() - start)
             return {
                 "text": avatar_text,
                 "emotion_context": emotion,
@@ -313,25 +425,34 @@ def generate_avatar_response(
                 "risk_acknowledged": risk_level in ["HIGH", "CRISIS"],
                 "source": "gpt-4o-mini",
                 "tokens_used": response.usage.total_tokens,
+                "prompt_tokens_saved": tokens_saved,
             }
+        except CircuitOpen:
+            pass  # counted in the LLM outcome metrics; logging every skip would flood the log
+        except LLMBudgetExceeded as e:
+            logger.warning(f"{e}. Falling back to ML-driven templates.")
         except Exception as e:
             logger.error(f"GPT call failed: {e}. Falling back to ML-driven templates.")
 
     # --- ML-DRIVEN TEMPLATE ENGINE (no API key needed) ---
-    avatar_text = _build_smart_response(
-        emotion=emotion,
-        confidence=confidence,
-        risk_level=risk_level,
-        crisis_probability=crisis_probability,
-        mental_state=mental_state,
-        mental_health_confidence=mental_health_confidence,
-    )
+    with tracer.span("template_response", risk_level=risk_level):
+        avatar_text = _build_smart_response(
+            emotion=emotion,
+            confidence=confidence,
+            risk_level=risk_level,
+            crisis_probability=crisis_probability,
+            mental_state=mental_state,
+            mental_health_confidence=mental_health_confidence,
+            user_id=user_id or session_id,   # rotation per user, else per conversation
+        )
 
     logger.info(
-        f"ML-driven response | emotion={emotion}({confidence:.2f}) | "
-        f"mental={mental_state}({mental_health_confidence:.2f}) | risk={risk_level}({crisis_probability:.2f})"
+        "ML-driven response | emotion=%s(%.2f) | mental=%s(%.2f) | risk=%s(%.2f)",
+        emotion, confidence, mental_state, mental_health_confidence, risk_level, crisis_probability,
+        extra={"event": "avatar_response", "crisis": risk_level in ("HIGH", "CRISIS")},
     )
 
+    observe_response("template", "unary", time.perf_counter() - start)
     return {
         "text": avatar_text,
         "emotion_context": emotion,
@@ -340,3 +461,121 @@ def generate_avatar_response(
         "source": "ml-template",
         "tokens_used": 0,
     }
+
+
+# ---------------------------------------------------------------------------
+# STREAMING API — (event, data) pairs for Server-Sent Events
+#   crisis  helpline line for HIGH/CRISIS risk, always sent before any reply text
+#   delta   reply text to append (GPT tokens or template sentences)
+#   done    final metadata, same fields as the unary response
+# ---------------------------------------------------------------------------
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+async def stream_avatar_response(
+    journal_text: str,
+    emotion: str,
+    confidence: float,
+    risk_level: str,
+    crisis_probability: float = 0.0,
+    mental_state: str = "normal",
+    mental_health_confidence: float = 0.0,
+    severity_rating: int = 0,
+    tags: List[str] = [],
+    semantic_summary: str = "",
+    conversation_history: Optional[list] = None,
+    budget_s: Optional[float] = None,
+    chunk_signals: Optional[list] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """Streaming variant of ``generate_avatar_response``; ``budget_s`` bounds the wait for the first GPT token."""
+    start     = time.perf_counter()
+    ttft      = None
+    elevated  = risk_level in ("HIGH", "CRISIS")
+    parts     = []
+    source    = "ml-template"
+    tokens    = 0
+    truncated = False
+    tokens_saved = 0
+
+    def _delta(text: str, path: str) -> dict:
+        nonlocal ttft
+        if ttft is None:
+            ttft = time.perf_counter() - start
+            observe_ttft(path, "stream", ttft)
+        parts.append(text)
+        return {"text": text}
+
+    if elevated:
+        yield "crisis", {"text": template_catalog.crisis_add(risk_level)}
+
+    # LOW / MEDIUM opening entries share signature-only replies; everything else is written for the entry
+    cache_key = _cache_key(emotion, mental_state, risk_level, severity_rating, tags, conversation_history)
+    cached = response_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        source = "cache"
+        for i, sentence in enumerate(_SENTENCE_END.split(cached)):
+            yield "delta", _delta(sentence if i == 0 else " " + sentence, "cache")
+
+    elif client:
+        if cache_key is not None:
+            messages = _build_shared_messages(emotion, mental_state, risk_level, severity_rating, tags)
+        else:
+            messages, tokens_saved = _build_messages(
+                journal_text, emotion, confidence, risk_level, crisis_probability, mental_state,
+                mental_health_confidence, severity_rating, tags, semantic_summary, conversation_history,
+                chunk_signals, helpline_shown=elevated,
+            )
+        try:
+            with tracer.span("llm.chat_completion", model="gpt-4o-mini", stream=True,
+                             prompt_tokens_saved=tokens_saved) as span:
+                async for text in client.stream_within_budget(budget_s, model="gpt-4o-mini", messages=messages,
+                                                              max_tokens=220, temperature=0.72):
+                    tokens += 1
+                    yield "delta", _delta(text, "gpt")
+                span.set_attribute("chunks", tokens)
+            source = "gpt-4o-mini"
+            if cache_key is not None:
+                response_cache.put(cache_key, "".join(parts).strip())
+        except CircuitOpen:
+            pass
+        except LLMBudgetExceeded as e:
+            logger.warning(f"{e}. Falling back to ML-driven templates.")
+        except Exception as e:
+            if not parts:
+                logger.error(f"GPT stream failed: {e}. Falling back to ML-driven templates.")
+            else:
+                # Text already reached the user — finish here rather than append a second reply
+                logger.error(f"GPT stream failed after {tokens} chunks: {e}")
+                source, truncated = "gpt-4o-mini", True
+
+    if source == "ml-template":
+        with tracer.span("template_response", risk_level=risk_level, stream=True):
+            avatar_text = _build_smart_response(
+                emotion=emotion,
+                confidence=confidence,
+                risk_level=risk_level,
+                crisis_probability=crisis_probability,
+                mental_state=mental_state,
+                mental_health_confidence=mental_health_confidence,
+                include_crisis_add=not elevated,
+                user_id=user_id or session_id,   # rotation per user, else per conversation
+            )
+        for i, sentence in enumerate(_SENTENCE_END.split(avatar_text)):
+            yield "delta", _delta(sentence if i == 0 else " " + sentence, "template")
+
+    path = {"gpt-4o-mini": "gpt", "ml-template": "template"}.get(source, source)
+    observe_response(path, "stream", time.perf_counter() - start)
+    yield "done", {
+        "text": "".join(parts).strip(),
+        "crisis_line": template_catalog.crisis_add(risk_level) if elevated else None,
+        "emotion_context": emotion,
+        "mental_state": mental_state,
+        "risk_acknowledged": elevated,
+        "source": source,
+        "tokens_used": tokens,
+        "prompt_tokens_saved": tokens_saved,
+        "ttft_ms": round(ttft * 1000, 2) if ttft is not None else None,
+        "truncated": truncated,
+    }
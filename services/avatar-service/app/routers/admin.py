@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Query
+
+from app.tracing import tracer
+
+router = APIRouter()
+
+
+@router.get("/llm")
+async def llm_client_stats():
+    """In-flight and rejected LLM calls, latency budget, hedging and circuit breaker state."""
+    from app.response_generator import client
+    if client is None:
+        return {"active": False}
+    return {"active": True, **client.stats()}
+
+
+@router.get("/ai-service")
+async def ai_service_stats():
+    """Internal ai-service client used by /avatar/pipeline: target and request / error counts."""
+    from app.ai_client import ai_client
+    return ai_client.stats()
+
+
+@router.get("/cache")
+async def response_cache_stats():
+    """Semantic response cache size, hit rate and evictions."""
+    from app.response_generator import response_cache
+    if response_cache is None:
+        return {"active": False}
+    return {"active": True, **response_cache.stats()}
+
+
+@router.get("/templates")
+async def template_catalog_stats():
+    """Compiled template slots and variants, and users tracked for variant rotation."""
+    from app.response_generator import template_catalog
+    return template_catalog.stats()
+
+
+@router.get("/tts")
+async def tts_stats():
+    """Text-to-speech engine, sentences synthesized and clip cache hit rate / size."""
+    from app.tts_handler import tts
+    return tts.stats()
+
+
+@router.get("/sessions")
+async def session_stats():
+    """Conversation sessions held in this process, with expiry and eviction counts."""
+    from app.routers.avatar import sessions
+    return sessions.stats()
+
+
+@router.get("/coalescing")
+async def coalescing_stats():
+    """Single-flight counters for /avatar/respond: leaders, collapsed calls, keys in flight."""
+    from app.routers.avatar import inflight
+    return inflight.stats()
+
+
+@router.get("/traces")
+async def recent_traces(trace_id: str = Query(None), limit: int = Query(20, ge=1, le=500)):
+    """Recently finished spans from the in-process collector, grouped by trace."""
+    if tracer.collector is None:
+        return {"sample_rate": tracer.sample_rate, "traces": []}
+    return {"sample_rate": tracer.sample_rate, "traces": tracer.collector.traces(trace_id, limit)}
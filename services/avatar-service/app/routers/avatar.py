@@ -1,10 +1,33 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+import asyncio
+import base64
+import json
+
+from fastapi import APIRouter, Path, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
-from app.response_generator import generate_avatar_response
+from app.ai_client import ai_client
+from app.config import settings
+from app.metrics import COALESCED_REQUESTS
+from app.response_generator import generate_avatar_response, stream_avatar_response
+from app.session_store import SESSION_ID_PATTERN, SessionStore
+from app.tracing import tracer
+from app.tts_handler import tts
+from serenemind_common.singleflight import SingleFlight, request_key
 
 router = APIRouter()
 
+# Double-submits and client retries of the same reply share one generation (and one GPT call)
+inflight = SingleFlight("respond", enabled=settings.SINGLEFLIGHT_ENABLED, counter=COALESCED_REQUESTS)
+
+# Clients send a session_id and the new entry; the window the prompt needs is kept here
+sessions = SessionStore(
+    max_turns      = settings.PROMPT_HISTORY_TURNS,
+    max_turn_chars = settings.SESSION_MAX_TURN_CHARS,
+    idle_ttl_s     = settings.SESSION_IDLE_TTL_S,
+    max_sessions   = settings.SESSION_MAX_SESSIONS,
+)
+
 class AvatarRequest(BaseModel):
     journal_text: str
     emotion: str
@@ -17,11 +40,45 @@ class AvatarRequest(BaseModel):
     severity_rating: Optional[int] = 0
     tags: Optional[List[str]] = []
     semantic_summary: Optional[str] = ""
-    conversation_history: Optional[List[Dict]] = None
+    conversation_history: Optional[List[Dict]] = None   # legacy: full history; prefer session_id
+    session_id: Optional[str] = Field(None, pattern=SESSION_ID_PATTERN)
+    chunk_signals: Optional[List[Dict]] = None   # ai-service per-chunk signals (long entries)
+    user_id: Optional[str] = None                # rotates template variants per user
+    latency_budget_ms: Optional[int] = Field(None, gt=0)   # lowers LLM_BUDGET_S for this request
 
-@router.post("/respond")
-async def respond(request: AvatarRequest):
-    return generate_avatar_response(
+def _budget_s(latency_budget_ms: Optional[int]) -> Optional[float]:
+    """A client budget can only tighten ``LLM_BUDGET_S`` (0 = unbounded), never raise it."""
+    if not latency_budget_ms:
+        return None
+    budget_s = latency_budget_ms / 1000
+    return min(budget_s, settings.LLM_BUDGET_S) if settings.LLM_BUDGET_S > 0 else budget_s
+
+
+def _history(session_id: Optional[str], explicit: Optional[List[Dict]]) -> Optional[List[Dict]]:
+    """History sent by the client wins (older clients); otherwise the session's window."""
+    if explicit is not None or not session_id:
+        return explicit
+    return sessions.history(session_id) or None
+
+
+def _remember(session_id: Optional[str], entry: str, reply: str):
+    if session_id and reply:
+        sessions.append(session_id, {"role": "user", "content": entry},
+                        {"role": "assistant", "content": reply})
+
+
+def _stream_events(stream, session_id: Optional[str], entry: str):
+    """SSE framing for ``stream_avatar_response``; the finished reply is added to the session."""
+    async def events():
+        async for event, data in stream:
+            if event == "done":
+                _remember(session_id, entry, " ".join(filter(None, (data["crisis_line"], data["text"]))))
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return events()
+
+
+def _generator_kwargs(request: AvatarRequest) -> dict:
+    return dict(
         journal_text=request.journal_text,
         emotion=request.emotion,
         confidence=request.confidence,
@@ -32,5 +89,132 @@ async def respond(request: AvatarRequest):
         severity_rating=request.severity_rating or 0,
         tags=request.tags or [],
         semantic_summary=request.semantic_summary or "",
-        conversation_history=request.conversation_history,
+        conversation_history=_history(request.session_id, request.conversation_history),
+        chunk_signals=request.chunk_signals,
+        user_id=request.user_id,
+        session_id=request.session_id,
+        budget_s=_budget_s(request.latency_budget_ms),
     )
+
+@router.post("/respond")
+async def respond(request: AvatarRequest):
+    kwargs = _generator_kwargs(request)
+    result, shared = await inflight.do(request_key(kwargs), lambda: generate_avatar_response(**kwargs))
+    if not shared:
+        _remember(request.session_id, request.journal_text, result["text"])
+    return result
+
+@router.post("/respond/stream")
+async def respond_stream(request: AvatarRequest):
+    """Server-Sent Events: ``crisis`` (HIGH/CRISIS only, first), ``delta`` chunks, then ``done``."""
+    events = _stream_events(stream_avatar_response(**_generator_kwargs(request)),
+                            request.session_id, request.journal_text)
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# ── Pipeline: analysis + reply in one round trip ─────────────────────────────
+class PipelineRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10000)
+    language: Optional[str] = "en"
+    user_id: Optional[str] = None
+    session_id: Optional[str] = Field(None, pattern=SESSION_ID_PATTERN)
+    history: Optional[List[Dict]] = None        # legacy: [{role, content}]; prefer session_id
+    latency_budget_ms: Optional[int] = Field(None, gt=0)
+
+
+def _pipeline_kwargs(request: PipelineRequest, analysis: dict) -> dict:
+    """Generator arguments straight from the ai-service response (what the frontend used to copy)."""
+    unified = analysis["unified"]
+    return dict(
+        journal_text=request.text,
+        emotion=unified["emotion"],
+        confidence=unified["confidence"],
+        risk_level=unified["crisis_risk"],
+        crisis_probability=unified["crisis_probability"],
+        mental_state=unified["mental_state"],
+        mental_health_confidence=analysis.get("mental_health", {}).get("confidence", unified["confidence"]),
+        severity_rating=unified["severity_rating"],
+        tags=unified["tags"],
+        semantic_summary=unified["semantic_summary"],
+        conversation_history=_history(request.session_id, request.history),
+        chunk_signals=unified.get("chunk_signals"),
+        user_id=request.user_id,
+        session_id=request.session_id,
+        budget_s=_budget_s(request.latency_budget_ms),
+    )
+
+
+async def _analyze(request: PipelineRequest, http_request: Request) -> dict:
+    traceparent = tracer.current_traceparent() or http_request.headers.get("traceparent")
+    return await ai_client.analyze(request.text, request.language, request.user_id,
+                                   request.session_id, traceparent)
+
+
+@router.post("/pipeline")
+async def pipeline(request: PipelineRequest, http_request: Request):
+    """Analyze the entry on the ai-service and reply to it: ``{"analysis": ..., "avatar": ...}``."""
+    analysis = await _analyze(request, http_request)
+    kwargs   = _pipeline_kwargs(request, analysis)
+    reply, shared = await inflight.do(request_key(kwargs), lambda: generate_avatar_response(**kwargs))
+    if not shared:
+        _remember(request.session_id, request.text, reply["text"])
+    return {"analysis": analysis, "avatar": reply}
+
+
+@router.post("/pipeline/stream")
+async def pipeline_stream(request: PipelineRequest, http_request: Request):
+    """
+    Server-Sent Events: ``analysis`` (the full ai-service response) first, then the
+    same ``crisis`` / ``delta`` / ``done`` events as ``/respond/stream``. Analysis
+    errors are returned as plain HTTP errors before the stream starts.
+    """
+    analysis = await _analyze(request, http_request)
+    reply    = _stream_events(stream_avatar_response(**_pipeline_kwargs(request, analysis)),
+                              request.session_id, request.text)
+
+    async def events():
+        yield f"event: analysis\ndata: {json.dumps(analysis, ensure_ascii=False)}\n\n"
+        async for frame in reply:
+            yield frame
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.delete("/session/{session_id}")
+async def end_session(session_id: str = Path(..., pattern=SESSION_ID_PATTERN)):
+    """Forget a conversation (e.g. the user starts a new chat); the id itself is the credential."""
+    return {"cleared": sessions.clear(session_id)}
+
+
+# ── Voice: sentence-level text-to-speech ─────────────────────────────────────
+class SpeakRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=5000)
+
+@router.post("/speak")
+async def speak(request: SpeakRequest):
+    """The whole reply as one WAV; use ``/speak/stream`` to start playback sooner."""
+    audio = await asyncio.to_thread(tts.generate_speech, request.text)
+    return Response(content=audio, media_type="audio/wav")
+
+@router.post("/speak/stream")
+async def speak_stream(request: SpeakRequest):
+    """
+    Server-Sent Events: one ``audio`` event per sentence, in order, carrying a
+    standalone base64 WAV clip (``{index, text, audio, cached}``) as soon as it
+    is synthesized, then ``done`` with sentence and cache-hit counts.
+    """
+    async def events():
+        sentences = cached_count = 0
+        async for index, sentence, clip, cached in tts.stream(request.text):
+            sentences    += 1
+            cached_count += cached
+            data = {"index": index, "text": sentence, "cached": cached,
+                    "audio": base64.b64encode(clip).decode("ascii")}
+            yield f"event: audio\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        done = {"sentences": sentences, "cached": cached_count, "media_type": "audio/wav"}
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,97 @@
+"""
+Conversation session store
+==========================
+Server-side conversation window keyed by ``session_id``, so clients send the
+new message only instead of resending the whole conversation every turn.
+
+  - each session keeps the last ``max_turns`` turns (the prompt window,
+    ``PROMPT_HISTORY_TURNS``), each truncated to ``max_turn_chars``
+  - sessions idle for ``idle_ttl_s`` are dropped; beyond ``max_sessions``
+    the least recently used go first
+  - sessions live in this process: run one worker per avatar-service
+    instance or route a session to the same worker
+  - a session id is the only credential for its conversation (anyone who
+    knows it can extend or clear it), so ids must be unguessable: clients
+    generate them with at least 128 random bits, and ids that do not match
+    ``SESSION_ID_PATTERN`` are rejected at the API
+"""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List
+
+# 32+ URL-safe characters: 128 bits as hex (the frontend's newSessionId), more as base64url
+SESSION_ID_PATTERN = r"^[A-Za-z0-9_-]{32,128}$"
+
+
+@dataclass
+class _Session:
+    turns: Deque[Dict[str, str]]
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+class SessionStore:
+
+    def __init__(self, max_turns: int = 6, max_turn_chars: int = 2000,
+                 idle_ttl_s: float = 1800.0, max_sessions: int = 10000):
+        self.max_turns      = max_turns
+        self.max_turn_chars = max_turn_chars
+        self.idle_ttl_s     = idle_ttl_s
+        self.max_sessions   = max_sessions
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+
+        self.created   = 0
+        self.expired   = 0
+        self.evictions = 0
+
+    def _sweep(self, now: float):
+        # Least recently used first, so expired sessions are always at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen > self.idle_ttl_s:
+                del self._sessions[session_id]
+                self.expired += 1
+            elif len(self._sessions) > self.max_sessions:
+                del self._sessions[session_id]
+                self.evictions += 1
+            else:
+                break
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """The session's window as ``[{role, content}]``, oldest first; empty for unknown sessions."""
+        now = time.monotonic()
+        self._sweep(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            return []
+        session.last_seen = now
+        self._sessions.move_to_end(session_id)
+        return list(session.turns)
+
+    def append(self, session_id: str, *turns: Dict[str, str]):
+        """Add ``{role, content}`` turns, keeping only the newest ``max_turns``."""
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session(deque(maxlen=self.max_turns))
+            self.created += 1
+        for turn in turns:
+            session.turns.append({"role": turn["role"], "content": turn["content"][:self.max_turn_chars]})
+        session.last_seen = now
+        self._sessions.move_to_end(session_id)
+        self._sweep(now)
+
+    def clear(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        return {
+            "sessions":       len(self._sessions),
+            "max_sessions":   self.max_sessions,
+            "max_turns":      self.max_turns,
+            "idle_ttl_s":     self.idle_ttl_s,
+            "created":        self.created,
+            "expired":        self.expired,
+            "evictions":      self.evictions,
+        }
@@ -0,0 +1,163 @@
+"""
+Precompiled response-template catalog
+=====================================
+The template pools (openers, mental-state bridges, closing questions, crisis
+additions) compiled once at startup into tuples of non-empty variants, each
+``(pool, key)`` pair owning a numeric slot. Picking a variant is a dict
+lookup plus an index — no per-call filtering or list building.
+
+Variant rotation is tracked per user: a ``bytearray`` per user holds the
+last two variant indices of every slot (two bytes per slot), and a pick
+avoids them whenever the pool is large enough. Users are kept in LRU order
+up to ``max_users``. Callers pass the user id, else the session id (the
+frontend sends no user id); requests with neither share one anonymous state.
+
+Pools load from the built-in constants in ``app.response_generator`` or from
+a JSON file (``TEMPLATE_CATALOG_PATH``) with the same four sections:
+
+    {"emotion_openers": {...}, "mental_state_bridges": {...},
+     "closing_questions": {...}, "crisis_adds": {...}}
+
+Export the built-in pools as a starting point (from services/avatar-service):
+    python -m app.template_catalog --export templates.json
+"""
+
+import argparse
+import json
+import random
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+POOLS = ("emotion_openers", "mental_state_bridges", "closing_questions")
+
+# Key served when a pool has no entry for the requested emotion / mental state
+_DEFAULT_KEYS = {
+    "emotion_openers":      "neutral",
+    "mental_state_bridges": "normal",
+    "closing_questions":    "neutral",
+}
+
+# Risk levels that must have a crisis addition: the helpline line is never allowed to go missing
+_REQUIRED_CRISIS_ADDS = ("HIGH", "CRISIS")
+
+_MAX_VARIANTS = 254   # indices are stored +1 in a byte; 0 means "none yet"
+
+
+class TemplateCatalog:
+
+    def __init__(self, pools: Dict[str, Dict[str, List[str]]], crisis_adds: Dict[str, str],
+                 max_users: int = 10000, seed: Optional[int] = None):
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._variants: List[Tuple[str, ...]] = []
+        for pool in POOLS:
+            for key, variants in pools.get(pool, {}).items():
+                compiled = tuple(v for v in variants if v)[:_MAX_VARIANTS]
+                self._slots[(pool, key.lower())] = len(self._variants)
+                self._variants.append(compiled)
+        for pool, default in _DEFAULT_KEYS.items():
+            if (pool, default) not in self._slots:
+                raise ValueError(f"template pool {pool!r} needs a {default!r} entry")
+        for level in _REQUIRED_CRISIS_ADDS:
+            if not crisis_adds.get(level):
+                raise ValueError(f"crisis_adds needs a non-empty {level!r} entry")
+
+        self.crisis_adds = dict(crisis_adds)
+        self.max_users   = max_users
+        self._recent: "OrderedDict[Optional[str], bytearray]" = OrderedDict()
+        self._rng        = random.Random(seed)
+        self.picks       = 0
+        self.evictions   = 0
+
+    # ── Loading ──────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_data(cls, data: dict, **kwargs) -> "TemplateCatalog":
+        return cls({pool: data.get(pool, {}) for pool in POOLS}, data.get("crisis_adds", {}), **kwargs)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "TemplateCatalog":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_data(json.load(f), **kwargs)
+
+    # ── Picking ──────────────────────────────────────────────────────────────
+
+    def _slot(self, pool: str, key: str) -> int:
+        slot = self._slots.get((pool, key))
+        return self._slots[(pool, _DEFAULT_KEYS[pool])] if slot is None else slot
+
+    def _recent_for(self, user_id: Optional[str]) -> bytearray:
+        recent = self._recent.get(user_id)
+        if recent is None:
+            recent = self._recent[user_id] = bytearray(2 * len(self._variants))
+            if len(self._recent) > self.max_users:
+                self._recent.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._recent.move_to_end(user_id)
+        return recent
+
+    def pick(self, pool: str, key: str, user_id: Optional[str] = None) -> str:
+        """A variant for ``key`` that this user has not seen in their last two picks of the slot."""
+        slot     = self._slot(pool, key)
+        variants = self._variants[slot]
+        n        = len(variants)
+        if n == 0:
+            return ""
+        self.picks += 1
+        if n == 1:
+            return variants[0]
+
+        recent = self._recent_for(user_id)
+        last, prev = recent[2 * slot], recent[2 * slot + 1]
+        # Avoid both recent picks when at least one other variant remains, else just the last
+        avoid_prev = prev and n > 2
+        choices    = n - 1 - (1 if avoid_prev and prev != last else 0) if last else n
+        r = self._rng.randrange(choices)
+        for i in range(n):
+            if i + 1 == last or (avoid_prev and i + 1 == prev):
+                continue
+            if r == 0:
+                break
+            r -= 1
+        recent[2 * slot + 1] = last
+        recent[2 * slot]     = i + 1
+        return variants[i]
+
+    def crisis_add(self, risk_level: str) -> str:
+        return self.crisis_adds.get(risk_level, "")
+
+    def stats(self) -> dict:
+        return {
+            "slots":         len(self._variants),
+            "variants":      sum(len(v) for v in self._variants),
+            "tracked_users": len(self._recent),
+            "max_users":     self.max_users,
+            "picks":         self.picks,
+            "evictions":     self.evictions,
+        }
+
+
+def builtin_data() -> dict:
+    """The pools defined in ``app.response_generator``, in catalog file format."""
+    from app import response_generator as rg
+    return {
+        "emotion_openers":      rg.EMOTION_OPENERS,
+        "mental_state_bridges": rg.MENTAL_STATE_BRIDGES,
+        "closing_questions":    rg.CLOSING_QUESTIONS,
+        "crisis_adds":          rg.CRISIS_ADDS,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Avatar response-template catalog")
+    parser.add_argument("--export", metavar="PATH", help="write the built-in pools as a catalog JSON file")
+    parser.add_argument("--check", metavar="PATH", help="compile a catalog file and print its stats")
+    args = parser.parse_args()
+
+    if args.export:
+        with open(args.export, "w", encoding="utf-8") as f:
+            json.dump(builtin_data(), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Wrote {args.export}")
+    if args.check:
+        print(json.dumps(TemplateCatalog.load(args.check).stats(), indent=2))
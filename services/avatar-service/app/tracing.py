@@ -0,0 +1,10 @@
+"""
+Request tracing for the avatar-service — the shared implementation lives in
+``serenemind_common.tracing``; this module only names the service.
+"""
+
+from serenemind_common.tracing import TracingMiddleware, Tracer
+
+tracer = Tracer(service="avatar-service")
+
+__all__ = ["Tracer", "TracingMiddleware", "tracer"]
@@ -1,9 +1,331 @@
-class TTSHandler:
-    """
-    Placeholder for Text-to-Speech integration.
-    Could use ElevenLabs or OpenAI TTS API here.
-    """
+"""
+Text-to-speech pipeline
+=======================
+Replies are split into sentences and synthesized one sentence at a time, so
+the first clip can play while the rest of the reply is still being voiced:
+while sentence ``i`` is sent, sentence ``i + 1`` is already synthesizing.
+
+  - engines are local and pluggable (``TTS_ENGINE``): ``espeak`` (the
+    default) shells out to espeak-ng / espeak, and ``tone`` is an offline
+    stand-in that renders each word as a short tone, used whenever espeak is
+    not installed or fails its probe. Engines return 16-bit mono PCM; every
+    sentence is wrapped as a standalone WAV clip
+  - clips are cached on disk by content (engine, voice, rate, sentence), so
+    recurring template sentences — crisis helpline lines above all — are
+    synthesized once. Oldest clips are pruned beyond ``TTS_CACHE_MAX_MB``
+  - ``warm()`` pre-synthesizes known sentences (the crisis additions) at startup
+"""
+
+import array
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.metrics import observe_tts_sentence
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n+")
+_WORD         = re.compile(r"\w+")
+
+
+def split_sentences(text: str, max_chars: int = 240) -> List[str]:
+    """Sentences of ``text``; long ones are broken at a comma or space before ``max_chars``."""
+    sentences = []
+    for part in _SENTENCE_END.split(text):
+        part = " ".join(part.split())
+        while len(part) > max_chars:
+            cut = part.rfind(", ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else part.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            sentences.append(part[:cut].strip())
+            part = part[cut:].strip()
+        if part and _WORD.search(part):
+            sentences.append(part)
+    return sentences
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+def wav_to_pcm(clip: bytes) -> bytes:
+    with wave.open(io.BytesIO(clip), "rb") as w:
+        return w.readframes(w.getnframes())
+
+
+# ── Engines ──────────────────────────────────────────────────────────────────
+
+class TTSEngine:
+    """A local synthesizer: ``synthesize(sentence)`` returns 16-bit mono PCM at ``sample_rate``."""
+
+    name = "base"
+
+    def __init__(self, voice: str = "", sample_rate: int = 22050):
+        self.voice       = voice
+        self.sample_rate = sample_rate
+
+    @property
+    def cache_id(self) -> str:
+        """Everything besides the text that changes the audio; part of the cache key."""
+        return f"{self.name}:{self.voice}:{self.sample_rate}"
+
+    def synthesize(self, sentence: str) -> bytes:
+        raise NotImplementedError
+
+
+class ToneEngine(TTSEngine):
+    """Offline stand-in: one short tone per word, pitch derived from the word, silence between words."""
+
+    name = "tone"
+
+    def synthesize(self, sentence: str) -> bytes:
+        rate    = self.sample_rate
+        samples = array.array("h")
+        gap     = [0] * int(rate * 0.04)
+        for word in _WORD.findall(sentence.lower()):
+            pitch  = 180 + hashlib.blake2b(word.encode(), digest_size=1).digest()[0]
+            length = int(rate * min(0.06 + 0.025 * len(word), 0.3))
+            step   = 2 * math.pi * pitch / rate
+            fade   = max(1, length // 10)
+            samples.extend(int(8000 * math.sin(step * i) * min(1.0, i / fade, (length - i) / fade))
+                           for i in range(length))
+            samples.extend(gap)
+        return samples.tobytes()
+
+
+class EspeakEngine(TTSEngine):
+    """espeak-ng (or espeak) run locally. espeak has a fixed output rate, so ``sample_rate`` is
+    replaced by the rate of a probe synthesis at startup."""
+
+    name = "espeak"
+
+    def __init__(self, voice: str = "", sample_rate: int = 22050):
+        super().__init__(voice or "en", sample_rate)
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.binary is None:
+            raise RuntimeError("espeak-ng / espeak not found on PATH")
+        self.sample_rate, _ = self._run("ok")
+
+    def _run(self, sentence: str) -> Tuple[int, bytes]:
+        # Text goes on stdin, never argv: a sentence starting with "-" would be parsed as options
+        out = subprocess.run([self.binary, "--stdout", "--stdin", "-v", self.voice],
+                             input=sentence.encode("utf-8"), capture_output=True, check=True,
+                             timeout=30).stdout
+        with wave.open(io.BytesIO(out), "rb") as w:
+            return w.getframerate(), w.readframes(w.getnframes())
+
+    def synthesize(self, sentence: str) -> bytes:
+        return self._run(sentence)[1]
+
+
+ENGINES = {"tone": ToneEngine, "espeak": EspeakEngine}
+
+
+# ── Content-addressed clip cache ─────────────────────────────────────────────
+
+class AudioCache:
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.bytes     = sum(size for _, _, size in self._files())
+
+        self.hits   = 0
+        self.misses = 0
+        self.writes = 0
+        self.pruned = 0
+
     @staticmethod
-    def generate_speech(text: str) -> bytes:
-        # Return dummy audio or call API
-        return b""
+    def key(engine_id: str, sentence: str) -> str:
+        return hashlib.blake2b(f"{engine_id}\0{sentence}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.wav")
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".wav"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_mtime, st.st_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                clip = f.read()
+            os.utime(path)   # mtime doubles as last use for pruning
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return clip
+
+    def put(self, key: str, clip: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(clip)
+        with self._lock:
+            try:
+                replaced = os.path.getsize(path)   # rewriting a key replaces its clip, not adds to it
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)   # atomic: readers never see a partial clip
+            self.writes += 1
+            self.bytes  += len(clip) - replaced
+            if self.bytes > self.max_bytes:
+                self._prune()
+
+    def _prune(self):
+        # Oldest first down to 90% of the limit, so pruning does not run on every write
+        files = sorted(self._files(), key=lambda f: f[1])
+        total = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.pruned += 1
+        self.bytes = total
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "bytes":     self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_rate":  round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes":    self.writes,
+            "pruned":    self.pruned,
+        }
+
+
+# ── Handler ──────────────────────────────────────────────────────────────────
+
+class TTSHandler:
+
+    def __init__(self, engine: TTSEngine, cache: Optional[AudioCache] = None, max_sentence_chars: int = 240):
+        self.engine             = engine
+        self.cache              = cache
+        self.max_sentence_chars = max_sentence_chars
+        self.sentences          = 0
+        self.synth_seconds      = 0.0
+
+    def _clip(self, sentence: str) -> Tuple[bytes, bool]:
+        """``(wav_clip, cached)`` for one sentence; blocking, run off the event loop."""
+        key = AudioCache.key(self.engine.cache_id, sentence) if self.cache else None
+        if key:
+            clip = self.cache.get(key)
+            if clip is not None:
+                observe_tts_sentence("cache", 0.0)
+                return clip, True
+        start = time.perf_counter()
+        clip  = pcm_to_wav(self.engine.synthesize(sentence), self.engine.sample_rate)
+        elapsed = time.perf_counter() - start
+        self.sentences     += 1
+        self.synth_seconds += elapsed
+        observe_tts_sentence("engine", elapsed)
+        if key:
+            try:
+                self.cache.put(key, clip)
+            except OSError as e:
+                logger.warning(f"TTS cache write failed: {e}")
+        return clip, False
+
+    def split(self, text: str) -> List[str]:
+        return split_sentences(text, self.max_sentence_chars)
+
+    async def stream(self, text: str) -> AsyncIterator[Tuple[int, str, bytes, bool]]:
+        """
+        Yield ``(index, sentence, wav_clip, cached)`` in order as each clip is ready;
+        the next sentence synthesizes while the current one is being sent.
+        """
+        sentences = self.split(text)
+        if not sentences:
+            return
+        pending = asyncio.ensure_future(asyncio.to_thread(self._clip, sentences[0]))
+        try:
+            for i, sentence in enumerate(sentences):
+                clip, cached = await pending
+                if i + 1 < len(sentences):
+                    pending = asyncio.ensure_future(asyncio.to_thread(self._clip, sentences[i + 1]))
+                yield i, sentence, clip, cached
+        finally:
+            pending.cancel()
+
+    def generate_speech(self, text: str) -> bytes:
+        """The whole reply as one WAV (blocking); prefer ``stream`` for playback."""
+        clips = [self._clip(sentence)[0] for sentence in self.split(text)]
+        return pcm_to_wav(b"".join(wav_to_pcm(c) for c in clips), self.engine.sample_rate)
+
+    def warm(self, texts: Iterable[str]) -> int:
+        """Synthesize every sentence of ``texts`` into the cache; returns the number newly synthesized."""
+        if self.cache is None:
+            return 0
+        return sum(not self._clip(sentence)[1] for text in texts for sentence in self.split(text))
+
+    def stats(self) -> dict:
+        return {
+            "engine":        self.engine.name,
+            "voice":         self.engine.voice,
+            "sample_rate":   self.engine.sample_rate,
+            "synthesized":   self.sentences,
+            "synth_seconds": round(self.synth_seconds, 3),
+            "cache":         self.cache.stats() if self.cache else None,
+        }
+
+
+def create_tts_handler() -> TTSHandler:
+    engine_cls = ENGINES.get(settings.TTS_ENGINE)
+    if engine_cls is None:
+        logger.warning(f"Unknown TTS_ENGINE {settings.TTS_ENGINE!r} — using the tone stand-in")
+        engine_cls = ToneEngine
+    try:
+        engine = engine_cls(voice=settings.TTS_VOICE, sample_rate=settings.TTS_SAMPLE_RATE)
+    except (RuntimeError, OSError, subprocess.SubprocessError, wave.Error) as e:
+        logger.warning(f"TTS engine {settings.TTS_ENGINE!r} unavailable ({e}) — using the tone stand-in")
+        engine = ToneEngine(voice=settings.TTS_VOICE, sample_rate=settings.TTS_SAMPLE_RATE)
+
+    cache = None
+    if settings.TTS_CACHE_DIR:
+        try:
+            cache = AudioCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_MB * 1024 * 1024)
+        except OSError as e:
+            logger.warning(f"TTS cache disabled, {settings.TTS_CACHE_DIR} not usable: {e}")
+    return TTSHandler(engine, cache, max_sentence_chars=settings.TTS_MAX_SENTENCE_CHARS)
+
+
+tts = create_tts_handler()
@@ -0,0 +1,207 @@
+"""
+Avatar-service benchmark
+========================
+Drives ``POST /avatar/respond`` at a series of fixed concurrencies (closed
+loop) and reports throughput, p50/p95/p99/max latency, HTTP error rate and the
+LLM fallback rate — responses served by the template engine although the GPT
+path was expected (semantic cache hits are not fallbacks).
+
+With ``--spawn`` the harness starts the LLM stub (``benchmarks/llm_stub.py``)
+and an avatar-service instance wired to it, so the whole run is offline.
+
+Every request carries a unique journal text, and the spawned service runs
+with single-flight coalescing and the response cache off, so each request
+takes the LLM path and the numbers describe that path rather than request
+reuse. ``--singleflight`` / ``--cache`` turn them back on to measure the
+production configuration.
+
+Run (from services/avatar-service):
+    python -m benchmarks.bench_avatar --spawn --concurrency 1,4,16,64 --duration 15
+    python -m benchmarks.bench_avatar --spawn --stub-args="--error-rate 0.05 --tail-prob 0.01"
+    python -m benchmarks.bench_avatar --url http://localhost:8001 --expect template
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import List
+
+import httpx
+import numpy as np
+
+PAYLOADS = [
+    {"journal_text": "Work has been overwhelming and I cannot switch off at night.",
+     "emotion": "fear", "confidence": 0.71, "risk_level": "LOW", "crisis_probability": 0.04,
+     "mental_state": "stress", "mental_health_confidence": 0.66, "severity_rating": 5,
+     "tags": ["work-related stress", "sleep disturbance"]},
+    {"journal_text": "I miss my father so much, the house is quiet without him.",
+     "emotion": "sadness", "confidence": 0.83, "risk_level": "MEDIUM", "crisis_probability": 0.21,
+     "mental_state": "grief", "mental_health_confidence": 0.79, "severity_rating": 6,
+     "tags": ["grief", "family dynamics"]},
+    {"journal_text": "Today was peaceful and I finally finished my project.",
+     "emotion": "joy", "confidence": 0.92, "risk_level": "LOW", "crisis_probability": 0.01,
+     "mental_state": "joy", "mental_health_confidence": 0.88, "severity_rating": 1,
+     "tags": ["positive"]},
+    {"journal_text": "Everyone would be better without me.",
+     "emotion": "sadness", "confidence": 0.77, "risk_level": "CRISIS", "crisis_probability": 0.81,
+     "mental_state": "crisis", "mental_health_confidence": 0.81, "severity_rating": 9,
+     "tags": ["crisis indicators"]},
+]
+
+
+# ─── Local stack ──────────────────────────────────────────────────────────────
+
+def _wait_for(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+@contextmanager
+def spawn_stack(stub_port: int, avatar_port: int, stub_args: str,
+                singleflight: bool = False, cache: bool = False):
+    """Start the LLM stub and an avatar-service pointed at it; tear both down afterwards."""
+    env = {**os.environ, "OPENAI_API_KEY": "stub",
+           "OPENAI_BASE_URL": f"http://127.0.0.1:{stub_port}/v1", "LOG_LEVEL": "WARNING",
+           "SINGLEFLIGHT_ENABLED": str(int(singleflight)), "RESPONSE_CACHE_ENABLED": str(int(cache))}
+    procs = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.llm_stub", "--port", str(stub_port),
+                          *shlex.split(stub_args)]),
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(avatar_port),
+                          "--log-level", "warning"], env=env),
+    ]
+    try:
+        _wait_for(f"http://127.0.0.1:{stub_port}/v1/models")
+        _wait_for(f"http://127.0.0.1:{avatar_port}/health")
+        yield f"http://127.0.0.1:{avatar_port}", f"http://127.0.0.1:{stub_port}"
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait(10)
+
+
+# ─── Load ─────────────────────────────────────────────────────────────────────
+
+async def run_step(url: str, concurrency: int, duration: float, expect: str, timeout: float,
+                   seed: int = 0) -> dict:
+    rng       = random.Random(seed)
+    sent      = 0
+    latencies = []
+    sources   = Counter()
+    errors    = Counter()
+    limits    = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        t0       = time.perf_counter()
+        deadline = t0 + duration
+
+        async def user():
+            nonlocal sent
+            while time.perf_counter() < deadline:
+                # A unique text per request, so concurrent requests are never coalesced into one
+                sent += 1
+                payload = rng.choice(PAYLOADS)
+                payload = {**payload, "journal_text": f"{payload['journal_text']} (#{concurrency}-{sent})"}
+                start = time.perf_counter()
+                try:
+                    resp = await client.post(f"{url}/avatar/respond", json=payload)
+                    resp.raise_for_status()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    sources[resp.json().get("source", "unknown")] += 1
+                except httpx.HTTPStatusError as e:
+                    errors[f"HTTP {e.response.status_code}"] += 1
+                except Exception as e:
+                    errors[type(e).__name__] += 1
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    ok       = len(latencies)
+    total    = ok + sum(errors.values())
+    fallback = sources.get("ml-template", 0) if expect == "gpt-4o-mini" else 0
+    arr      = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "concurrency":    concurrency,
+        "requests":       total,
+        "throughput_rps": round(ok / elapsed, 2),
+        "p50_ms":         round(float(np.percentile(arr, 50)), 2),
+        "p95_ms":         round(float(np.percentile(arr, 95)), 2),
+        "p99_ms":         round(float(np.percentile(arr, 99)), 2),
+        "max_ms":         round(float(arr.max()), 2),
+        "error_rate":     round(sum(errors.values()) / total, 4) if total else 0.0,
+        "fallback_rate":  round(fallback / ok, 4) if ok else 0.0,
+        "sources":        dict(sources),
+        "errors":         dict(errors),
+    }
+
+
+async def run(url: str, levels: List[int], duration: float, expect: str, timeout: float) -> list:
+    steps = []
+    for level in levels:
+        step = await run_step(url, level, duration, expect, timeout)
+        print(f"  c={level:<4} {step['throughput_rps']:>8} req/s  p50={step['p50_ms']}ms "
+              f"p95={step['p95_ms']}ms p99={step['p99_ms']}ms max={step['max_ms']}ms "
+              f"errors={step['error_rate']:.1%} fallback={step['fallback_rate']:.1%}")
+        steps.append(step)
+    return steps
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Avatar-service benchmark")
+    parser.add_argument("--url", default="http://localhost:8001", help="avatar-service base URL")
+    parser.add_argument("--spawn", action="store_true", help="start the LLM stub and an avatar-service locally")
+    parser.add_argument("--stub-args", default="", help="extra arguments for llm_stub (with --spawn)")
+    parser.add_argument("--singleflight", action="store_true",
+                        help="keep single-flight coalescing on in the spawned service")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on in the spawned service")
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--avatar-port", type=int, default=8101)
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--expect", choices=("gpt", "template"), default="gpt",
+                        help="path the responses should take; anything else counts as a fallback")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    levels = [int(x) for x in args.concurrency.split(",")]
+    expect = "gpt-4o-mini" if args.expect == "gpt" else "ml-template"
+
+    report = {"timestamp": time.ctime(), "expect": expect, "duration_s": args.duration}
+    if args.spawn:
+        with spawn_stack(args.stub_port, args.avatar_port, args.stub_args,
+                         singleflight=args.singleflight, cache=args.cache) as (url, stub_url):
+            print(f"🧪 Benchmarking {url} (LLM stub at {stub_url} {args.stub_args})")
+            report["steps"] = asyncio.run(run(url, levels, args.duration, expect, args.timeout))
+            report["stub"]  = {"args": args.stub_args, "stats": httpx.get(f"{stub_url}/stats").json()}
+            report["service"] = {"singleflight": args.singleflight, "cache": args.cache}
+    else:
+        print(f"🧪 Benchmarking {args.url}")
+        report["steps"] = asyncio.run(run(args.url, levels, args.duration, expect, args.timeout))
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Local OpenAI-compatible LLM stand-in
+====================================
+Serves ``POST /v1/chat/completions`` (plain and ``stream=true``) with injected
+latency and failures, so the avatar-service GPT path can be exercised offline.
+
+  - latency:    fixed | uniform | lognormal, plus an optional slow tail
+  - failures:   error rate with configurable HTTP status codes, and a hang
+                rate (requests that sleep past any sensible client timeout)
+  - streaming:  time-to-first-token, then one chunk per token at ``--token-ms``
+
+Point the avatar-service at it (the OpenAI SDK reads these variables):
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://localhost:9100/v1
+
+Run (from services/avatar-service):
+    python -m benchmarks.llm_stub --port 9100 --latency lognormal --latency-ms 600 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = ("I hear how much you are carrying right now and it makes sense to feel this way "
+          "Let us take one small step together and notice what you need most tonight").split()
+
+
+class LatencyModel:
+
+    def __init__(self, dist: str = "lognormal", latency_ms: float = 500.0, sigma: float = 0.5,
+                 tail_prob: float = 0.0, tail_ms: float = 5000.0, seed: int = 0):
+        self.dist       = dist
+        self.latency_ms = latency_ms
+        self.sigma      = sigma
+        self.tail_prob  = tail_prob
+        self.tail_ms    = tail_ms
+        self.rng        = random.Random(seed)
+
+    def sample_s(self) -> float:
+        if self.tail_prob and self.rng.random() < self.tail_prob:
+            return self.tail_ms / 1000
+        if self.dist == "fixed":
+            ms = self.latency_ms
+        elif self.dist == "uniform":
+            ms = self.rng.uniform(0.5 * self.latency_ms, 1.5 * self.latency_ms)
+        else:  # lognormal with the given median
+            ms = self.latency_ms * self.rng.lognormvariate(0, self.sigma)
+        return ms / 1000
+
+
+def create_app(latency: LatencyModel, error_rate: float = 0.0, error_codes=(500, 429),
+               hang_rate: float = 0.0, hang_s: float = 120.0, ttft_ms: float = 300.0,
+               token_ms: float = 25.0, completion_tokens: int = 60) -> FastAPI:
+    app   = FastAPI(title="LLM stub")
+    stats = Counter()
+    rng   = random.Random(1)
+
+    def _text(n: int) -> list:
+        return [_WORDS[i % len(_WORDS)] for i in range(n)]
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        roll = rng.random()
+        if roll < hang_rate:
+            stats["hangs"] += 1
+            await asyncio.sleep(hang_s)
+        elif roll < hang_rate + error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(latency.sample_s() / 4)
+            code = rng.choice(error_codes)
+            return JSONResponse(status_code=code,
+                                content={"error": {"message": "injected failure", "type": "stub_error", "code": code}})
+
+        model   = body.get("model", "gpt-4o-mini")
+        n_tok   = min(int(body.get("max_tokens") or completion_tokens), completion_tokens)
+        prompt  = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        words   = _text(n_tok)
+        cid     = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            stats["streams"] += 1
+
+            async def events():
+                await asyncio.sleep(ttft_ms / 1000)
+                for i, word in enumerate(words):
+                    chunk = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {"content": (" " if i else "") + word},
+                                          "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(token_ms / 1000)
+                done = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                yield f"data: {json.dumps(done)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        stats["completions"] += 1
+        await asyncio.sleep(latency.sample_s())
+        return {
+            "id": cid, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": " ".join(words)}}],
+            "usage": {"prompt_tokens": prompt, "completion_tokens": n_tok, "total_tokens": prompt + n_tok},
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stub with latency injection")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="median completion latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal spread")
+    parser.add_argument("--tail-prob", type=float, default=0.0, help="probability of a slow-tail response")
+    parser.add_argument("--tail-ms", type=float, default=5000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="500,429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="requests that never answer in time")
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="streaming: time to first token")
+    parser.add_argument("--token-ms", type=float, default=25.0, help="streaming: inter-token delay")
+    parser.add_argument("--tokens", type=int, default=60, help="completion length in tokens")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = create_app(
+        LatencyModel(args.latency, args.latency_ms, args.sigma, args.tail_prob, args.tail_ms, args.seed),
+        error_rate=args.error_rate, error_codes=tuple(int(c) for c in args.error_codes.split(",")),
+        hang_rate=args.hang_rate, ttft_ms=args.ttft_ms, token_ms=args.token_ms,
+        completion_tokens=args.tokens,
+    )
+    uvicorn.run(stub, host="0.0.0.0", port=args.port, log_level="warning")
@@ -1,20 +1,57 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import avatar
-import logging
+from app.ai_client import ai_client
+from app.config import settings
+from app.metrics import render_latest
+from app.response_generator import client as llm_client, template_catalog
+from app.routers import admin, avatar
+from app.tracing import TracingMiddleware, tracer
+from app.tts_handler import tts
+from serenemind_common.log_config import setup_logging
+
+setup_logging(level=settings.LOG_LEVEL, json_format=settings.LOG_JSON,
+              sample_rates=settings.LOG_SAMPLE_RATES, queue_size=settings.LOG_QUEUE_SIZE)
+
 
-logging.basicConfig(level=logging.INFO)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Crisis additions recur verbatim in replies — voice them once, off the request path
+    warmup = None
+    if settings.TTS_PREWARM:
+        warmup = asyncio.create_task(asyncio.to_thread(tts.warm, template_catalog.crisis_adds.values()))
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await ai_client.aclose()
+    if llm_client is not None:
+        await llm_client.aclose()
 
-app = FastAPI(title="SereneMind Avatar Service")
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+
+tracer.configure(sample_rate=settings.TRACE_SAMPLE_RATE,
+                 export_path=settings.TRACE_EXPORT_PATH,
+                 buffer_size=settings.TRACE_BUFFER_SIZE)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["traceparent"],
 )
+app.add_middleware(TracingMiddleware, tracer=tracer)
 
 app.include_router(avatar.router, prefix="/avatar", tags=["Avatar"])
+app.include_router(admin.router,  prefix="/admin",  tags=["Admin"])
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/health")
 async def health():
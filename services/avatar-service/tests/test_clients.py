@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+
+from app.ai_client import AIServiceClient
+from app.llm_client import LLMClient
+
+
+def test_llm_pool_reopens_after_shutdown():
+    async def lifespan(client):
+        await client._acquire()
+        client._release()
+        pool = client._http
+        await client.aclose()
+        return pool
+
+    client = LLMClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+    first  = asyncio.run(lifespan(client))
+    second = asyncio.run(lifespan(client))   # a second app lifespan, on a new event loop
+    assert first.is_closed and second.is_closed
+    assert first is not second
+
+
+def test_ai_service_pool_reopens_after_shutdown():
+    def handler(request):
+        return httpx.Response(200, json={"crisis_risk": "LOW"})
+
+    async def lifespan(client):
+        client._pool()._transport = httpx.MockTransport(handler)
+        result = await client.analyze("hello")
+        await client.aclose()
+        return result
+
+    client = AIServiceClient("http://ai-service")
+    assert asyncio.run(lifespan(client)) == {"crisis_risk": "LOW"}
+    assert asyncio.run(lifespan(client)) == {"crisis_risk": "LOW"}
+    assert client.stats()["errors"] == 0
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.llm_client import CircuitBreaker, CircuitOpen, LLMClient, LLMSaturated
+from app.routers.avatar import _budget_s
+from main import app
+
+
+def _open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.cooldown_s   # cooldown already over
+
+
+def test_breaker_trips_then_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=30)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    breaker.opened_at -= 30
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()                 # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_saturated_probe_does_not_wedge_the_breaker(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT_S", 0.01)
+    client = LLMClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+    _open_breaker(client.breaker)
+
+    async def main():
+        for _ in range(settings.LLM_MAX_CONCURRENCY):
+            await client._acquire()            # every slot held
+        with pytest.raises(LLMSaturated):
+            await client.chat_within_budget(1.0, model="m", messages=[])
+        await client.aclose()
+
+    asyncio.run(main())
+    assert client.breaker.state == "half_open"
+    assert client.breaker.allow()              # the next call becomes the probe
+
+
+def test_cancelled_probe_frees_the_breaker():
+    client = LLMClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+    _open_breaker(client.breaker)
+
+    async def slow_chat(**kwargs):
+        await asyncio.sleep(10)
+
+    client.chat = slow_chat
+
+    async def main():
+        task = asyncio.ensure_future(client.chat_within_budget(0, model="m", messages=[]))
+        await asyncio.sleep(0.01)
+        with pytest.raises(CircuitOpen):      # the probe is in flight: everyone else is refused
+            client._check_breaker()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await client.aclose()
+
+    asyncio.run(main())
+    assert client.breaker.allow()              # the cancelled probe gave its turn back
+
+def test_client_budget_can_only_lower_the_default(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BUDGET_S", 4.0)
+    assert _budget_s(None) is None
+    assert _budget_s(500) == 0.5
+    assert _budget_s(60_000) == 4.0
+
+    response = TestClient(app).post("/avatar/respond", json={
+        "journal_text": "hi", "emotion": "joy", "confidence": 0.9, "risk_level": "LOW",
+        "latency_budget_ms": -1})
+    assert response.status_code == 422
@@ -0,0 +1,89 @@
+from app.prompt_builder import _omitted_tokens, build_prompt_inputs, estimate_tokens, trim_history, trim_journal
+
+FILLER = [
+    "Work was busy again and the meetings ran long.",
+    "I had pasta for dinner and watched a show.",
+    "The weather was grey all afternoon.",
+    "My sister called about the weekend plans.",
+    "I cleaned the kitchen before bed.",
+]
+
+
+def _journal(n=40, insert=None, at=None):
+    sentences = [FILLER[i % len(FILLER)] for i in range(n)]
+    if insert is not None:
+        sentences.insert(at, insert)
+    return " ".join(sentences)
+
+
+def test_short_inputs_pass_through():
+    plan = build_prompt_inputs("I had a calm day.", [{"role": "user", "content": "hi"}], budget_tokens=100)
+    assert plan.journal == "I had a calm day."
+    assert plan.passages_dropped == 0
+    assert plan.tokens_saved == 0
+
+
+def test_long_entry_fits_the_budget():
+    text = _journal(80)
+    plan = build_prompt_inputs(text, budget_tokens=150)
+    assert plan.passages_dropped > 0
+    assert plan.tokens_used <= 150
+    assert "omitted" in plan.journal
+    assert plan.tokens_saved == estimate_tokens(text) - plan.tokens_used
+
+
+def test_keyword_sentence_is_kept_past_the_budget():
+    crisis = "Some nights I think about how to end my life."
+    text   = _journal(60, insert=crisis, at=3)
+    excerpt, _, dropped = trim_journal(text, budget=20)
+    assert dropped > 0
+    assert crisis in excerpt
+
+
+def test_sentences_in_crisis_flagged_chunks_are_kept():
+    # No keyword in the passage: only the analyzer flag marks it
+    flagged = "I gave away my things and wrote the letters last night."
+    text    = _journal(60, insert=flagged, at=10)
+    start   = text.index(flagged)
+    signals = [
+        {"start": 0, "end": start, "signal": 0.9, "crisis": False},
+        {"start": start, "end": start + len(flagged), "signal": 0.1, "crisis": True},
+        {"start": start + len(flagged), "end": len(text), "signal": 0.9, "crisis": False},
+    ]
+    excerpt, _, dropped = trim_journal(text, budget=20, chunk_signals=signals)
+    assert dropped > 0
+    assert flagged in excerpt
+
+
+def test_highest_signal_sentences_are_kept_in_order():
+    text  = _journal(30)
+    first = text.index(FILLER[2])
+    last  = text.rindex(FILLER[4])
+    signals = [
+        {"start": 0, "end": len(text), "signal": 0.1},
+        {"start": first, "end": first + len(FILLER[2]), "signal": 0.95},
+        {"start": last, "end": last + len(FILLER[4]), "signal": 0.9},
+    ]
+    budget = estimate_tokens(FILLER[2]) + estimate_tokens(FILLER[4]) + 3 * _omitted_tokens()
+    excerpt, kept, _ = trim_journal(text, budget=budget, chunk_signals=signals)
+    assert kept == 2
+    assert excerpt.index(FILLER[2]) < excerpt.index(FILLER[4])
+
+
+def test_history_keeps_the_newest_turns():
+    history = [{"role": "user", "content": f"turn {i} " + "word " * 20} for i in range(6)]
+    kept = trim_history(history, budget=60)
+    assert kept == history[-len(kept):]
+    assert sum(estimate_tokens(t["content"]) for t in kept) <= 60
+
+    newest = trim_history(history, budget=5)
+    assert len(newest) == 1
+    assert newest[0]["content"].startswith("turn 5") and newest[0]["content"].endswith("…")
+
+
+def test_history_is_trimmed_within_the_overall_budget():
+    history = [{"role": "assistant" if i % 2 else "user", "text": "word " * 40} for i in range(6)]
+    plan = build_prompt_inputs(_journal(40), history, budget_tokens=200)
+    assert plan.history and plan.history[-1]["content"] == history[-1]["text"]
+    assert len(plan.history) < len(history)
+    assert plan.tokens_used <= 200
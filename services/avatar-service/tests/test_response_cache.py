@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+from app import response_generator
+from app.response_cache import ResponseCache
+
+ANALYSIS = dict(emotion="sadness", mental_state="Stress", risk_level="MEDIUM", severity_rating=5,
+                tags=["work", "sleep"])
+
+
+def _key(cache, history=None, **overrides):
+    fields = {**ANALYSIS, **overrides}
+    return cache.signature(fields["emotion"], fields["mental_state"], fields["risk_level"],
+                           fields["severity_rating"], fields["tags"], history)
+
+
+def test_key_is_the_bucketed_analysis_signature():
+    cache = ResponseCache()
+    assert _key(cache) == _key(cache, severity_rating=4, tags=["Sleep", "work"])
+    assert _key(cache) != _key(cache, severity_rating=7)
+    assert _key(cache) != _key(cache, emotion="anger")
+
+
+def test_elevated_and_history_bearing_requests_are_not_cached():
+    cache = ResponseCache()
+    assert _key(cache, risk_level="HIGH") is None
+    assert _key(cache, risk_level="CRISIS") is None
+    assert _key(cache, history=[{"role": "user", "content": "hi"}]) is None
+    assert cache.stats()["bypassed"] == 3
+
+
+def test_variants_rotate_once_the_key_is_full():
+    cache = ResponseCache(variants=2)
+    key = _key(cache)
+    cache.put(key, "first")
+    assert cache.get(key) is None
+    cache.put(key, "second")
+    assert [cache.get(key) for _ in range(3)] == ["first", "second", "first"]
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def chat_within_budget(self, budget_s, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        reply = f"Generic reply {len(self.prompts)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))],
+                               usage=SimpleNamespace(total_tokens=10))
+
+
+def _reply(text, session_id, **overrides):
+    return response_generator.generate_avatar_response(
+        journal_text=text, confidence=0.8, session_id=session_id, **{**ANALYSIS, **overrides})
+
+
+def test_replies_are_shared_across_sessions_and_never_see_the_entry(monkeypatch):
+    llm = _FakeLLM()
+    monkeypatch.setattr(response_generator, "client", llm)
+    monkeypatch.setattr(response_generator, "response_cache", ResponseCache(variants=1))
+
+    async def main():
+        return [await _reply("My divorce papers came through today.", "a" * 32),
+                await _reply("Deadlines at the office kept me up.", "b" * 32)]
+
+    first, second = asyncio.run(main())
+    assert first["source"] == "gpt-4o-mini"
+    assert second["source"] == "cache" and second["text"] == first["text"]
+    assert len(llm.prompts) == 1
+    assert "divorce" not in llm.prompts[0]
+
+
+def test_uncacheable_replies_are_written_for_the_entry(monkeypatch):
+    llm = _FakeLLM()
+    monkeypatch.setattr(response_generator, "client", llm)
+    monkeypatch.setattr(response_generator, "response_cache", ResponseCache(variants=1))
+
+    async def main():
+        return [await _reply("I keep thinking about the divorce.", "a" * 32, risk_level="HIGH"),
+                await _reply("I keep thinking about the divorce.", "b" * 32, risk_level="HIGH")]
+
+    assert [r["source"] for r in asyncio.run(main())] == ["gpt-4o-mini", "gpt-4o-mini"]
+    assert all("divorce" in prompt for prompt in llm.prompts)
@@ -0,0 +1,19 @@
+from app.response_generator import _build_messages
+
+
+def _messages(risk_level, helpline_shown):
+    messages, _ = _build_messages(
+        "I can't keep going like this.", "sadness", 0.8, risk_level, 0.7, "depression", 0.8,
+        8, ["hopelessness"], "Text reflects despair.", None, helpline_shown=helpline_shown,
+    )
+    return "\n".join(m["content"] for m in messages)
+
+
+def test_unary_prompt_asks_for_the_helpline():
+    assert "Include Umang 0317-4288665" in _messages("CRISIS", helpline_shown=False)
+
+
+def test_stream_prompt_does_not_repeat_the_crisis_event():
+    prompt = _messages("CRISIS", helpline_shown=True)
+    assert "0317-4288665" not in prompt
+    assert "already shown" in prompt
@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+from app import session_store
+from app.session_store import SessionStore
+from main import app
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _turn(i):
+    return {"role": "user", "content": f"entry {i}"}
+
+
+def test_window_keeps_the_newest_turns():
+    store = SessionStore(max_turns=3, max_turn_chars=5)
+    store.append("s", *(_turn(i) for i in range(5)))
+    assert store.history("s") == [{"role": "user", "content": "entry"}] * 3
+    assert store.history("unknown") == []
+
+
+def test_idle_sessions_expire(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", clock)
+    store = SessionStore(idle_ttl_s=60)
+    store.append("idle", _turn(0))
+    store.append("active", _turn(0))
+
+    clock.now += 50
+    assert store.history("active")          # reading a session keeps it alive
+    clock.now += 20
+    assert store.history("idle") == []
+    assert store.history("active")
+    assert store.stats()["expired"] == 1
+
+
+def test_least_recently_used_sessions_are_evicted():
+    store = SessionStore(max_sessions=2)
+    store.append("a", _turn(0))
+    store.append("b", _turn(0))
+    store.history("a")                      # "b" is now the least recently used
+    store.append("c", _turn(0))
+    assert store.history("b") == []
+    assert store.history("a") and store.history("c")
+    assert store.evictions == 1
+
+
+def test_session_ids_must_be_unguessable():
+    client = TestClient(app)
+    assert client.delete("/avatar/session/1").status_code == 422
+    assert client.delete("/avatar/session/" + "ab" * 16).json() == {"cleared": False}
+    response = client.post("/avatar/respond", json={
+        "journal_text": "hi", "emotion": "neutral", "confidence": 0.5, "risk_level": "LOW",
+        "session_id": "user-1",
+    })
+    assert response.status_code == 422
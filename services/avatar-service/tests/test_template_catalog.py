@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+
+from app import response_generator
+from app.template_catalog import TemplateCatalog, builtin_data
+
+CRISIS_ADDS = {"HIGH": "Please reach out to a helpline.", "CRISIS": "Please call the helpline now."}
+
+
+def _catalog(openers, **kwargs):
+    pools = {
+        "emotion_openers":      {"neutral": ["Hi."], "sadness": openers},
+        "mental_state_bridges": {"normal": ["Okay."]},
+        "closing_questions":    {"neutral": ["And you?"]},
+    }
+    return TemplateCatalog(pools, CRISIS_ADDS, **kwargs)
+
+
+@pytest.mark.parametrize("n", [3, 4, 7])
+def test_never_repeats_within_three_picks(n):
+    catalog = _catalog([f"variant {i}" for i in range(n)], seed=1)
+    picks = [catalog.pick("emotion_openers", "sadness", "alice") for _ in range(300)]
+    for i in range(2, len(picks)):
+        assert len(set(picks[i - 2:i + 1])) == 3
+    assert set(picks) == {f"variant {i}" for i in range(n)}
+
+
+def test_two_variants_alternate():
+    catalog = _catalog(["a", "b"], seed=1)
+    picks = [catalog.pick("emotion_openers", "sadness", "alice") for _ in range(20)]
+    assert all(x != y for x, y in zip(picks, picks[1:]))
+
+
+def test_rotation_is_tracked_per_user():
+    catalog = _catalog(["a", "b", "c"], seed=1)
+    alice = [catalog.pick("emotion_openers", "sadness", "alice") for _ in range(3)]
+    bob   = catalog.pick("emotion_openers", "sadness", "bob")
+    # Bob's first pick is unconstrained, and it does not move Alice's rotation
+    assert bob in {"a", "b", "c"}
+    assert catalog.pick("emotion_openers", "sadness", "alice") not in alice[1:]
+
+
+def test_unknown_key_falls_back_to_the_default_entry():
+    catalog = _catalog(["a", "b", "c"])
+    assert catalog.pick("emotion_openers", "confusion") == "Hi."
+
+
+def test_least_recent_users_are_evicted():
+    catalog = _catalog(["a", "b", "c"], max_users=2)
+    for user in ("alice", "bob", "carol"):
+        catalog.pick("emotion_openers", "sadness", user)
+    assert catalog.stats()["tracked_users"] == 2
+    assert catalog.evictions == 1
+
+
+@pytest.mark.parametrize("level", ["HIGH", "CRISIS"])
+def test_catalog_without_a_crisis_addition_is_rejected(level, tmp_path):
+    data = builtin_data()
+    data["crisis_adds"] = {k: v for k, v in data["crisis_adds"].items() if k != level}
+    path = tmp_path / "templates.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    with pytest.raises(ValueError, match=level):
+        TemplateCatalog.load(str(path))
+
+
+def test_catalog_without_a_default_entry_is_rejected():
+    data = builtin_data()
+    data["closing_questions"] = {k: v for k, v in data["closing_questions"].items() if k != "neutral"}
+    with pytest.raises(ValueError, match="neutral"):
+        TemplateCatalog.from_data(data)
+
+
+def test_sessions_without_a_user_rotate_independently(monkeypatch):
+    catalog = TemplateCatalog.from_data(builtin_data(), seed=3)
+    openers = {"a" * 32: [], "b" * 32: []}
+    pick = catalog.pick
+
+    def spy(pool, key, user_id=None):
+        variant = pick(pool, key, user_id)
+        if pool == "emotion_openers":
+            openers[user_id].append(variant)
+        return variant
+
+    monkeypatch.setattr(catalog, "pick", spy)
+    monkeypatch.setattr(response_generator, "template_catalog", catalog)
+    monkeypatch.setattr(response_generator, "client", None)
+
+    async def main():
+        for _ in range(30):
+            for session_id in openers:
+                await response_generator.generate_avatar_response(
+                    journal_text="Long day.", emotion="sadness", confidence=0.8, risk_level="LOW",
+                    session_id=session_id)
+
+    asyncio.run(main())
+    for picks in openers.values():
+        assert len(picks) == 30
+        assert all(len(set(picks[i - 2:i + 1])) == 3 for i in range(2, len(picks)))
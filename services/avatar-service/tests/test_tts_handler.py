@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+import time
+
+from app.tts_handler import AudioCache, EspeakEngine, TTSHandler, ToneEngine, split_sentences, wav_to_pcm
+
+
+def _handler(tmp_path, max_bytes=10 * 1024 * 1024):
+    return TTSHandler(ToneEngine(sample_rate=8000), AudioCache(str(tmp_path), max_bytes))
+
+
+async def _collect(handler, text):
+    return [event async for event in handler.stream(text)]
+
+
+def test_split_sentences():
+    assert split_sentences("I hear you. That sounds hard!  What helped?\n\nTake care…") == [
+        "I hear you.", "That sounds hard!", "What helped?", "Take care…",
+    ]
+    assert split_sentences("  ...  \n") == []
+
+
+def test_long_sentences_are_split_at_a_comma_or_space():
+    parts = split_sentences("first part of it, " + "word " * 30, max_chars=40)
+    assert parts[0] == "first part of it,"
+    assert all(len(p) <= 40 for p in parts)
+    assert " ".join(parts).split() == ("first part of it, " + "word " * 30).split()
+
+
+def test_repeated_sentences_come_from_the_cache(tmp_path):
+    handler = _handler(tmp_path)
+    first  = asyncio.run(_collect(handler, "Please reach out. You matter."))
+    second = asyncio.run(_collect(handler, "You matter. Please reach out."))
+    assert [cached for *_, cached in first] == [False, False]
+    assert [cached for *_, cached in second] == [True, True]
+    assert second[0][2] == first[1][2]
+    assert handler.sentences == 2
+    assert handler.cache.stats()["hits"] == 2
+
+
+def test_rewriting_a_key_does_not_grow_the_byte_count(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put("ab" * 16, b"x" * 100)
+    cache.put("ab" * 16, b"y" * 60)
+    assert cache.bytes == 60
+    assert AudioCache(str(tmp_path), max_bytes=1024 * 1024).bytes == 60
+
+
+def test_oldest_clips_are_pruned_beyond_the_limit(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    keys  = [AudioCache.key("tone", str(i)) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, b"x" * 300)
+        os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+    assert cache.pruned == 1
+    assert cache.get(keys[0]) is None
+    assert all(cache.get(k) is not None for k in keys[1:])
+    assert cache.bytes <= 1000
+
+
+def test_stream_yields_sentences_in_order(tmp_path):
+    handler = _handler(tmp_path)
+    text    = "One. Two words. Now three words here. " * 3
+    events  = asyncio.run(_collect(handler, text))
+    assert [i for i, *_ in events] == list(range(9))
+    assert [s for _, s, *_ in events] == split_sentences(text)
+    for _, sentence, clip, _ in events:
+        assert wav_to_pcm(clip) == handler.engine.synthesize(sentence)
+
+
+# Parses options the way espeak's getopt does: "-w<path>" / "-w <path>" writes a WAV file
+_FAKE_ESPEAK = '''#!{python}
+import io, sys, wave
+args, text, i = sys.argv[1:], "", 0
+while i < len(args):
+    arg = args[i]
+    if arg == "--stdin":
+        text = sys.stdin.read()
+    elif arg == "-v":
+        i += 1
+    elif arg.startswith("-w"):
+        path = arg[2:].strip() or args[i + 1]
+        open(path, "wb").close()
+    elif not arg.startswith("-"):
+        text = arg
+    i += 1
+buf = io.BytesIO()
+with wave.open(buf, "wb") as w:
+    w.setnchannels(1); w.setsampwidth(2); w.setframerate(16000)
+    w.writeframes(b"\\0\\0" * len(text))
+sys.stdout.buffer.write(buf.getvalue())
+'''
+
+
+def test_espeak_never_reads_text_as_options(tmp_path, monkeypatch):
+    binary = tmp_path / "bin" / "espeak-ng"
+    binary.parent.mkdir()
+    binary.write_text(_FAKE_ESPEAK.format(python=sys.executable))
+    binary.chmod(0o755)
+    monkeypatch.setenv("PATH", str(binary.parent))
+
+    target = tmp_path / "x"
+    engine = EspeakEngine()
+    pcm    = engine.synthesize(f"-w {target} hello")
+    assert not target.exists()
+    assert len(pcm) == 2 * len(f"-w {target} hello")
@@ -0,0 +1,5 @@
+"""
+Code shared by the SereneMind Python services (ai-service, avatar-service):
+request tracing, non-blocking structured logging and single-flight request
+coalescing. Installed into each service from ``services/common``.
+"""
@@ -0,0 +1,36 @@
+"""
+Explicit crisis keywords
+========================
+Phrases that always mark a text as a crisis. The ai-service reliability bridge
+overrides the model to CRISIS on them and flags ``chunk_signals`` spans that
+contain one; the avatar-service prompt builder never trims a sentence
+containing one. One list, so the two services cannot disagree.
+"""
+
+EXPLICIT_CRISIS_KEYWORDS = [
+    # Suicidal ideation — direct
+    "kill myself", "kill my self", "killing myself",
+    "end my life", "end myself", "end my self",
+    "want to die", "wanna die", "going to die",
+    "don't want to live", "do not want to live", "don't wanna live",
+    "no reason to live", "nothing to live for",
+    "better off dead", "better off without me",
+    "suicide", "suicidal",
+    # Method — active intent
+    "hang myself", "hang my self",
+    "overdose", "take pills to die",
+    "jump off", "jump from", "going to jump",
+    "taking my life", "take my life", "take my own life",
+    # Physical self-harm with intent
+    "cut myself", "cutting myself", "slit my wrist",
+    "hurt myself on purpose", "want to hurt myself",
+    "hit myself", "hit my self",
+    "harm myself", "self harm",
+    "shooting myself",
+    # Escape / disappear
+    "disappear forever", "want to disappear",
+    "end it all", "end everything",
+    # Want to be dead
+    "wish i was dead", "wish i were dead",
+    "i am dying", "i will die", "i am going to die",
+]
@@ -0,0 +1,130 @@
+"""
+Non-blocking structured logging
+===============================
+Request threads only filter and enqueue log records; a ``QueueListener``
+thread formats them as JSON lines and does the actual I/O.
+
+High-volume info events are sampled per event name (``extra={"event": ...}``).
+Warnings, errors and records flagged ``crisis=True`` are always kept.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from serenemind_common.tracing import current_span
+
+# Attributes every LogRecord has — anything else was passed through ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts":     time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                      + f".{int(record.msecs):03d}Z",
+            "level":  record.levelname,
+            "logger": record.name,
+            "msg":    record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                doc[key] = value
+        if record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, default=str, ensure_ascii=False)
+
+
+class EventSampler(logging.Filter):
+    """Per-event sampling; also stamps the current trace id while still on the caller's thread."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and not getattr(record, "crisis", False):
+            rate = self.rates.get(getattr(record, "event", None))
+            if rate is not None and random.random() >= rate:
+                return False
+            if rate is not None:
+                record.sample_rate = rate
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Drops sampled-class records when the queue is full instead of blocking the request."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render msg % args now, like the stdlib QueueHandler: mutable args may change
+        # before the listener thread gets to the record. JSON layout is still deferred.
+        record = copy.copy(record)
+        record.msg  = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING or getattr(record, "crisis", False):
+                try:
+                    self.queue.put(record, timeout=0.05)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = "INFO", json_format: bool = True,
+                  sample_rates: Optional[Dict[str, float]] = None,
+                  queue_size: int = 10000) -> QueueListener:
+    """Route the root logger through a bounded queue to a background writer."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if json_format
+                        else logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(EventSampler(sample_rates or {}))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.addHandler(handler)
+
+    _listener = QueueListener(handler.queue, stream, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records (call on service shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,75 @@
+"""
+Single-flight request coalescing
+================================
+Concurrent calls with the same key share one computation: the first caller
+starts it, later callers attach to the same task, and everyone receives its
+result (or its exception). The key is forgotten as soon as the task
+finishes, so this never serves stale results — it only collapses duplicates
+that are in flight at the same moment (double-submits, client retries).
+
+The shared task is shielded, so a leader whose client disconnects does not
+cancel the computation for the followers still waiting on it.
+
+``counter`` is the service's Prometheus counter of collapsed calls, labelled
+by endpoint (``name``).
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+def request_key(*parts: Any) -> str:
+    """Stable digest of JSON-serialisable request fields."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+
+class SingleFlight:
+
+    def __init__(self, name: str, enabled: bool = True, counter: Optional[Any] = None):
+        self.name       = name
+        self.enabled    = enabled
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._collapsed = counter.labels(name) if counter is not None else None
+
+        self.calls     = 0
+        self.leaders   = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller's run was reused."""
+        self.calls += 1
+        if not self.enabled:
+            self.leaders += 1
+            return await fn(), False
+
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.collapsed += 1
+            if self._collapsed is not None:
+                self._collapsed.inc()
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every waiter has gone away
+
+    def stats(self) -> dict:
+        return {
+            "enabled":        self.enabled,
+            "in_flight_keys": len(self._inflight),
+            "calls":          self.calls,
+            "leaders":        self.leaders,
+            "collapsed":      self.collapsed,
+            "collapse_rate":  round(self.collapsed / self.calls, 4) if self.calls else None,
+        }
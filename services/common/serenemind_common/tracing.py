@@ -0,0 +1,246 @@
+"""
+Lightweight request tracing
+===========================
+W3C ``traceparent`` propagation with spans exported to a local JSONL file
+and/or an in-process ring buffer (served on ``/admin/traces``).
+
+  - ``TracingMiddleware`` opens a server span per HTTP request, continuing the
+    caller's trace when a ``traceparent`` header is present
+  - ``tracer.span(name)`` opens a child span of the current one; when the
+    request is not sampled it returns a shared no-op context
+  - Sampling is ratio-based on the trace id, so every service configured with
+    the same rate makes the same decision for a given trace
+
+Each service creates its own ``Tracer(service=...)`` and passes it to
+``TracingMiddleware``; the current span lives in one context variable shared
+by all tracers (``current_span()``).
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "service",
+                 "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, service: str):
+        self.trace_id   = trace_id
+        self.span_id    = os.urandom(8).hex()
+        self.parent_id  = parent_id
+        self.name       = name
+        self.service    = service
+        self.start_ns   = time.time_ns()
+        self.end_ns     = None
+        self.attributes = {}
+        self.status     = "ok"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id":    self.trace_id,
+            "span_id":     self.span_id,
+            "parent_id":   self.parent_id,
+            "name":        self.name,
+            "service":     self.service,
+            "start_ns":    self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status":      self.status,
+            "attributes":  self.attributes,
+        }
+
+
+# ─── Exporters ────────────────────────────────────────────────────────────────
+
+class InMemoryCollector:
+    """Ring buffer of recently finished spans."""
+
+    def __init__(self, maxlen: int = 2000):
+        self._spans = deque(maxlen=maxlen)
+
+    def export(self, span: Span):
+        self._spans.append(span)
+
+    def traces(self, trace_id: Optional[str] = None, limit: int = 50) -> list:
+        spans = [s for s in list(self._spans) if trace_id is None or s.trace_id == trace_id]
+        grouped = {}
+        for s in spans:
+            grouped.setdefault(s.trace_id, []).append(s.to_dict())
+        recent = list(grouped.items())[-limit:]
+        return [{"trace_id": tid, "spans": sorted(ss, key=lambda d: d["start_ns"])} for tid, ss in recent]
+
+
+class FileExporter:
+    """Appends spans as JSON lines from a background thread; drops when backlogged."""
+
+    def __init__(self, path: str, queue_size: int = 10000):
+        self.path    = path
+        self.dropped = 0
+        self._queue  = queue.Queue(maxsize=queue_size)
+        threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", buffering=1) as f:
+            while True:
+                f.write(json.dumps(self._queue.get()) + "\n")
+
+
+# ─── Tracer ───────────────────────────────────────────────────────────────────
+
+class _NullSpan:
+    def set_attribute(self, key, value):
+        pass
+
+
+_NULL_CONTEXT = nullcontext(_NullSpan())   # reusable — no allocation per unsampled span
+
+
+class Tracer:
+
+    def __init__(self, service: str, sample_rate: float = 0.0):
+        self.service     = service
+        self.sample_rate = sample_rate
+        self.exporters   = []
+        self.collector: Optional[InMemoryCollector] = None
+
+    def configure(self, sample_rate: float, export_path: str = "", buffer_size: int = 2000):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.collector   = InMemoryCollector(buffer_size) if buffer_size else None
+        self.exporters   = [e for e in (self.collector,
+                                        FileExporter(export_path) if export_path else None) if e]
+
+    def _sampled(self, trace_id: str, parent_flags: Optional[str]) -> bool:
+        if parent_flags is not None and int(parent_flags, 16) & 0x01:
+            return True
+        # Ratio on the low 64 bits of the trace id — deterministic across services
+        return int(trace_id[16:], 16) < self.sample_rate * (1 << 64)
+
+    def _finish(self, span: Span):
+        span.end_ns = time.time_ns()
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    @contextmanager
+    def server_span(self, name: str, traceparent: Optional[str]):
+        """Root span for an inbound request; yields ``None`` when not sampled."""
+        match = _TRACEPARENT_RE.match(traceparent or "")
+        if match:
+            trace_id, parent_id, flags = match.groups()
+        else:
+            trace_id, parent_id, flags = os.urandom(16).hex(), None, None
+
+        if not self.exporters or not self._sampled(trace_id, flags):
+            yield None
+            return
+
+        span  = Span(trace_id, parent_id, name, self.service)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    def span(self, name: str, **attributes):
+        """Child of the current span, or a no-op when the request is not sampled."""
+        parent = _current.get()
+        if parent is None:
+            return _NULL_CONTEXT
+        return self._child(parent, name, attributes)
+
+    @contextmanager
+    def _child(self, parent: Span, name: str, attributes: dict):
+        span = Span(parent.trace_id, parent.span_id, name, self.service)
+        span.attributes.update(attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes):
+        """Record an already-measured interval as a child of the current span."""
+        parent = _current.get()
+        if parent is None:
+            return
+        span = Span(parent.trace_id, parent.span_id, name, self.service)
+        span.start_ns = start_ns
+        span.attributes.update(attributes)
+        span.end_ns = end_ns
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def current_span(self) -> Optional[Span]:
+        return _current.get()
+
+    def current_traceparent(self) -> Optional[str]:
+        span = _current.get()
+        return span.traceparent if span is not None else None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one server span per HTTP request."""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app    = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        tracer = self.tracer
+        if scope["type"] != "http" or not tracer.exporters:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        name = f"{scope['method']} {scope['path']}"
+
+        with tracer.server_span(name, traceparent) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"traceparent", span.traceparent.encode("latin-1"))]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)